@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from .mbti_scorer import SCORER_VERSION
+
+# 캐시에 보관할 직렬화된 결과의 총 크기 상한 (bytes)
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def make_analysis_key(file_digests: List[str], user_name: str) -> str:
+    """
+    업로드 파일들의 SHA-256(순서 무관) + 사용자 이름 + 점수 규칙 버전으로 만든 키.
+    파일 순서를 바꿔서 다시 올려도 같은 키가 된다.
+    """
+    h = hashlib.sha256(f"scorer:{SCORER_VERSION}".encode("utf-8"))
+    for digest in sorted(file_digests):
+        h.update(b"\x00" + digest.encode("ascii"))
+    h.update(b"\x00user:" + user_name.encode("utf-8"))
+    return h.hexdigest()
+
+
+def make_multi_key(file_digests: List[str], user_name: str, weights: Dict[str, float]) -> str:
+    """여러 소스 통합 분석 결과 키 (파일 + 이름 + 소스별 가중치, 순서 무관)."""
+    h = hashlib.sha256(f"multi:{SCORER_VERSION}".encode("utf-8"))
+    for digest in sorted(file_digests):
+        h.update(b"\x00" + digest.encode("ascii"))
+    h.update(b"\x00user:" + user_name.encode("utf-8"))
+    for source, weight in sorted(weights.items()):
+        h.update(f"\x00{source}={weight!r}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def make_batch_key(file_digests: List[str], min_messages: int = 1) -> str:
+    """
+    단톡방 전원 일괄 분석 결과 키 (batch_id로도 그대로 씀). 사용자 이름 대신 "batch" 구분자.
+    min_messages보다 적게 말한 사람은 특징을 계산하지 않으므로 기준값도 키에 넣는다.
+    """
+    h = hashlib.sha256(f"scorer:{SCORER_VERSION}".encode("utf-8"))
+    for digest in sorted(file_digests):
+        h.update(b"\x00" + digest.encode("ascii"))
+    h.update(f"\x00batch:min={min_messages}".encode("ascii"))
+    return h.hexdigest()
+
+
+def make_batch_report_key(batch_id: str, sender: str) -> str:
+    """일괄 분석 결과 중 한 사람의 LLM 리포트 키."""
+    h = hashlib.sha256(b"batch_report\x00" + batch_id.encode("ascii"))
+    h.update(b"\x00sender:" + sender.encode("utf-8"))
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """
+    전체 분석 결과(응답 JSON) 메모리 캐시.
+
+    - 결과는 JSON bytes로 직렬화해서 저장 (꺼낼 때마다 새 dict라 호출자가 수정해도 안전)
+    - 직렬화 크기 합이 max_bytes를 넘으면 가장 오래 안 쓴 항목부터 버림 (LRU)
+    - invalidate(): 점수 가중치/규칙을 바꿨을 때 전체 무효화
+    """
+
+    def __init__(self, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return json.loads(data)
+
+    def set(self, key: str, result: Dict[str, Any]) -> None:
+        data = json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= len(old)
+            self._entries[key] = data
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+analysis_cache = AnalysisCache()
+
+
+def invalidate_analysis_cache() -> None:
+    """점수 규칙/가중치를 바꾼 뒤 호출해서 저장된 분석 결과를 모두 버린다."""
+    analysis_cache.invalidate()
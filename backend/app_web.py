@@ -1,25 +1,41 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Tuple
 
 from fastapi import FastAPI, UploadFile, File, Request, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from .data_loader.kakao_parser import parse_kakao_txt
-from .feature_extractor.features_common import extract_text_features
-from .feature_extractor.features_kakao import extract_kakao_features
-from .mbti_scorer import score_mbti
-from .confidence_engine import compute_confidence
-from .llm_reporter import generate_report, generate_persona_overview
-from .keyword_engine import generate_label_with_llm  # ★ 추가
+from .kakao_analysis import run_kakao_analysis, run_kakao_batch_analysis, generate_batch_report
+from .jobs import JobQueueFull, job_manager, format_sse
+from .metrics import StageTimings, render_prometheus
+from .analysis_cache import analysis_cache
+from .chat_cache import get_chat_cache_store
+from .feature_fusion import parse_fusion_weights
+from .multi_analysis import detect_upload_sources, run_multi_analysis
+from .llm_cache import get_llm_cache
+from .room_state import get_room_state_store
+from .util.file_utils import UploadSource, spool_upload_with_digest, discard_uploads
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-app = FastAPI(title="Real MBTI API", version="0.3.0")
+# 대기 작업이 너무 많을 때 다시 시도하라고 알려주는 시간 (초)
+JOB_RETRY_AFTER_SECONDS = 30
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # 종료 시 대기 / 실행 중인 작업을 취소 (각 작업의 업로드 임시 파일도 이때 지워짐)
+    await job_manager.shutdown()
+
+
+app = FastAPI(title="Real MBTI API", version="0.3.0", lifespan=lifespan)
 
 templates = Jinja2Templates(directory=str(BASE_DIR / "web" / "templates"))
 app.mount(
@@ -46,14 +62,33 @@ async def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
-def _decode_kakao_bytes(raw_bytes: bytes) -> str:
+def _validate_kakao_input(files: List[UploadFile], user_name: str) -> str:
+    """업로드 파일/이름 검증 후 공백 제거한 이름을 반환."""
+    if not files:
+        raise HTTPException(status_code=400, detail="최소 1개 이상의 파일이 필요합니다.")
+
+    user_name = user_name.strip()
+    if not user_name:
+        raise HTTPException(status_code=400, detail="사용자 이름을 입력해야 합니다.")
+    return user_name
+
+
+async def _read_uploads(files: List[UploadFile]) -> Tuple[List[UploadSource], List[str]]:
     """
-    카카오톡 내보내기 txt 인코딩 유추 (utf-8 우선, 안 되면 cp949).
+    파일을 읽으면서 SHA-256을 같이 계산 (분석 결과 캐시 키용).
+    큰 파일은 임시 파일로 저장되므로 다 쓰고 나면 discard_uploads()로 지운다.
     """
+    raw_files: List[UploadSource] = []
+    file_digests: List[str] = []
     try:
-        return raw_bytes.decode("utf-8")
-    except UnicodeDecodeError:
-        return raw_bytes.decode("cp949", errors="ignore")
+        for f in files:
+            source, digest = await spool_upload_with_digest(f)
+            raw_files.append(source)
+            file_digests.append(digest)
+    except BaseException:
+        discard_uploads(raw_files)
+        raise
+    return raw_files, file_digests
 
 
 @app.post("/analyze/kakao")
@@ -62,6 +97,8 @@ async def analyze_kakao(
     files: List[UploadFile] = File(...),
     # 단톡방에서의 "내 이름" (카톡 닉네임)
     user_name: str = Form(...),
+    # ?debug=1 이면 meta["debug"]에 단계별 소요 시간 / 메시지 수 / peak RSS 포함
+    debug: bool = False,
 ):
     """
     카카오톡 내보내기 txt 파일들 + 사용자 이름을 입력 받아서:
@@ -69,88 +106,212 @@ async def analyze_kakao(
     - 모든 메시지를 합쳐서 하나의 타임라인으로 보고
     - user_name과 일치하는 발화자만 "나"로 간주하여 특징 추출
     """
+    user_name = _validate_kakao_input(files, user_name)
+    timings = StageTimings()
+    with timings.span("read"):
+        raw_files, file_digests = await _read_uploads(files)
+    try:
+        return await run_kakao_analysis(
+            raw_files, file_digests, user_name, timings=timings, debug=debug
+        )
+    finally:
+        discard_uploads(raw_files)
+
+
+@app.post("/analyze/kakao/batch")
+async def analyze_kakao_batch(
+    files: List[UploadFile] = File(...),
+    # 이보다 적게 말한 사람은 결과에서 뺌 (skipped_senders에 이름만)
+    min_messages: int = Form(1),
+    # true면 참여자 전원의 LLM 리포트까지 같이 생성 (기본은 점수만)
+    include_reports: bool = Form(False),
+    debug: bool = False,
+):
+    """
+    단톡방 참여자 전원의 MBTI를 한 번에 계산한다.
+    파일은 한 번만 파싱하고, 발화자별 특징을 한 번의 순회로 같이 뽑는다.
+    LLM 리포트는 GET /analyze/kakao/batch/{batch_id}/report?sender=... 로 필요한 사람만 따로 요청.
+    """
     if not files:
         raise HTTPException(status_code=400, detail="최소 1개 이상의 파일이 필요합니다.")
-
+    timings = StageTimings()
+    with timings.span("read"):
+        raw_files, file_digests = await _read_uploads(files)
+    try:
+        return await run_kakao_batch_analysis(
+            raw_files,
+            file_digests,
+            min_messages=min_messages,
+            include_reports=include_reports,
+            timings=timings,
+            debug=debug,
+        )
+    finally:
+        discard_uploads(raw_files)
+
+
+@app.post("/analyze/multi")
+async def analyze_multi(
+    # 카톡 txt / 유튜브 시청 기록(JSON, HTML) / SNS 내보내기(JSON, CSV)를 섞어서 업로드
+    files: List[UploadFile] = File(...),
+    # 카톡 파일이 있을 때만 필요
+    user_name: str = Form(""),
+    # 소스별 가중치 덮어쓰기 ("kakao=1,youtube=0.3"), 비우면 FUSION_WEIGHTS
+    weights: str = Form(""),
+    debug: bool = False,
+):
+    """
+    여러 소스 통합 분석.
+    - 파일마다 앞부분으로 소스 종류를 판별
+    - 소스별 파싱 + 특징 추출을 워커 프로세스에서 동시에 실행
+    - 소스별 특징을 가중치로 합쳐서 MBTI 점수 계산
+    """
+    if not files:
+        raise HTTPException(status_code=400, detail="최소 1개 이상의 파일이 필요합니다.")
+    try:
+        weight_overrides = parse_fusion_weights(weights)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"가중치 형식이 올바르지 않습니다: {e}")
     user_name = user_name.strip()
-    if not user_name:
-        raise HTTPException(status_code=400, detail="사용자 이름을 입력해야 합니다.")
 
-    parsed_list: List[Dict[str, Any]] = []
-
-    for f in files:
-        raw_bytes = await f.read()
-        text = _decode_kakao_bytes(raw_bytes)
-        parsed = parse_kakao_txt(text)
-        parsed_list.append(parsed)
-
-    # === 여러 파일을 하나로 합치기 ===
-    all_messages = []
-    total_line_count = 0
-    senders_merged: Dict[str, int] = {}
-
-    for parsed in parsed_list:
-        msgs = parsed.get("messages", [])
-        meta = parsed.get("meta", {})
-        all_messages.extend(msgs)
-        total_line_count += meta.get("line_count", 0)
-
-        for s, cnt in meta.get("senders", {}).items():
-            senders_merged[s] = senders_merged.get(s, 0) + cnt
-
-    # 타임스탬프 순으로 정렬 (파일 여러 개 섞일 수 있으니까)
-    all_messages.sort(key=lambda m: m["timestamp"])
-
-    # user_name이 실제로 존재하는지 확인
-    user_sender_name = None
-    if user_name in senders_merged:
-        user_sender_name = user_name
-    elif senders_merged:
-        # 못 찾으면 예전처럼 가장 많이 말한 사람으로 fallback
-        user_sender_name = max(senders_merged, key=senders_merged.get)
-
-    parsed_all = {
-        "messages": all_messages,
-        "meta": {
-            "source": "kakao",
-            "line_count": total_line_count,
-            "message_count": len(all_messages),
-            "senders": senders_merged,
-            "user_sender": user_sender_name,
-        },
-        "raw_text": "\n".join(m["text"] for m in all_messages),
-    }
+    timings = StageTimings()
+    with timings.span("read"):
+        raw_files, file_digests = await _read_uploads(files)
+    try:
+        with timings.span("sniff"):
+            source_types = detect_upload_sources(raw_files)
+        unknown = [f.filename for f, t in zip(files, source_types) if t is None]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"파일 종류를 알 수 없습니다: {', '.join(map(str, unknown))}")
+        if "kakao" in source_types and not user_name:
+            raise HTTPException(status_code=400, detail="카카오톡 파일이 있으면 사용자 이름을 입력해야 합니다.")
+        return await run_multi_analysis(
+            raw_files,
+            file_digests,
+            source_types,
+            user_name,
+            weights=weight_overrides,
+            timings=timings,
+            debug=debug,
+        )
+    finally:
+        discard_uploads(raw_files)
+
+
+@app.get("/analyze/kakao/batch/{batch_id}/report")
+async def get_kakao_batch_report(batch_id: str, sender: str):
+    """일괄 분석 결과 중 한 사람의 라벨 / 페르소나 개요 / 리포트 (처음 요청할 때 생성 후 캐시)."""
+    report = await generate_batch_report(batch_id, sender)
+    if report is None:
+        raise HTTPException(
+            status_code=404,
+            detail="분석 결과가 만료되었거나 해당 참여자를 찾을 수 없습니다. 파일을 다시 업로드해주세요.",
+        )
+    return report
+
+
+@app.post("/jobs/kakao")
+async def create_kakao_job(
+    files: List[UploadFile] = File(...),
+    user_name: str = Form(...),
+    debug: bool = False,
+):
+    """
+    /analyze/kakao 의 백그라운드 작업 버전.
+    업로드만 받고 바로 job_id를 돌려주며, 진행 상황은 GET /jobs/{job_id}/events (SSE)로 받는다.
+    """
+    user_name = _validate_kakao_input(files, user_name)
+    # 대기 작업이 꽉 찼으면 업로드를 임시 파일로 옮기기 전에 거절
+    if job_manager.full:
+        raise _job_queue_full()
+    timings = StageTimings()
+    with timings.span("read"):
+        raw_files, file_digests = await _read_uploads(files)
+
+    async def run(progress):
+        return await run_kakao_analysis(
+            raw_files, file_digests, user_name, progress=progress, timings=timings, debug=debug
+        )
+
+    # 업로드 임시 파일은 작업이 끝나거나 취소되거나 거절될 때 지운다
+    try:
+        job = job_manager.submit(run, cleanup=lambda: discard_uploads(raw_files))
+    except JobQueueFull:
+        raise _job_queue_full()
+    return {"job_id": job.id, "status": job.status}
 
-    # 공통 텍스트 특징 (전체 대화 텍스트 기반)
-    all_text = parsed_all["raw_text"]
-    common_features = extract_text_features(all_text)
-
-    # 카카오톡 전용 특징 (여기서 user_sender = user_name 기반으로 잡힘)
-    kakao_features = extract_kakao_features(parsed_all)
-
-     # 공통 + 카톡 특징 합치기
-    all_features = {**common_features, **kakao_features}
-
-    mbti_result = score_mbti(all_features)
-    confidence = compute_confidence(all_features, source_count=len(files))
-    label = generate_label_with_llm(mbti_result, confidence)  # ★ 수식어 생성
-        # ★ MBTI 페르소나 개요 생성
-    persona_overview = generate_persona_overview(mbti_result)
-
-    report = generate_report(mbti_result, confidence)
-
-    # ★ mbti_result 딕셔너리에 바로 붙여서 프론트로 넘김
-    mbti_result["persona_overview"] = persona_overview
-
-    return {
-        "mbti": mbti_result,
-        "confidence": confidence,
-        "label": label, 
-        "report": report,
-        "meta": {
-            "file_count": len(files),
-            "user_name_input": user_name,
-            "user_sender_resolved": kakao_features.get("user_sender_name"),
-        },
-    }
 
+def _job_queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="대기 중인 분석 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+        headers={"Retry-After": str(JOB_RETRY_AFTER_SECONDS)},
+    )
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    작업 단계 이벤트를 Server-Sent Events로 스트리밍한다.
+    running → parsed → features → scored(MBTI 점수) → report → done(전체 결과) / error
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+
+    async def event_stream():
+        async for event in job.iter_events():
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text 형식 지표.
+    - mbti_stage_duration_seconds: 단계별 소요 시간 히스토그램
+      (read / sniff / cache_lookup / room_lookup / parse / merge / features_text / features_kakao /
+       features_youtube / features_sns / fuse / score / llm_label / llm_persona / llm_report / total)
+    - 분석 결과 / 파싱 결과 / 방 상태(증분 분석) / LLM 응답 캐시 hit, miss
+    """
+    counters = {
+        "mbti_analysis_cache_lookups_total": (
+            "Analysis result cache lookups.",
+            {k: v for k, v in analysis_cache.stats().items() if k in ("hits", "misses")},
+        ),
+    }
+    chat_cache = get_chat_cache_store()
+    if chat_cache is not None:
+        counters["mbti_chat_cache_lookups_total"] = (
+            "Parsed chat cache lookups.",
+            chat_cache.stats(),
+        )
+    room_states = get_room_state_store()
+    if room_states is not None:
+        counters["mbti_room_state_lookups_total"] = (
+            "Incremental room state lookups.",
+            room_states.stats(),
+        )
+    llm_cache = get_llm_cache()
+    if llm_cache is not None and hasattr(llm_cache, "stats"):
+        counters["mbti_llm_cache_lookups_total"] = (
+            "LLM response cache lookups.",
+            {k: v for k, v in llm_cache.stats().items() if k.endswith(("hits", "misses"))},
+        )
+    return PlainTextResponse(
+        render_prometheus(counters),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, BinaryIO, List, Optional
+
+from .data_loader.message_table import MessageTable
+
+# 파싱 결과(MessageTable 배치) 바이너리 캐시.
+# 같은 내보내기 파일(SHA-256이 같음)을 다시 올리면 정규식 파싱 없이 mmap 한 번으로 테이블을 되살린다.
+
+# 기본 설정 (환경 변수로 조정)
+# - CHAT_CACHE_DIR: 파싱 결과를 저장할 디렉터리 (기본 "" = 사용 안 함)
+#   캐시 파일에는 모든 참여자의 메시지 본문이 그대로 남으므로 직접 켜야 한다
+#   (예: CHAT_CACHE_DIR=.cache/chat)
+# - CHAT_CACHE_TTL_SECONDS: 이 시간 동안 다시 안 쓰인 파일은 버림
+# - CHAT_CACHE_MAX_FILES / CHAT_CACHE_MAX_BYTES: 디렉터리 전체 상한 (넘으면 오래 안 쓴 파일부터 지움)
+CHAT_CACHE_DIR = os.getenv("CHAT_CACHE_DIR", "")
+CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+CHAT_CACHE_MAX_FILES = int(os.getenv("CHAT_CACHE_MAX_FILES", "64"))
+CHAT_CACHE_MAX_BYTES = int(os.getenv("CHAT_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# 파일 형식이나 파서 결과가 바뀌면 올려서 예전 캐시를 쓰지 않게 한다
+CHAT_CACHE_VERSION = 2
+
+_MAGIC = b"MBTICHAT"
+
+# 헤더: magic, version, flags, 메시지 수, 줄 수, 텍스트 heap 크기, current_day, 메타 영역 크기
+_HEADER = struct.Struct("<8sIIqqqqI4x")
+_FLAG_HAS_CURRENT_DAY = 1
+
+# 메타 영역: 인코딩 이름, 발화자 수, 발화자마다 (이름 길이, 이름 UTF-8, 메시지 수)
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+
+# 열은 기계 바이트 순서 그대로 쓰고 읽는다 (little-endian이 아닌 환경에서는 캐시를 쓰지 않음)
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _pad8(n: int) -> int:
+    return -n % 8
+
+
+def write_chat_cache(f: BinaryIO, batch: Dict[str, Any]) -> None:
+    """
+    parse_kakao_batch 결과(배치 dict)를 바이너리 형식으로 쓴다.
+
+        [헤더][메타: 인코딩 / 발화자 표][minutes int64 × n][sender_codes int32 × n]
+        [text_offsets int64 × (n + 1)][텍스트 heap (메시지마다 UTF-8 + "\\n")]
+
+    각 영역은 8바이트 단위로 정렬되어 있어서 읽을 때 memoryview.cast로 바로 쓸 수 있다.
+    메시지 길이는 heap 안에 섞지 않고 offsets 열로 따로 두어 i번째 메시지를 O(1)로 자른다.
+    """
+    table: MessageTable = batch["table"]
+    senders: Dict[str, int] = batch.get("senders", {})
+    current_day = batch.get("current_day")
+    n = len(table)
+
+    meta = bytearray()
+    encoding = batch.get("encoding", "utf-8").encode("ascii")
+    meta += _U32.pack(len(encoding)) + encoding
+    meta += _U32.pack(len(table.sender_names))
+    for name in table.sender_names:
+        raw = name.encode("utf-8")
+        meta += _U32.pack(len(raw)) + raw + _I64.pack(senders.get(name, 0))
+    meta += bytes(_pad8(len(meta)))
+
+    f.write(_HEADER.pack(
+        _MAGIC,
+        CHAT_CACHE_VERSION,
+        _FLAG_HAS_CURRENT_DAY if current_day is not None else 0,
+        n,
+        batch.get("line_count", 0),
+        len(table.text_buffer),
+        current_day or 0,
+        len(meta),
+    ))
+    f.write(meta)
+    f.write(table.minutes)
+    f.write(table.sender_codes)
+    f.write(bytes(_pad8(4 * n)))
+    f.write(table.text_offsets)
+    f.write(table.text_buffer)
+
+
+def load_chat_cache(path: str) -> Optional[Dict[str, Any]]:
+    """
+    write_chat_cache로 쓴 파일을 mmap 해서 parse_kakao_batch와 같은 배치 dict로 돌려준다.
+    테이블의 열 / 텍스트는 mmap 위의 memoryview라 메시지 수와 상관없이 복사가 없다
+    (페이지는 실제로 읽을 때 OS가 가져옴). 형식 / 버전이 다르거나 잘린 파일이면 None.
+    None을 돌려주거나 예외가 나면 mmap을 바로 닫는다 (파일은 with가 닫고, mmap은 fd를 따로 가짐).
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        batch = _read_chat_cache(mm, size)
+    except BaseException:
+        mm.close()
+        raise
+    if batch is None:
+        mm.close()
+    return batch
+
+
+def _read_chat_cache(mm: mmap.mmap, size: int) -> Optional[Dict[str, Any]]:
+    """
+    load_chat_cache의 본체. 헤더 / 메타데이터를 모두 확인한 뒤에만 memoryview를 만든다
+    (실패해서 돌아갈 때 mm을 참조하는 view가 남아 있으면 close가 BufferError를 냄).
+    """
+    magic, version, flags, n, line_count, text_bytes, current_day, meta_bytes = _HEADER.unpack_from(mm, 0)
+    pos = _HEADER.size + meta_bytes
+    columns_end = pos + 8 * n + 4 * n + _pad8(4 * n) + 8 * (n + 1)
+    if magic != _MAGIC or version != CHAT_CACHE_VERSION or columns_end + text_bytes != size:
+        return None
+
+    meta = _HEADER.size
+    (enc_len,) = _U32.unpack_from(mm, meta)
+    encoding = mm[meta + 4:meta + 4 + enc_len].decode("ascii")
+    meta += 4 + enc_len
+    (sender_count,) = _U32.unpack_from(mm, meta)
+    meta += 4
+    sender_names: List[str] = []
+    senders: Dict[str, int] = {}
+    for _ in range(sender_count):
+        (name_len,) = _U32.unpack_from(mm, meta)
+        name = mm[meta + 4:meta + 4 + name_len].decode("utf-8")
+        (count,) = _I64.unpack_from(mm, meta + 4 + name_len)
+        meta += 4 + name_len + 8
+        sender_names.append(name)
+        if count:
+            senders[name] = count
+    # 메타데이터가 헤더에 적힌 길이를 넘으면 열 위치가 어긋난 파일
+    if meta > pos:
+        return None
+
+    view = memoryview(mm)
+    minutes = view[pos:pos + 8 * n].cast("q")
+    pos += 8 * n
+    sender_codes = view[pos:pos + 4 * n].cast("i")
+    pos += 4 * n + _pad8(4 * n)
+    text_offsets = view[pos:pos + 8 * (n + 1)].cast("q")
+    pos += 8 * (n + 1)
+    text_buffer = view[pos:pos + text_bytes]
+
+    return {
+        "table": MessageTable.from_buffers(minutes, sender_codes, text_offsets, text_buffer, sender_names),
+        "line_count": line_count,
+        "senders": senders,
+        "encoding": encoding,
+        "current_day": current_day if flags & _FLAG_HAS_CURRENT_DAY else None,
+    }
+
+
+class ChatCacheStore:
+    """
+    파싱 결과를 업로드 파일 SHA-256별 바이너리 파일로 저장하는 디렉터리 저장소.
+    - 쓸 때는 임시 파일에 쓰고 os.replace로 바꿔서 읽는 쪽이 반쯤 쓴 파일을 보지 않게 한다
+    - 읽을 때마다 mtime을 갱신해서 TTL은 마지막으로 쓴 때부터 센다
+    - TTL이 지났거나 형식 / 버전이 다르거나 읽을 수 없는 파일은 없는 것으로 본다
+    - 만들 때와 쓸 때마다 sweep()으로 만료된 파일을 지우고 파일 수 / 크기 상한을 맞춘다
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: float = CHAT_CACHE_TTL_SECONDS,
+        max_files: int = CHAT_CACHE_MAX_FILES,
+        max_bytes: int = CHAT_CACHE_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sweep()
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.chat"
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        path = self._path(digest)
+        batch: Optional[Dict[str, Any]] = None
+        try:
+            if time.time() - path.stat().st_mtime <= self.ttl_seconds:
+                batch = load_chat_cache(str(path))
+                if batch is not None:
+                    os.utime(path)
+            else:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[chat_cache] failed to load {path.name}: {e!r}")
+            batch = None
+
+        with self._lock:
+            if batch is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return batch
+
+    def put(self, digest: str, batch: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write_chat_cache(f, batch)
+            os.replace(tmp_path, self._path(digest))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.sweep()
+
+    def sweep(self) -> int:
+        """
+        TTL이 지난 파일을 지우고, 남은 파일이 max_files / max_bytes를 넘으면
+        가장 오래 안 쓴(mtime) 파일부터 지운다. 지운 파일 수를 돌려준다.
+        (지우지 못한 파일 - 예: Windows에서 다른 요청이 mmap 중 - 은 다음 sweep에서 다시 시도)
+        """
+        now = time.time()
+        entries = []
+        try:
+            paths = list(self.directory.glob("*.chat"))
+        except OSError:
+            return 0
+        for path in paths:
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+
+        removed = 0
+        kept_files = 0
+        kept_bytes = 0
+        for mtime, size, path in entries:
+            expired = now - mtime > self.ttl_seconds
+            over = kept_files + 1 > self.max_files or kept_bytes + size > self.max_bytes
+            if not expired and not over:
+                kept_files += 1
+                kept_bytes += size
+                continue
+            try:
+                path.unlink(missing_ok=True)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_chat_cache: Optional[ChatCacheStore] = None
+_chat_cache_configured = False
+_chat_cache_lock = threading.Lock()
+
+
+def get_chat_cache_store() -> Optional[ChatCacheStore]:
+    """공용 파싱 결과 캐시 (처음 쓸 때 환경 변수 설정으로 생성, 비활성화되어 있으면 None)."""
+    global _chat_cache, _chat_cache_configured
+    with _chat_cache_lock:
+        if not _chat_cache_configured:
+            enabled = bool(CHAT_CACHE_DIR) and _NATIVE_LITTLE_ENDIAN
+            _chat_cache = ChatCacheStore(CHAT_CACHE_DIR) if enabled else None
+            _chat_cache_configured = True
+        return _chat_cache
+
+
+def set_chat_cache_store(store: Optional[ChatCacheStore]) -> None:
+    """공용 캐시 교체 (None이면 파싱 결과 캐시를 끈다)."""
+    global _chat_cache, _chat_cache_configured
+    with _chat_cache_lock:
+        _chat_cache = store
+        _chat_cache_configured = True
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import codecs
 import re
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from bisect import bisect_left
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .message_table import MessageTable
 
 # 스타일 A (예전/다른 형식: "2025년 9월 7일 오후 11:22, 김현호 : 안녕")
 STYLE_A_PATTERN = re.compile(
@@ -38,52 +43,96 @@ def _build_datetime(
     return datetime(year, month, day, hour, minute)
 
 
-def parse_kakao_txt(raw_text: str) -> Dict[str, Any]:
+# str.splitlines()와 같은 줄 경계 (리스트를 만들지 않고 순회하기 위해 사용)
+_LINE_BREAK_PATTERN = re.compile(
+    r"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]"
+)
+
+
+def _iter_text_lines(raw_text: str) -> Iterator[str]:
     """
-    카카오톡 내보내기 txt를 파싱해서
+    raw_text.splitlines()와 동일한 줄들을 하나씩 yield 한다.
+    (전체 줄 리스트를 메모리에 만들지 않음)
+    """
+    start = 0
+    for m in _LINE_BREAK_PATTERN.finditer(raw_text):
+        yield raw_text[start:m.start()]
+        start = m.end()
+    if start < len(raw_text):
+        yield raw_text[start:]
 
-    [
-      {"timestamp": datetime, "sender": "김현호", "text": "안녕"},
-      ...
-    ]
 
-    형태의 messages 리스트로 변환한다.
+def _decode_line(line: Union[str, bytes], encoding: Optional[str]) -> str:
+    """
+    bytes 줄이면 문자열로 디코딩한다.
+    - encoding이 주어지면 그 인코딩으로 (깨진 바이트는 무시)
+    - 없으면 utf-8 우선, 안 되면 cp949 (기존 _decode_kakao_bytes와 같은 순서)
+    """
+    if isinstance(line, str):
+        return line
+    if encoding:
+        return line.decode(encoding, errors="ignore")
+    try:
+        return line.decode("utf-8")
+    except UnicodeDecodeError:
+        return line.decode("cp949", errors="ignore")
 
-    - 스타일 A: 2025년 9월 7일 오후 11:22, 김현호 : 안녕
-    - 스타일 B(지금 네 파일): 날짜 구분선 + [이름] [오전 11:22] 내용
+
+def iter_kakao_messages(
+    lines: Iterable[Union[str, bytes]],
+    stats: Optional[Dict[str, Any]] = None,
+    encoding: Optional[str] = None,
+    start_date: Optional[date] = None,
+) -> Iterator[Dict[str, Any]]:
     """
-    lines = raw_text.splitlines()
+    카카오톡 내보내기 줄들(str 또는 bytes)을 한 줄씩 읽으면서
+    완성된 메시지를 하나씩 yield 하는 스트리밍 파서.
+
+    - lines: 파일 객체, 업로드 스풀, 문자열 줄 iterator 등 줄 단위 iterable
+    - stats: dict를 넘기면 파싱하면서 "line_count", "senders"(발화자별 메시지 수)를 채워준다.
+    - encoding: bytes 줄의 인코딩 (None이면 줄마다 utf-8 → cp949 순서로 시도)
+    - start_date: 파일 중간부터 읽을 때 그 앞의 마지막 스타일 B 날짜 (끝까지 읽으면 stats["current_date"]에 끝에서의 날짜)
+
+    이어쓰기 줄 때문에 메시지는 "다음 메시지 헤더(또는 날짜 줄)"를 만났을 때 확정되므로,
+    메모리에는 현재 작성 중인 메시지 하나만 들고 있다.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("line_count", 0)
+    senders: Dict[str, int] = stats.setdefault("senders", {})
 
-    messages: List[Dict[str, Any]] = []
     current_msg: Optional[Dict[str, Any]] = None
 
     # 스타일 B용 현재 날짜
-    current_year: Optional[int] = None
-    current_month: Optional[int] = None
-    current_day: Optional[int] = None
+    current_year: Optional[int] = start_date.year if start_date else None
+    current_month: Optional[int] = start_date.month if start_date else None
+    current_day: Optional[int] = start_date.day if start_date else None
+
+    for raw_line in lines:
+        stats["line_count"] += 1
 
-    for line in lines:
-        line = line.rstrip("\n")
-        if not line.strip():
+        line = _decode_line(raw_line, encoding).rstrip("\n")
+        stripped = line.strip()
+        if not stripped:
             continue
 
         # 1) 스타일 B 날짜 라인인지 먼저 확인
-        m_date = DATE_LINE_PATTERN.match(line.strip())
+        m_date = DATE_LINE_PATTERN.match(stripped)
         if m_date:
             current_year = int(m_date.group(1))
             current_month = int(m_date.group(2))
             current_day = int(m_date.group(3))
             # 날짜 라인이 나오면, 이전 메시지는 확정
             if current_msg is not None:
-                messages.append(current_msg)
+                yield current_msg
                 current_msg = None
             continue
 
         # 2) 스타일 A 형식인지 체크
-        m_a = STYLE_A_PATTERN.match(line.strip())
+        m_a = STYLE_A_PATTERN.match(stripped)
         if m_a:
             if current_msg is not None:
-                messages.append(current_msg)
+                yield current_msg
 
             year = int(m_a.group(1))
             month = int(m_a.group(2))
@@ -100,13 +149,14 @@ def parse_kakao_txt(raw_text: str) -> Dict[str, Any]:
                 "sender": sender,
                 "text": text,
             }
+            senders[sender] = senders.get(sender, 0) + 1
             continue
 
         # 3) 스타일 B 메시지 형식인지 체크
-        m_b = STYLE_B_PATTERN.match(line.strip())
+        m_b = STYLE_B_PATTERN.match(stripped)
         if m_b and current_year is not None:
             if current_msg is not None:
-                messages.append(current_msg)
+                yield current_msg
 
             sender = m_b.group(1).strip()
             ampm = m_b.group(2)
@@ -120,36 +170,477 @@ def parse_kakao_txt(raw_text: str) -> Dict[str, Any]:
                 "sender": sender,
                 "text": text,
             }
+            senders[sender] = senders.get(sender, 0) + 1
             continue
 
         # 4) 위 어느 형식도 아니면 → 이전 메시지의 이어쓰기(줄바꿈 포함)
         if current_msg is not None:
-            current_msg["text"] += "\n" + line.strip()
+            current_msg["text"] += "\n" + stripped
         # current_msg가 없는 경우(헤더 등)는 그냥 무시
 
     if current_msg is not None:
-        messages.append(current_msg)
+        yield current_msg
+    stats["current_date"] = (
+        date(current_year, current_month, current_day) if current_year is not None else None
+    )
+
+
+class ParsedChat(dict):
+    """
+    파싱 결과 dict ({"messages", "meta", "raw_text"}).
+    "raw_text"(모든 메시지 텍스트를 "\n"으로 이어붙인 문자열)는 처음 꺼낼 때 만든다.
+    특징 추출은 메시지 텍스트를 직접 순회하므로 보통은 만들어지지 않는다.
+
+    (dict.get / in 에서는 만들어지지 않으므로 parsed["raw_text"]로 꺼낸다)
+    """
+
+    def __missing__(self, key: str) -> Any:
+        if key != "raw_text":
+            raise KeyError(key)
+        messages = self["messages"]
+        if isinstance(messages, MessageTable):
+            raw_text = messages.joined_text()
+        else:
+            raw_text = "\n".join(m["text"] for m in messages)
+        self[key] = raw_text
+        return raw_text
+
+    def texts(self) -> Iterable[str]:
+        """메시지 텍스트를 순서대로 (raw_text를 만들지 않고 extract_text_features에 넘길 때)."""
+        messages = self["messages"]
+        if isinstance(messages, MessageTable):
+            return messages.text_blocks()
+        return (m["text"] for m in messages)
+
 
-    # 메타 정보
-    senders: Dict[str, int] = {}
-    for msg in messages:
-        senders[msg["sender"]] = senders.get(msg["sender"], 0) + 1
+def parse_kakao_lines(
+    lines: Iterable[Union[str, bytes]],
+    encoding: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    줄 단위 iterable(파일 객체 등)을 받아 parse_kakao_txt와 같은 형태의 결과를 만든다.
+    발화자 수/줄 수는 iter_kakao_messages가 파싱하면서 같이 센다.
+    """
+    stats: Dict[str, Any] = {}
+    messages: List[Dict[str, Any]] = list(iter_kakao_messages(lines, stats, encoding))
+    senders: Dict[str, int] = stats["senders"]
 
     # 가장 많이 말한 사람을 user로 가정
     user_sender: Optional[str] = None
     if senders:
         user_sender = max(senders, key=senders.get)
 
-    combined_text = "\n".join(m["text"] for m in messages)
-
-    return {
-        "messages": messages,
-        "meta": {
+    return ParsedChat(
+        messages=messages,
+        meta={
             "source": "kakao",
-            "line_count": len(lines),
+            "line_count": stats["line_count"],
             "message_count": len(messages),
             "senders": senders,
             "user_sender": user_sender,
         },
-        "raw_text": combined_text,
-    }
+    )
+
+
+def parse_kakao_txt(raw_text: str) -> Dict[str, Any]:
+    """
+    카카오톡 내보내기 txt를 파싱해서
+
+    [
+      {"timestamp": datetime, "sender": "김현호", "text": "안녕"},
+      ...
+    ]
+
+    형태의 messages 리스트로 변환한다.
+
+    - 스타일 A: 2025년 9월 7일 오후 11:22, 김현호 : 안녕
+    - 스타일 B(지금 네 파일): 날짜 구분선 + [이름] [오전 11:22] 내용
+
+    실제 파싱은 iter_kakao_messages가 줄 단위로 처리한다.
+    """
+    return parse_kakao_lines(_iter_text_lines(raw_text))
+
+
+# ======================================================
+# bytes 단위 파서 (업로드 버퍼 / mmap 위에서 바로 매칭)
+# ======================================================
+
+# 인코딩 판별에 쓰는 샘플 크기 (처음 나오는 비ASCII 바이트 주변만 본다)
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+_NON_ASCII_PATTERN = re.compile(rb"[\x80-\xff]")
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_DASH, _LBRACKET, _DIGIT_0, _DIGIT_9 = b"-[09"
+
+
+def detect_kakao_encoding(buf: Any) -> str:
+    """
+    bytes / mmap 버퍼의 인코딩을 앞부분 샘플로 판별한다 ("utf-8" 또는 "cp949").
+    - 첫 비ASCII 바이트가 나오는 줄부터 ENCODING_SAMPLE_BYTES만 디코딩해 본다.
+    - 비ASCII 바이트가 없으면 utf-8.
+    """
+    m = _NON_ASCII_PATTERN.search(buf)
+    if m is None:
+        return "utf-8"
+    start = buf.rfind(b"\n", 0, m.start()) + 1
+    sample = buf[start:start + ENCODING_SAMPLE_BYTES]
+    try:
+        # 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않는다 (줄바꿈 종류와 상관없이)
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=len(sample) < ENCODING_SAMPLE_BYTES)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp949"
+
+
+@lru_cache(maxsize=None)
+def _bytes_patterns(encoding: str) -> Tuple["re.Pattern[bytes]", "re.Pattern[bytes]", "re.Pattern[bytes]", bytes, bytes]:
+    """
+    str 정규식을 해당 인코딩의 bytes 정규식으로 변환 (날짜 줄, 스타일 A, 스타일 B, 오전, 오후).
+    utf-8 / cp949 모두 ASCII 호환이라 패턴의 메타 문자는 그대로 유지된다.
+    """
+    return (
+        re.compile(DATE_LINE_PATTERN.pattern.encode(encoding)),
+        re.compile(STYLE_A_PATTERN.pattern.encode(encoding)),
+        re.compile(STYLE_B_PATTERN.pattern.encode(encoding)),
+        "오전".encode(encoding),
+        "오후".encode(encoding),
+    )
+
+
+# bytes 파서(b"\n"으로만 줄을 나누고 ASCII 공백만 제거, 정규식 \s도 ASCII만)와
+# str 파서(splitlines / str.strip / 유니코드 \s) 결과가 달라질 수 있는 문자.
+# 이런 문자가 있는 구간은 디코딩해서 str 파서로 파싱한다 (_parse_text_region).
+_ASCII_SPECIAL_BYTES = (b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\x1f")
+_LONE_CR_PATTERN = re.compile(rb"\r(?!\n)")
+# 비ASCII 공백 (str.isspace): U+0085 / U+2028 / U+2029는 splitlines의 줄 구분 문자이기도 하다
+_UNICODE_SPACES = "\x85\xa0\u1680" + "".join(map(chr, range(0x2000, 0x200B))) + "\u2028\u2029\u202f\u205f\u3000"
+
+
+@lru_cache(maxsize=None)
+def _unicode_space_patterns(encoding: str) -> Tuple["re.Pattern[bytes]", ...]:
+    """
+    _UNICODE_SPACES를 해당 인코딩 bytes 정규식으로 (인코딩할 수 없는 문자는 뺌).
+    첫 바이트별로 정규식을 나눠야 정규식 엔진이 첫 바이트를 빠르게 건너뛰며 찾는다.
+    """
+    by_lead: Dict[int, List[bytes]] = {}
+    for ch in _UNICODE_SPACES:
+        try:
+            raw = ch.encode(encoding)
+        except UnicodeEncodeError:
+            continue
+        by_lead.setdefault(raw[0], []).append(raw)
+    return tuple(re.compile(b"|".join(map(re.escape, group))) for group in by_lead.values())
+
+
+def _needs_text_parser(buf: Any, encoding: str, start: int, end: int) -> bool:
+    """[start, end) 구간에 bytes 파서가 str 파서와 다르게 처리하는 문자가 있는지 (CR 단독 줄바꿈 등)."""
+    if any(buf.find(special, start, end) != -1 for special in _ASCII_SPECIAL_BYTES):
+        return True
+    if _LONE_CR_PATTERN.search(buf, start, end):
+        return True
+    return any(pattern.search(buf, start, end) for pattern in _unicode_space_patterns(encoding))
+
+
+def _epoch_day_minutes(year: int, month: int, day: int) -> int:
+    """해당 날짜 0시의 epoch 기준 분."""
+    return (date(year, month, day).toordinal() - _EPOCH_ORDINAL) * 1440
+
+
+def _clock_minutes(ampm: bytes, am: bytes, pm: bytes, hour: int, minute: int) -> int:
+    """오전/오후 시각 → 하루 중 분 (_build_datetime과 같은 규칙, 잘못된 시각은 ValueError)."""
+    if ampm == pm and hour != 12:
+        hour += 12
+    if ampm == am and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        raise ValueError(f"invalid kakao time {hour}:{minute:02d}")
+    return hour * 60 + minute
+
+
+def parse_kakao_buffer(
+    buf: Any,
+    encoding: Optional[str] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    start: int = 0,
+    end: Optional[int] = None,
+    current_day: Optional[int] = None,
+) -> MessageTable:
+    """
+    bytes 또는 mmap 버퍼를 디코딩하지 않고 bytes 정규식으로 바로 파싱해서 MessageTable로 만든다.
+
+    - encoding: None이면 detect_kakao_encoding()으로 앞부분 샘플만 보고 판별
+    - 텍스트는 인코딩된 bytes 그대로 테이블 버퍼에 복사하고 (cp949면 UTF-8로 변환),
+      실제 str 디코딩은 특징 추출에서 테이블을 읽을 때 일어난다.
+    - 발화자 이름만 처음 나올 때 한 번 디코딩한다.
+    - stats: "line_count", "senders", "encoding", "current_day"(끝에서의 날짜) 를 채워준다.
+    - start / end / current_day: 버퍼의 [start, end) 구간만 파싱 (find_kakao_chunks 참고).
+      current_day는 구간 앞에서 마지막으로 나온 날짜 줄의 날짜 (0시 epoch 분).
+
+    iter_kakao_messages와 같은 규칙으로 파싱한다. bytes 단위로는 b"\n"으로만 줄을 나누고
+    ASCII 공백만 다루므로, CR 단독 줄바꿈 / 유니코드 줄 구분 문자 / 비ASCII 공백이 있는 구간은
+    디코딩해서 iter_kakao_messages로 파싱한다 (결과는 parse_kakao_txt와 같음).
+    """
+    if encoding is None:
+        encoding = detect_kakao_encoding(buf)
+    if end is None:
+        end = len(buf)
+    if _needs_text_parser(buf, encoding, start, end):
+        return _parse_text_region(buf, encoding, stats, start, end, current_day)
+
+    date_re, style_a_re, style_b_re, am, pm = _bytes_patterns(encoding)
+    transcode = encoding.replace("-", "").lower() != "utf8"
+
+    table = MessageTable()
+    sender_codes: Dict[bytes, int] = {}
+    day_minutes: Dict[Tuple[bytes, bytes, bytes], int] = {}
+
+    def sender_code(raw_sender: bytes) -> int:
+        code = sender_codes.get(raw_sender)
+        if code is None:
+            code = table.sender_code(raw_sender.decode(encoding, errors="ignore").strip())
+            sender_codes[raw_sender] = code
+        return code
+
+    def day_base(y: bytes, m: bytes, d: bytes) -> int:
+        key = (y, m, d)
+        base = day_minutes.get(key)
+        if base is None:
+            base = _epoch_day_minutes(int(y), int(m), int(d))
+            day_minutes[key] = base
+        return base
+
+    # 현재 작성 중인 메시지 (시각, 발화자 코드, 텍스트 조각들)
+    cur_minute = 0
+    cur_code = -1
+    cur_parts: List[bytes] = []
+
+    def flush() -> None:
+        text = b"\n".join(cur_parts)
+        if transcode:
+            text = text.decode(encoding, errors="ignore").encode("utf-8")
+        table.append_encoded(cur_minute, cur_code, text)
+
+    # current_day: 스타일 B용 현재 날짜 (0시 epoch 분)
+    line_count = 0
+    pos = start
+
+    while pos < end:
+        nl = buf.find(b"\n", pos, end)
+        if nl == -1:
+            nl = end
+        line = buf[pos:nl]
+        pos = nl + 1
+        line_count += 1
+
+        stripped = line.strip()
+        if not stripped:
+            continue
+
+        # 줄 첫 바이트로 어떤 패턴을 볼지 고른다 (세 패턴의 시작 문자가 서로 달라서 결과는 같음)
+        first = stripped[0]
+
+        # 1) 스타일 B 날짜 라인: "---..."
+        if first == _DASH:
+            m_date = date_re.match(stripped)
+            if m_date:
+                current_day = day_base(m_date.group(1), m_date.group(2), m_date.group(3))
+                if cur_parts:
+                    flush()
+                    cur_parts = []
+                continue
+
+        # 2) 스타일 A: "2025년 ..."
+        elif _DIGIT_0 <= first <= _DIGIT_9:
+            m_a = style_a_re.match(stripped)
+            if m_a:
+                if cur_parts:
+                    flush()
+                y, mo, d, ampm, hh, mm, sender, text = m_a.groups()
+                cur_minute = day_base(y, mo, d) + _clock_minutes(ampm, am, pm, int(hh), int(mm))
+                cur_code = sender_codes.get(sender)
+                if cur_code is None:
+                    cur_code = sender_code(sender)
+                cur_parts = [text.strip()]
+                continue
+
+        # 3) 스타일 B: "[이름] [오전 11:22] ..."
+        elif first == _LBRACKET and current_day is not None:
+            m_b = style_b_re.match(stripped)
+            if m_b:
+                if cur_parts:
+                    flush()
+                sender, ampm, hh, mm, text = m_b.groups()
+                cur_minute = current_day + _clock_minutes(ampm, am, pm, int(hh), int(mm))
+                cur_code = sender_codes.get(sender)
+                if cur_code is None:
+                    cur_code = sender_code(sender)
+                cur_parts = [text.strip()]
+                continue
+
+        # 4) 이어쓰기 줄
+        if cur_parts:
+            cur_parts.append(stripped)
+
+    if cur_parts:
+        flush()
+
+    if stats is not None:
+        stats["line_count"] = line_count
+        stats["senders"] = table.sender_counts()
+        stats["encoding"] = encoding
+        stats["current_day"] = current_day
+    return table
+
+
+def _parse_text_region(
+    buf: Any,
+    encoding: str,
+    stats: Optional[Dict[str, Any]],
+    start: int,
+    end: int,
+    current_day: Optional[int],
+) -> MessageTable:
+    """parse_kakao_buffer의 [start, end) 구간을 디코딩해서 str 파서(iter_kakao_messages)로 파싱한다."""
+    text = str(buf[start:end], encoding, "ignore")
+    start_date = None if current_day is None else date.fromordinal(_EPOCH_ORDINAL + current_day // 1440)
+
+    line_stats: Dict[str, Any] = {}
+    table = MessageTable()
+    for msg in iter_kakao_messages(_iter_text_lines(text), line_stats, start_date=start_date):
+        table.append_message(msg)
+
+    if stats is not None:
+        end_date = line_stats["current_date"]
+        stats["line_count"] = line_stats["line_count"]
+        stats["senders"] = table.sender_counts()
+        stats["encoding"] = encoding
+        stats["current_day"] = (
+            None if end_date is None else (end_date.toordinal() - _EPOCH_ORDINAL) * 1440
+        )
+    return table
+
+
+# 줄 맨 앞(ASCII 공백 제외)이 "-" 또는 숫자인 줄: 날짜 줄 / 스타일 A 헤더 후보를 C 수준에서 빠르게 찾는다
+_DASH_LINE_SCAN = re.compile(rb"^[ \t\r\x0b\x0c]*-", re.M)
+_DIGIT_LINE_SCAN = re.compile(rb"^[ \t\r\x0b\x0c]*[0-9]", re.M)
+
+
+def _line_at(buf: Any, line_start: int) -> bytes:
+    nl = buf.find(b"\n", line_start)
+    return buf[line_start:nl if nl != -1 else len(buf)].strip()
+
+
+def _next_content_line(buf: Any, pos: int, end: int) -> Tuple[int, bytes]:
+    """pos부터 처음 나오는 빈 줄이 아닌 줄 (줄 시작 위치, 앞뒤 공백 제거한 줄). 없으면 (end, b"")."""
+    while pos < end:
+        nl = buf.find(b"\n", pos, end)
+        if nl == -1:
+            nl = end
+        stripped = buf[pos:nl].strip()
+        if stripped:
+            return pos, stripped
+        pos = nl + 1
+    return end, b""
+
+
+def find_first_message_line(buf: Any, encoding: str, limit: int = 64 * 1024) -> Optional[int]:
+    """
+    대화 본문이 시작되는 줄 (첫 날짜 줄 또는 스타일 A 헤더)의 위치.
+    그 앞의 "OOO 님과 카카오톡 대화" / "저장한 날짜 : ..." 줄은 내보낼 때마다 달라진다.
+    limit 안에서 못 찾으면 None.
+    """
+    date_re, style_a_re = _bytes_patterns(encoding)[:2]
+    end = min(len(buf), limit)
+    pos = 0
+    while pos < end:
+        line_start, stripped = _next_content_line(buf, pos, end)
+        if not stripped:
+            return None
+        if date_re.match(stripped) or style_a_re.match(stripped):
+            return line_start
+        nl = buf.find(b"\n", line_start, end)
+        if nl == -1:
+            return None
+        pos = nl + 1
+    return None
+
+
+def starts_new_message(buf: Any, pos: int, encoding: str, current_day: Optional[int]) -> bool:
+    """
+    pos부터 이어서 파싱해도 앞 메시지가 바뀌지 않는지
+    (첫 내용 줄이 날짜 줄 / 스타일 A 헤더 / (current_day가 있으면) 스타일 B 헤더, 또는 내용 없음).
+    """
+    date_re, style_a_re, style_b_re = _bytes_patterns(encoding)[:3]
+    _, stripped = _next_content_line(buf, pos, len(buf))
+    if not stripped:
+        return True
+    if date_re.match(stripped) or style_a_re.match(stripped):
+        return True
+    return current_day is not None and style_b_re.match(stripped) is not None
+
+
+def find_kakao_chunks(
+    buf: Any,
+    chunk_bytes: int,
+    encoding: Optional[str] = None,
+) -> List[Tuple[int, int, Optional[int]]]:
+    """
+    큰 내보내기 파일을 대략 chunk_bytes 크기의 구간으로 나눈다.
+    반환: [(start, end, current_day), ...] → parse_kakao_buffer(buf, start=..., end=..., current_day=...)
+
+    구간 경계는 항상 "날짜 줄" 또는 "스타일 A 메시지 헤더" 줄의 시작이다.
+    두 줄 모두 순차 파서에서 앞 메시지를 확정하는 줄이라서,
+    여러 줄짜리 메시지(이어쓰기 줄)가 두 구간에 걸쳐 잘리는 일이 없다.
+    각 구간의 current_day는 경계 앞의 마지막 날짜 줄로 채워서
+    구간별로 따로 파싱해도 순차 파싱과 결과가 같다.
+    """
+    if encoding is None:
+        encoding = detect_kakao_encoding(buf)
+    date_re, style_a_re = _bytes_patterns(encoding)[:2]
+    size = len(buf)
+
+    # 줄 경계가 b"\n"만이 아닌 파일은 str 파서로 한 번에 파싱한다 (parse_kakao_buffer 참고)
+    if _needs_text_parser(buf, encoding, 0, size):
+        return [(0, size, None)]
+
+    # 날짜 줄 위치와 날짜 (경계 후보 + 구간 시작 날짜 계산용)
+    date_offsets: List[int] = []
+    date_days: List[int] = []
+    for m in _DASH_LINE_SCAN.finditer(buf):
+        m_date = date_re.match(_line_at(buf, m.start()))
+        if m_date:
+            date_offsets.append(m.start())
+            date_days.append(
+                _epoch_day_minutes(int(m_date.group(1)), int(m_date.group(2)), int(m_date.group(3)))
+            )
+
+    boundaries = [0]
+    target = chunk_bytes
+    while target < size:
+        # target 이후 첫 줄 시작
+        nl = buf.find(b"\n", target - 1)
+        if nl == -1:
+            break
+        pos = nl + 1
+
+        # 다음 날짜 줄, 그 전에 스타일 A 헤더가 있으면 그 줄
+        i = bisect_left(date_offsets, pos)
+        boundary = date_offsets[i] if i < len(date_offsets) else size
+        for m in _DIGIT_LINE_SCAN.finditer(buf, pos, boundary):
+            if style_a_re.match(_line_at(buf, m.start())):
+                boundary = m.start()
+                break
+
+        if boundary >= size:
+            break
+        boundaries.append(boundary)
+        target = boundary + chunk_bytes
+
+    chunks: List[Tuple[int, int, Optional[int]]] = []
+    for k, start in enumerate(boundaries):
+        end = boundaries[k + 1] if k + 1 < len(boundaries) else size
+        j = bisect_left(date_offsets, start) - 1
+        chunks.append((start, end, date_days[j] if j >= 0 else None))
+    return chunks
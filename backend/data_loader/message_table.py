@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..util.time_utils import from_epoch_minutes, to_epoch_minutes
+
+# 텍스트 버퍼에서 메시지 사이 구분자 (raw_text를 복사 없이 만들기 위해 같이 저장)
+_TEXT_SEP = b"\n"
+
+# text_blocks()가 한 번에 디코딩하는 버퍼 크기 (bytes)
+TEXT_BLOCK_BYTES = 256 * 1024
+
+
+class MessageTable:
+    """
+    카카오톡 타임라인을 열(column) 단위로 저장하는 메시지 테이블.
+    메시지마다 dict / datetime / str 객체를 만들지 않고 배열 몇 개에 나눠 담는다.
+
+    - minutes: epoch 기준 분 (int64 배열)
+    - sender_codes: 발화자 코드 (int32 배열), sender_names[code] 가 이름
+    - text_buffer: 모든 메시지 텍스트를 UTF-8로 이어붙인 버퍼 (메시지마다 뒤에 "\\n")
+    - text_offsets: i번째 텍스트 시작 위치 (len + 1개, 마지막은 버퍼 끝)
+
+    텍스트는 읽을 때 디코딩한다 (bytes 파서가 검증 없이 넣은 깨진 바이트는 무시).
+    from_buffers()로 만든 테이블은 열이 mmap 위의 읽기 전용 memoryview라 append 할 수 없다 (chat_cache 참고).
+
+    파이프라인에서 만든 테이블은 시각 순으로 정렬되어 있다 (time_range()가 이를 가정).
+    """
+
+    def __init__(self) -> None:
+        self.minutes = array("q")
+        self.sender_codes = array("i")
+        self.text_offsets = array("q", [0])
+        self.text_buffer = bytearray()
+        self.sender_names: List[str] = []
+        self._sender_index: Dict[str, int] = {}
+
+    # ---------- 생성 ----------
+
+    def sender_code(self, sender: str) -> int:
+        """발화자 이름 → 코드 (처음 보는 이름이면 새로 등록)."""
+        code = self._sender_index.get(sender)
+        if code is None:
+            code = len(self.sender_names)
+            self._sender_index[sender] = code
+            self.sender_names.append(sender)
+        return code
+
+    def find_sender_code(self, sender: str) -> int:
+        """발화자 이름 → 코드 (없으면 -1)."""
+        return self._sender_index.get(sender, -1)
+
+    def append_encoded(self, minute: int, code: int, text: Union[bytes, memoryview]) -> None:
+        """이미 UTF-8로 인코딩된 텍스트를 디코딩 없이 그대로 추가 (code: sender_code() 값)."""
+        self.minutes.append(minute)
+        self.sender_codes.append(code)
+        self.text_buffer += text
+        self.text_buffer += _TEXT_SEP
+        self.text_offsets.append(len(self.text_buffer))
+
+    def append(self, minute: int, sender: str, text: str) -> None:
+        """메시지 하나 추가 (minute: epoch 기준 분)."""
+        self.append_encoded(minute, self.sender_code(sender), text.encode("utf-8"))
+
+    def append_message(self, msg: Dict[str, Any]) -> None:
+        """{"timestamp", "sender", "text"} 메시지 dict 하나 추가."""
+        self.append(int(to_epoch_minutes(msg["timestamp"])), msg["sender"], msg["text"])
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[Dict[str, Any]]) -> "MessageTable":
+        table = cls()
+        for msg in messages:
+            table.append_message(msg)
+        return table
+
+    @classmethod
+    def from_buffers(
+        cls,
+        minutes: Any,
+        sender_codes: Any,
+        text_offsets: Any,
+        text_buffer: Any,
+        sender_names: List[str],
+    ) -> "MessageTable":
+        """
+        이미 만들어진 열 버퍼로 테이블을 만든다 (복사 없음).
+        minutes / text_offsets는 int64, sender_codes는 int32 형식(memoryview.cast("q") 등)이어야 한다.
+        """
+        table = cls()
+        table.minutes = minutes
+        table.sender_codes = sender_codes
+        table.text_offsets = text_offsets
+        table.text_buffer = text_buffer
+        for name in sender_names:
+            table.sender_code(name)
+        return table
+
+    # ---------- 읽기 ----------
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    def text(self, i: int) -> str:
+        start, end = self.text_offsets[i], self.text_offsets[i + 1] - 1
+        return str(self.text_buffer[start:end], "utf-8", "ignore")
+
+    def sender(self, i: int) -> str:
+        return self.sender_names[self.sender_codes[i]]
+
+    def timestamp(self, i: int) -> datetime:
+        return from_epoch_minutes(self.minutes[i])
+
+    def iter_rows(self, rows: Optional[Iterable[int]] = None) -> Iterator[Tuple[int, int, str]]:
+        """
+        (epoch 분, 발화자 코드, 텍스트) 튜플을 순서대로 yield.
+        rows를 주면 그 행 번호들만 (MessageView용).
+        """
+        minutes = self.minutes
+        codes = self.sender_codes
+        offsets = self.text_offsets
+        buf = memoryview(self.text_buffer)
+        if rows is None:
+            rows = range(len(minutes))
+        for i in rows:
+            yield minutes[i], codes[i], str(buf[offsets[i]:offsets[i + 1] - 1], "utf-8", "ignore")
+
+    def iter_messages(self) -> Iterator[Dict[str, Any]]:
+        """기존 {"timestamp", "sender", "text"} dict 형태로 하나씩 (호환용, 필요할 때만)."""
+        names = self.sender_names
+        for minute, code, text in self.iter_rows():
+            yield {"timestamp": from_epoch_minutes(minute), "sender": names[code], "text": text}
+
+    def joined_text(self) -> str:
+        """모든 텍스트를 "\\n"으로 이어붙인 문자열 (기존 raw_text와 동일)."""
+        if not self.text_buffer:
+            return ""
+        return str(self.text_buffer[:-1], "utf-8", "ignore")
+
+    def text_blocks(self, block_bytes: int = TEXT_BLOCK_BYTES) -> Iterator[str]:
+        """
+        joined_text()를 메시지 경계에서 block_bytes 정도씩 나눈 조각들 (이어붙이면 joined_text()와 같음).
+        대화 전체 크기의 문자열을 만들지 않고 extract_text_features 등에 넘길 때 쓴다.
+        """
+        offsets = self.text_offsets
+        buf = self.text_buffer
+        n = len(self)
+        i = 0
+        while i < n:
+            # offsets[j] - offsets[i] >= block_bytes 인 첫 j (최소 한 메시지)
+            j = max(i + 1, min(n, bisect_left(offsets, offsets[i] + block_bytes, i + 1, n + 1)))
+            yield str(buf[offsets[i]:offsets[j] - 1], "utf-8", "ignore")
+            i = j
+
+    def sender_counts(self) -> Dict[str, int]:
+        """발화자별 메시지 수 (처음 등장한 순서)."""
+        counts = [0] * len(self.sender_names)
+        for code in self.sender_codes:
+            counts[code] += 1
+        return {name: counts[code] for code, name in enumerate(self.sender_names) if counts[code]}
+
+    # ---------- 정렬 / 병합 ----------
+
+    def is_time_sorted(self) -> bool:
+        m = self.minutes
+        return all(m[i] <= m[i + 1] for i in range(len(m) - 1))
+
+    def sorted_by_time(self) -> "MessageTable":
+        """시각 순으로 안정 정렬된 테이블 (이미 정렬돼 있으면 자기 자신)."""
+        if self.is_time_sorted():
+            return self
+        order = sorted(range(len(self)), key=self.minutes.__getitem__)
+        return MessageView(self, order).to_table()
+
+    def _raw_rows(self, rows: Iterable[int], code_map: Sequence[int]) -> Iterator[Tuple[int, int, memoryview]]:
+        """(epoch 분, 새 발화자 코드, 텍스트 UTF-8 조각) — 다른 테이블로 복사할 때 사용 (디코딩 없음)."""
+        minutes = self.minutes
+        codes = self.sender_codes
+        offsets = self.text_offsets
+        buf = memoryview(self.text_buffer)
+        for i in rows:
+            yield minutes[i], code_map[codes[i]], buf[offsets[i]:offsets[i + 1] - 1]
+
+    # ---------- 뷰 ----------
+
+    def view(self, rows: Optional[Union[range, Sequence[int]]] = None) -> "MessageView":
+        return MessageView(self, range(len(self)) if rows is None else rows)
+
+    def sender_rows(self, sender: str) -> "MessageView":
+        """특정 발화자(예: 나)의 메시지만 보는 뷰."""
+        code = self._sender_index.get(sender)
+        rows = array("q")
+        if code is not None:
+            rows.extend(i for i, c in enumerate(self.sender_codes) if c == code)
+        return MessageView(self, rows)
+
+    def time_range(
+        self,
+        start: Optional[Union[datetime, int]] = None,
+        end: Optional[Union[datetime, int]] = None,
+    ) -> "MessageView":
+        """start <= 시각 < end 구간 뷰 (datetime 또는 epoch 분, 정렬된 테이블 기준 이진 탐색)."""
+        lo = 0 if start is None else bisect_left(self.minutes, _as_minutes(start))
+        hi = len(self) if end is None else bisect_left(self.minutes, _as_minutes(end))
+        return MessageView(self, range(lo, max(lo, hi)))
+
+
+class MessageView:
+    """
+    MessageTable의 일부 행만 가리키는 뷰 (데이터는 복사하지 않음).
+    - rows: range(연속 구간) 또는 행 번호 배열
+    """
+
+    def __init__(self, table: MessageTable, rows: Union[range, Sequence[int]]) -> None:
+        self.table = table
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def iter_rows(self) -> Iterator[Tuple[int, int, str]]:
+        return self.table.iter_rows(self.rows)
+
+    def texts(self) -> Iterator[str]:
+        for _, _, text in self.iter_rows():
+            yield text
+
+    def joined_text(self) -> str:
+        rows = self.rows
+        table = self.table
+        # 연속 구간이면 버퍼를 그대로 잘라서 디코딩
+        if isinstance(rows, range) and rows.step == 1:
+            if not rows:
+                return ""
+            offsets = table.text_offsets
+            start, end = offsets[rows.start], offsets[rows.stop] - 1
+            return str(table.text_buffer[start:end], "utf-8", "ignore")
+        return "\n".join(self.texts())
+
+    def sender_rows(self, sender: str) -> "MessageView":
+        code = self.table._sender_index.get(sender)
+        codes = self.table.sender_codes
+        return MessageView(self.table, array("q", (i for i in self.rows if codes[i] == code)))
+
+    def to_table(self) -> MessageTable:
+        """뷰의 행들만 담은 새 테이블 (발화자 코드는 그대로 유지)."""
+        out = MessageTable()
+        for name in self.table.sender_names:
+            out.sender_code(name)
+        identity = range(len(self.table.sender_names))
+        for minute, code, text in self.table._raw_rows(self.rows, identity):
+            out.append_encoded(minute, code, text)
+        return out
+
+
+def merge_tables(tables: List[MessageTable]) -> MessageTable:
+    """
+    시각 순으로 정렬된 테이블들을 k-way merge로 하나의 테이블로 합친다.
+    같은 시각이면 앞 테이블의 메시지가 먼저 온다 (이어붙이고 안정 정렬한 것과 같음).
+    """
+    if len(tables) == 1:
+        return tables[0]
+
+    out = MessageTable()
+    streams = []
+    for table in tables:
+        code_map = [out.sender_code(name) for name in table.sender_names]
+        streams.append(table._raw_rows(range(len(table)), code_map))
+
+    for minute, code, text in heapq.merge(*streams, key=itemgetter(0)):
+        out.append_encoded(minute, code, text)
+    return out
+
+
+def _as_minutes(value: Union[datetime, int]) -> int:
+    if isinstance(value, datetime):
+        return int(to_epoch_minutes(value))
+    return value
+
+
+def concat_tables(tables: List[MessageTable]) -> MessageTable:
+    """
+    테이블들을 순서대로 이어붙인다 (한 파일을 구간별로 파싱한 결과 합치기용).
+    발화자 코드는 처음 등장한 순서대로 다시 매기고, 열은 배열 단위로 복사한다.
+    """
+    if len(tables) == 1:
+        return tables[0]
+
+    out = MessageTable()
+    for table in tables:
+        code_map = [out.sender_code(name) for name in table.sender_names]
+        out.minutes.extend(table.minutes)
+        if code_map == list(range(len(code_map))):
+            out.sender_codes.extend(table.sender_codes)
+        else:
+            out.sender_codes.extend(array("i", map(code_map.__getitem__, table.sender_codes)))
+        base = len(out.text_buffer)
+        out.text_buffer += table.text_buffer
+        out.text_offsets.extend(array("q", map(base.__add__, islice(table.text_offsets, 1, None))))
+    return out
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import csv
+import io
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..util.stream_utils import STREAM_CHUNK_SIZE, StreamSource, iter_json_array, read_head
+from ..util.time_utils import MONTH_ABBRS, local_epoch_minutes
+
+# SNS 내보내기 (인스타그램 / 트위터 형식 JSON, CSV) 스트리밍 파서.
+# 게시물을 하나씩 yield 해서 특징 계산 쪽 상태만큼만 메모리를 쓴다.
+
+# 타임존이 있는 시각(UTC epoch, "+0000" 등)을 카톡 시각(한국 시간)에 맞추기 위해 더하는 분 (기본 KST +9시간)
+# 타임존 없는 "2023-05-01 12:34" 같은 시각은 현지 시각으로 보고 그대로 쓴다.
+SNS_TZ_OFFSET_MINUTES = int(os.getenv("SNS_TZ_OFFSET_MINUTES", str(9 * 60)))
+
+# 게시물 본문 / 시각으로 볼 필드 이름 (앞에 있을수록 우선, CSV 헤더도 같은 이름으로 찾음)
+TEXT_FIELDS = ("full_text", "text", "caption", "content", "body", "message", "post", "title")
+TIME_FIELDS = ("created_at", "creation_timestamp", "timestamp", "taken_at", "date", "datetime", "time")
+
+_HASHTAG_PATTERN = re.compile(r"(?<![\w&])#(\w+)")
+_MENTION_PATTERN = re.compile(r"(?<![\w@])@([\w.]+)")
+
+
+class TagVocabulary:
+    """
+    해시태그 / 멘션 문자열 → 정수 ID (한 번만 저장).
+    같은 태그가 게시물마다 반복되어도 문자열은 하나만 들고, 게시물에는 ID 튜플만 남긴다.
+    해시태그는 "#태그", 멘션은 "@이름" 형태로 저장해서 ID 공간을 같이 쓴다.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, tag: str) -> int:
+        tag_id = self._ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.names)
+            self._ids[tag] = tag_id
+            self.names.append(tag)
+        return tag_id
+
+    def name(self, tag_id: int) -> str:
+        return self.names[tag_id]
+
+
+@lru_cache(maxsize=65536)
+def normalize_tag(tag: str) -> str:
+    """전각/반각, 대소문자 차이를 없앤 태그 (#Python / #ｐｙｔｈｏｎ / #python → python)."""
+    return unicodedata.normalize("NFKC", tag).casefold().strip("._")
+
+
+class SnsPost(NamedTuple):
+    """
+    게시물 한 건.
+    - text: 본문
+    - minute: epoch 기준 분 (현지 시각, 없으면 None)
+    - hashtag_ids / mention_ids: TagVocabulary ID (본문에 나온 순서, 중복 포함)
+    """
+
+    text: str
+    minute: Optional[int]
+    hashtag_ids: Tuple[int, ...]
+    mention_ids: Tuple[int, ...]
+
+
+def _make_post(text: str, minute: Optional[int], vocab: TagVocabulary) -> SnsPost:
+    intern = vocab.intern
+    hashtags: Tuple[int, ...] = ()
+    mentions: Tuple[int, ...] = ()
+    if "#" in text:
+        hashtags = tuple(
+            intern("#" + tag) for tag in map(normalize_tag, _HASHTAG_PATTERN.findall(text)) if tag
+        )
+    if "@" in text:
+        mentions = tuple(
+            intern("@" + name) for name in map(normalize_tag, _MENTION_PATTERN.findall(text)) if name
+        )
+    return SnsPost(text, minute, hashtags, mentions)
+
+
+# ---------- 시각 ----------
+
+# "2023-05-01T12:34:56Z" / "2023-05-01 12:34" / "+09:00"
+_ISO_TIME_PATTERN = re.compile(
+    r"^(\d{4})-(\d{1,2})-(\d{1,2})(?:[T ](\d{1,2}):(\d{2})(?::\d{2}(?:\.\d+)?)?)?\s*(Z|[+-]\d{2}:?\d{2})?$"
+)
+# 트위터: "Wed Oct 10 20:19:24 +0000 2018"
+_TWITTER_TIME_PATTERN = re.compile(
+    r"^[A-Za-z]{3} ([A-Za-z]{3}) (\d{1,2}) (\d{2}):(\d{2}):\d{2} ([+-]\d{4}) (\d{4})$"
+)
+
+
+def _tz_minutes(tz: str) -> int:
+    sign = -1 if tz[0] == "-" else 1
+    digits = tz[1:].replace(":", "")
+    return sign * (int(digits[:2]) * 60 + int(digits[2:]))
+
+
+def parse_sns_time(value: Any) -> Optional[int]:
+    """
+    게시 시각 → epoch 기준 분 (현지 시각).
+    - 숫자 / 숫자 문자열: UTC epoch 초 (1e11보다 크면 밀리초)
+    - ISO 형식 / 트위터 형식: 타임존이 있으면 UTC로 바꾼 뒤 SNS_TZ_OFFSET_MINUTES를 더함
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit():
+            value = int(value)
+    if isinstance(value, (int, float)):
+        seconds = value / 1000 if value > 1e11 else value
+        return int(seconds // 60) + SNS_TZ_OFFSET_MINUTES
+    if not isinstance(value, str):
+        return None
+
+    m = _ISO_TIME_PATTERN.match(value)
+    if m:
+        y, mo, d, h, mi, tz = m.groups()
+        minutes = local_epoch_minutes(int(y), int(mo), int(d), int(h or 0), int(mi or 0))
+        if minutes is None or not tz:
+            return minutes
+        return minutes - (0 if tz == "Z" else _tz_minutes(tz)) + SNS_TZ_OFFSET_MINUTES
+
+    m = _TWITTER_TIME_PATTERN.match(value)
+    if m:
+        mon, d, h, mi, tz, y = m.groups()
+        month = MONTH_ABBRS.get(mon.lower())
+        if month is None:
+            return None
+        minutes = local_epoch_minutes(int(y), month, int(d), int(h), int(mi))
+        if minutes is None:
+            return None
+        return minutes - _tz_minutes(tz) + SNS_TZ_OFFSET_MINUTES
+    return None
+
+
+# ---------- JSON ----------
+
+
+def _fix_mojibake(text: str) -> str:
+    """
+    인스타그램 JSON은 UTF-8 바이트를 글자 하나씩 "\\u00ec\\u0095..."로 적어서 한글이 깨져 보인다.
+    모든 글자가 latin-1 범위이고 UTF-8로 다시 읽히면 원래 글자로 되돌린다.
+    """
+    if not text or text.isascii():
+        return text
+    try:
+        return text.encode("latin-1").decode("utf-8")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return text
+
+
+def _first_field(entry: Dict[str, Any], fields: Tuple[str, ...]) -> Any:
+    for field in fields:
+        value = entry.get(field)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _json_post(entry: Any, vocab: TagVocabulary) -> Optional[SnsPost]:
+    """JSON 원소 하나 → SnsPost (본문이 없으면 None)."""
+    if not isinstance(entry, dict):
+        return None
+    # 트위터 아카이브: {"tweet": {...}}
+    if len(entry) == 1 and isinstance(entry.get("tweet"), dict):
+        entry = entry["tweet"]
+
+    text = _first_field(entry, TEXT_FIELDS)
+    when = _first_field(entry, TIME_FIELDS)
+    # 인스타그램 게시물: 본문 / 시각이 media[0]에 있는 경우
+    media = entry.get("media")
+    if isinstance(media, list) and media and isinstance(media[0], dict):
+        if text is None:
+            text = _first_field(media[0], TEXT_FIELDS)
+        if when is None:
+            when = _first_field(media[0], TIME_FIELDS)
+
+    if not isinstance(text, str) or not text.strip():
+        return None
+    return _make_post(_fix_mojibake(text), parse_sns_time(when), vocab)
+
+
+def iter_sns_json(
+    source: StreamSource,
+    vocab: TagVocabulary,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[SnsPost]:
+    """
+    게시물 배열 JSON을 원소 단위로 읽는다.
+    tweets.js("window.YTD.tweets.part0 = [ ... ]")나 {"posts": [ ... ]}처럼 감싼 형식은 처음 나오는 배열을 쓴다.
+    """
+    for entry in iter_json_array(source, chunk_size, find_array=True):
+        post = _json_post(entry, vocab)
+        if post is not None:
+            yield post
+
+
+# ---------- CSV ----------
+
+
+def _open_text(source: StreamSource) -> io.TextIOBase:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.TextIOWrapper(io.BytesIO(source), encoding="utf-8-sig", errors="replace", newline="")
+    if isinstance(source, str):
+        return open(source, encoding="utf-8-sig", errors="replace", newline="")
+    return io.TextIOWrapper(source, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _find_column(header: List[str], fields: Tuple[str, ...]) -> int:
+    names = [h.strip().lower() for h in header]
+    for field in fields:
+        if field in names:
+            return names.index(field)
+    return -1
+
+
+def iter_sns_csv(source: StreamSource, vocab: TagVocabulary) -> Iterator[SnsPost]:
+    """
+    헤더가 있는 CSV를 한 줄씩 읽는다 (본문 열은 TEXT_FIELDS, 시각 열은 TIME_FIELDS 이름으로 찾음).
+    """
+    f = _open_text(source)
+    try:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        text_col = _find_column(header, TEXT_FIELDS)
+        if text_col < 0:
+            raise ValueError(f"SNS CSV needs one of the columns {TEXT_FIELDS}")
+        time_col = _find_column(header, TIME_FIELDS)
+
+        for row in reader:
+            if text_col >= len(row) or not row[text_col].strip():
+                continue
+            when = row[time_col] if 0 <= time_col < len(row) else None
+            yield _make_post(row[text_col], parse_sns_time(when), vocab)
+    finally:
+        if isinstance(source, (bytes, bytearray, memoryview, str)):
+            f.close()
+        else:
+            # 호출자가 넘긴 파일 객체는 닫지 않는다
+            f.detach()
+
+
+# ---------- 형식 판별 ----------
+
+
+def sniff_sns_format(head: bytes) -> str:
+    """파일 앞부분으로 "json" / "csv" 판별 (JSON처럼 시작하지 않으면 CSV로 봄)."""
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if text[:1] in (b"[", b"{") or text.startswith(b"window."):
+        return "json"
+    return "csv"
+
+
+def iter_sns_posts(
+    source: StreamSource,
+    fmt: Optional[str] = None,
+    vocab: Optional[TagVocabulary] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[SnsPost]:
+    """
+    SNS 내보내기를 SnsPost로 하나씩 yield 한다.
+    - fmt: "json" / "csv" (없으면 앞부분으로 판별)
+    - vocab: 해시태그 / 멘션 ID를 등록할 사전 (상위 해시태그 이름을 보려면 extract_sns_features에 같이 넘김)
+    """
+    if vocab is None:
+        vocab = TagVocabulary()
+    if fmt is None:
+        fmt = sniff_sns_format(read_head(source))
+    if fmt == "json":
+        return iter_sns_json(source, vocab, chunk_size)
+    if fmt == "csv":
+        return iter_sns_csv(source, vocab)
+    raise ValueError(f"unknown SNS export format: {fmt!r}")
+
+
+def parse_sns_export(source: StreamSource, fmt: Optional[str] = None) -> Dict[str, Any]:
+    """
+    게시물 전체를 리스트로 (작은 파일 / 디버그용).
+    큰 파일은 iter_sns_posts를 extract_sns_features에 바로 넘기는 편이 메모리를 덜 쓴다.
+    """
+    vocab = TagVocabulary()
+    posts = list(iter_sns_posts(source, fmt, vocab))
+    return {"posts": posts, "vocab": vocab, "meta": {"post_count": len(posts), "tag_count": len(vocab)}}
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import html
+import os
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+from ..util.stream_utils import STREAM_CHUNK_SIZE, StreamSource, TextStream, iter_json_array, read_head
+from ..util.time_utils import MONTH_ABBRS, local_epoch_minutes
+
+# Google Takeout 시청 기록 (watch-history.json / watch-history.html) 스트리밍 파서.
+# 파일이 50~200MB까지 커지므로 json.load / DOM 없이 청크 단위로 읽으면서 항목을 하나씩 yield 한다.
+
+# 한 번에 읽는 크기
+YOUTUBE_CHUNK_SIZE = STREAM_CHUNK_SIZE
+
+# JSON의 "time"은 UTC라서 카톡 시각(한국 시간, 타임존 없음)과 맞추기 위해 더하는 분 (기본 KST +9시간)
+# HTML 시각은 내보낸 사람의 현지 시각으로 적혀 있어서 그대로 쓴다.
+YOUTUBE_TZ_OFFSET_MINUTES = int(os.getenv("YOUTUBE_TZ_OFFSET_MINUTES", str(9 * 60)))
+
+# 시청 기록 입력: bytes, 파일 경로, 또는 바이너리 파일 객체
+YoutubeSource = StreamSource
+
+
+class WatchRecord(NamedTuple):
+    """
+    시청 기록 한 건.
+    - title: 영상 제목 ("Watched ..." / "... 을(를) 시청했습니다." 문구는 뗌)
+    - channel: 채널 이름 (삭제된 영상 등은 None)
+    - minute: epoch 기준 분 (현지 시각, 시각을 못 읽으면 None)
+    """
+
+    title: str
+    channel: Optional[str]
+    minute: Optional[int]
+
+
+# 제목 앞뒤의 "시청함" 문구 (영어 / 한국어 Takeout)
+_TITLE_PREFIXES = ("Watched ",)
+_TITLE_SUFFIXES = (" 을(를) 시청했습니다.", "을(를) 시청했습니다.")
+
+# 광고로 본 영상 표시 (details)
+_AD_MARKERS = ("Google Ads", "Google 광고")
+
+
+def _clean_title(title: str) -> str:
+    title = title.strip()
+    for prefix in _TITLE_PREFIXES:
+        if title.startswith(prefix):
+            title = title[len(prefix):]
+    for suffix in _TITLE_SUFFIXES:
+        if title.endswith(suffix):
+            title = title[: -len(suffix)]
+            break
+    return title.strip()
+
+
+# ---------- JSON ----------
+
+# "2023-05-01T12:34:56.789Z" / "+09:00" 오프셋
+_ISO_TIME_PATTERN = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2})(?::\d{2}(?:\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?$"
+)
+
+
+def _parse_iso_minutes(value: str) -> Optional[int]:
+    """Takeout JSON "time" → 현지 기준 epoch 분 (UTC + YOUTUBE_TZ_OFFSET_MINUTES)."""
+    m = _ISO_TIME_PATTERN.match(value or "")
+    if not m:
+        return None
+    y, mo, d, h, mi, tz = m.groups()
+    minutes = local_epoch_minutes(int(y), int(mo), int(d), int(h), int(mi))
+    if minutes is None:
+        return None
+    if tz and tz != "Z":
+        sign = -1 if tz[0] == "-" else 1
+        digits = tz[1:].replace(":", "")
+        minutes -= sign * (int(digits[:2]) * 60 + int(digits[2:]))
+    return minutes + YOUTUBE_TZ_OFFSET_MINUTES
+
+
+def _json_record(entry: Any) -> Optional[WatchRecord]:
+    """JSON 항목 하나 → WatchRecord (광고 / 제목 없는 항목은 None)."""
+    if not isinstance(entry, dict) or not entry.get("title"):
+        return None
+    details = entry.get("details")
+    if details and any(marker in str(details) for marker in _AD_MARKERS):
+        return None
+
+    channel = None
+    subtitles = entry.get("subtitles") or []
+    if subtitles and isinstance(subtitles[0], dict):
+        channel = subtitles[0].get("name") or None
+    return WatchRecord(_clean_title(str(entry["title"])), channel, _parse_iso_minutes(entry.get("time", "")))
+
+
+def iter_youtube_json(source: YoutubeSource, chunk_size: int = YOUTUBE_CHUNK_SIZE) -> Iterator[WatchRecord]:
+    """watch-history.json (최상위 배열)을 항목 단위로 읽는다 (메모리는 청크 + 항목 하나 크기)."""
+    for entry in iter_json_array(source, chunk_size):
+        record = _json_record(entry)
+        if record is not None:
+            yield record
+
+
+# ---------- HTML ----------
+
+# 항목 하나 = outer-cell div 하나. 그 안의 첫 content-cell에 제목 / 채널 / 시각이 <br>로 구분되어 있다.
+_HTML_ENTRY_MARKER = 'class="outer-cell'
+_HTML_CONTENT_PATTERN = re.compile(r'<div class="content-cell[^"]*">(.*?)</div>', re.S)
+_HTML_ANCHOR_PATTERN = re.compile(r"<a\s[^>]*>(.*?)</a>", re.S)
+_HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+_HTML_BR_PATTERN = re.compile(r"<br\s*/?>")
+
+# "Jan 1, 2023, 12:34:56 PM KST" / "1 Jan 2023, 12:34:56 KST" (영어)
+_EN_TIME_PATTERN = re.compile(
+    r"(?:([A-Za-z]{3})[a-z]*\.? (\d{1,2})|(\d{1,2}) ([A-Za-z]{3})[a-z]*\.?),? (\d{4}),? "
+    r"(\d{1,2}):(\d{2})(?::\d{2})?\s*([AaPp][Mm])?"
+)
+# "2023. 5. 1. 오후 12:34:56 KST" (한국어)
+_KO_TIME_PATTERN = re.compile(
+    r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.?\s*(오전|오후)?\s*(\d{1,2}):(\d{2})"
+)
+
+
+def _parse_html_minutes(value: str) -> Optional[int]:
+    """HTML 시각 문구 → epoch 분 (현지 시각 그대로, 타임존 약어는 무시)."""
+    m = _KO_TIME_PATTERN.search(value)
+    if m:
+        y, mo, d, ampm, h, mi = m.groups()
+        hour = int(h)
+        pm = ampm == "오후"
+        am = ampm == "오전"
+    else:
+        m = _EN_TIME_PATTERN.search(value)
+        if not m:
+            return None
+        mon_a, day_a, day_b, mon_b, y, h, mi, ampm = m.groups()
+        month = MONTH_ABBRS.get((mon_a or mon_b).lower())
+        if month is None:
+            return None
+        mo, d = month, (day_a or day_b)
+        hour = int(h)
+        pm = bool(ampm) and ampm.lower() == "pm"
+        am = bool(ampm) and ampm.lower() == "am"
+    if pm and hour != 12:
+        hour += 12
+    if am and hour == 12:
+        hour = 0
+    return local_epoch_minutes(int(y), int(mo), int(d), hour, int(mi))
+
+
+def _html_text(fragment: str) -> str:
+    # 새 Takeout은 시각의 AM/PM 앞에 좁은 공백(U+202F)을 쓴다
+    return html.unescape(_HTML_TAG_PATTERN.sub("", fragment)).replace("\u202f", " ").replace("\xa0", " ").strip()
+
+
+def _html_record(entry: str) -> Optional[WatchRecord]:
+    """outer-cell 하나 → WatchRecord (광고 / 내용 없는 항목은 None)."""
+    if any(marker in entry for marker in _AD_MARKERS):
+        return None
+    m = _HTML_CONTENT_PATTERN.search(entry)
+    if not m:
+        return None
+    parts = [p for p in _HTML_BR_PATTERN.split(m.group(1)) if p.strip()]
+    if not parts:
+        return None
+
+    anchor = _HTML_ANCHOR_PATTERN.search(parts[0])
+    title = _html_text(anchor.group(1)) if anchor else _clean_title(_html_text(parts[0]))
+    channel = None
+    if len(parts) >= 3:
+        channel_anchor = _HTML_ANCHOR_PATTERN.search(parts[1])
+        channel = _html_text(channel_anchor.group(1) if channel_anchor else parts[1]) or None
+    minute = _parse_html_minutes(_html_text(parts[-1])) if len(parts) >= 2 else None
+    if not title:
+        return None
+    return WatchRecord(title, channel, minute)
+
+
+def iter_youtube_html(source: YoutubeSource, chunk_size: int = YOUTUBE_CHUNK_SIZE) -> Iterator[WatchRecord]:
+    """
+    watch-history.html을 outer-cell 경계로 잘라가며 읽는다 (DOM을 만들지 않음).
+    다음 항목 시작이 보일 때까지만 버퍼에 모으므로 메모리는 청크 + 항목 하나 크기.
+    """
+    stream = TextStream(source, chunk_size)
+    start = -1
+    while True:
+        buf = stream.buf
+        if start < 0:
+            start = buf.find(_HTML_ENTRY_MARKER, stream.pos)
+            if start < 0:
+                # 마커가 청크 경계에 걸렸을 수 있으므로 끝부분만 남긴다
+                stream.pos = max(stream.pos, len(buf) - len(_HTML_ENTRY_MARKER))
+                if not stream.more():
+                    return
+                continue
+        nxt = buf.find(_HTML_ENTRY_MARKER, start + len(_HTML_ENTRY_MARKER))
+        if nxt < 0:
+            stream.pos = start
+            if stream.more():
+                start = 0
+                continue
+            nxt = len(buf)
+        record = _html_record(buf[start:nxt])
+        if record is not None:
+            yield record
+        start = nxt if nxt < len(buf) else -1
+        stream.pos = nxt
+
+
+# ---------- 형식 판별 ----------
+
+
+def sniff_youtube_format(head: bytes) -> Optional[str]:
+    """파일 앞부분으로 "json" / "html" 판별 (둘 다 아니면 None)."""
+    text = head.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if text[:1] in (b"[", b"{"):
+        return "json"
+    lowered = text[:4096].lower()
+    if lowered.startswith(b"<!doctype html") or lowered.startswith(b"<html") or b"outer-cell" in lowered:
+        return "html"
+    return None
+
+
+def iter_youtube_history(
+    source: YoutubeSource,
+    fmt: Optional[str] = None,
+    chunk_size: int = YOUTUBE_CHUNK_SIZE,
+) -> Iterator[WatchRecord]:
+    """
+    JSON / HTML 시청 기록을 WatchRecord로 하나씩 yield 한다.
+    fmt가 없으면 앞부분으로 판별 (파일 객체는 판별하려면 seek 가능해야 함).
+    """
+    if fmt is None:
+        fmt = sniff_youtube_format(read_head(source))
+    if fmt == "json":
+        return iter_youtube_json(source, chunk_size)
+    if fmt == "html":
+        return iter_youtube_html(source, chunk_size)
+    raise ValueError("not a YouTube watch history file (expected JSON or HTML)")
+
+
+def parse_youtube_history(source: YoutubeSource, fmt: Optional[str] = None) -> Dict[str, Any]:
+    """
+    시청 기록 전체를 리스트로 (작은 파일 / 디버그용).
+    큰 파일은 iter_youtube_history를 extract_youtube_features에 바로 넘기는 편이 메모리를 덜 쓴다.
+    """
+    records: List[WatchRecord] = list(iter_youtube_history(source, fmt))
+    return {"records": records, "meta": {"record_count": len(records)}}
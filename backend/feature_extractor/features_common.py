@@ -1,8 +1,45 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Tuple, Union
 import re
 
+from .keyword_matcher import KeywordMatcher
+
+FIRST_PERSON_WORDS = [
+    "나", "내가", "난", "나는", "저", "제가",
+    "i", "me", "my", "mine",
+]
+
+POSITIVE_WORDS = [
+    "좋다", "좋아", "행복", "재밌", "재미있", "사랑", "기쁘", "즐겁", "설렌",
+    "happy", "love", "good", "great", "awesome", "fun",
+]
+NEGATIVE_WORDS = [
+    "싫", "짜증", "화나", "불안", "우울", "힘들", "어렵", "슬프", "미워",
+    "sad", "angry", "anxious", "tired", "depress",
+]
+
+# 1인칭/긍정/부정 어휘를 토큰당 한 번에 검사하는 오토마톤
+_LEXICON_MATCHER = KeywordMatcher(
+    {
+        "first_person": FIRST_PERSON_WORDS,
+        "positive": POSITIVE_WORDS,
+        "negative": NEGATIVE_WORDS,
+    }
+)
+_FIRST_PERSON_BIT = _LEXICON_MATCHER.group_bit("first_person")
+_POSITIVE_BIT = _LEXICON_MATCHER.group_bit("positive")
+_NEGATIVE_BIT = _LEXICON_MATCHER.group_bit("negative")
+
+# 서로 다른 토큰 분류 결과 캐시 크기 (채팅 어휘는 반복이 매우 많음)
+TOKEN_CACHE_SIZE = 200_000
+
+# add_texts()가 메시지들을 "\n"으로 묶어 한 번에 처리하는 단위 (글자 수)
+# 메시지마다 정규식을 따로 돌리는 비용은 피하고, 대화 전체 크기의 문자열 / 토큰 리스트는 만들지 않는다
+TEXT_BLOCK_CHARS = 64 * 1024
+
 
 def _split_sentences(text: str) -> List[str]:
     raw_sentences = re.split(r"[\.!\?\n]+", text)
@@ -16,67 +53,131 @@ def _tokenize(text: str) -> List[str]:
     return tokens
 
 
-def extract_text_features(text: str) -> Dict[str, Any]:
+@lru_cache(maxsize=TOKEN_CACHE_SIZE)
+def _classify_token(token: str) -> int:
+    """
+    토큰 하나가 1인칭/긍정/부정 어휘를 "포함"하는지 bitmask로 반환.
+    (기존 fp == t or fp in t / p in t 검사와 동일한 부분 문자열 의미)
+    """
+    mask, _ = _LEXICON_MATCHER.scan(token)
+    return mask
+
+
+def _lexicon_counts(tokens: Iterable[str]) -> Tuple[int, int, int]:
+    """
+    토큰들 중 1인칭/긍정/부정 어휘가 들어간 토큰 수를 센다.
+    같은 토큰은 한 번만 분류하고 등장 횟수를 곱해서 더한다.
+    """
+    first_person_count = 0
+    pos_count = 0
+    neg_count = 0
+    for token, cnt in Counter(tokens).items():
+        mask = _classify_token(token)
+        if not mask:
+            continue
+        if mask & _FIRST_PERSON_BIT:
+            first_person_count += cnt
+        if mask & _POSITIVE_BIT:
+            pos_count += cnt
+        if mask & _NEGATIVE_BIT:
+            neg_count += cnt
+    return first_person_count, pos_count, neg_count
+
+
+class TextFeatureAccumulator:
+    """
+    extract_text_features의 개수들(단어/문장/1인칭/긍정/부정/물음표/느낌표)을 누적한다.
+    "\n"으로 이어붙인 텍스트를 나눠서 add() 해도 한 번에 넣은 것과 결과가 같다
+    (문장/토큰이 줄바꿈에서 항상 끊기므로) → 새 메시지만 이어서 누적할 수 있다.
+    """
+
+    def __init__(self) -> None:
+        self.word_count = 0
+        self.sentence_count = 0
+        self.first_person_count = 0
+        self.pos_count = 0
+        self.neg_count = 0
+        self.question_mark_count = 0
+        self.exclamation_mark_count = 0
+
+    def add(self, text: str) -> None:
+        original_text = text
+        text = text.strip()
+
+        sentences = _split_sentences(text)
+        tokens = _tokenize(text)
+
+        first_person_count, pos_count, neg_count = _lexicon_counts(tokens)
+
+        self.word_count += len(tokens)
+        self.sentence_count += len(sentences)
+        self.first_person_count += first_person_count
+        self.pos_count += pos_count
+        self.neg_count += neg_count
+        self.question_mark_count += original_text.count("?")
+        self.exclamation_mark_count += original_text.count("!")
+
+    def add_texts(self, texts: Iterable[str], block_chars: int = TEXT_BLOCK_CHARS) -> None:
+        """
+        메시지 텍스트들을 순서대로 누적한다 ("\n"으로 이어붙여 add() 한 것과 같은 결과).
+        block_chars 글자 정도씩 묶어서 add() 하므로 메모리는 블록 크기만큼만 쓴다.
+        """
+        block: List[str] = []
+        size = 0
+        for text in texts:
+            block.append(text)
+            size += len(text) + 1
+            if size >= block_chars:
+                self.add("\n".join(block))
+                block = []
+                size = 0
+        if block:
+            self.add("\n".join(block))
+
+    def to_features(self) -> Dict[str, Any]:
+        word_count = self.word_count
+        sentence_count = self.sentence_count
+        avg_sentence_len = word_count / sentence_count if sentence_count > 0 else 0.0
+
+        def ratio(count: int, base: int) -> float:
+            if base <= 0:
+                return 0.0
+            return count / base
+
+        first_person_ratio = ratio(self.first_person_count, word_count)
+        question_ratio = ratio(self.question_mark_count, max(1, sentence_count))
+        exclamation_ratio = ratio(self.exclamation_mark_count, max(1, sentence_count))
+        positive_ratio = ratio(self.pos_count, max(1, word_count))
+        negative_ratio = ratio(self.neg_count, max(1, word_count))
+
+        features: Dict[str, Any] = {
+            "word_count": word_count,
+            "sentence_count": sentence_count,
+            "avg_sentence_len": avg_sentence_len,
+            "first_person_ratio": first_person_ratio,
+            "question_ratio": question_ratio,
+            "exclamation_ratio": exclamation_ratio,
+            "positive_ratio": positive_ratio,
+            "negative_ratio": negative_ratio,
+        }
+
+        return features
+
+
+def extract_text_features(text: Union[str, Iterable[str]]) -> Dict[str, Any]:
     """
     순수 텍스트에서 공통적으로 쓸 수 있는 언어 패턴 특징 추출.
     (카톡, SNS, 유튜브 제목 합쳐서 텍스트로 만들 때 공용으로 사용 가능)
-    """
-    original_text = text
-    text = text.strip()
-
-    sentences = _split_sentences(text)
-    tokens = _tokenize(text)
-
-    word_count = len(tokens)
-    sentence_count = len(sentences)
-    avg_sentence_len = word_count / sentence_count if sentence_count > 0 else 0.0
-
-    first_person_words = [
-        "나", "내가", "난", "나는", "저", "제가",
-        "i", "me", "my", "mine",
-    ]
-    first_person_count = sum(
-        1 for t in tokens if any(fp == t or fp in t for fp in first_person_words)
-    )
-
-    question_mark_count = original_text.count("?")
-    exclamation_mark_count = original_text.count("!")
-
-    positive_words = [
-        "좋다", "좋아", "행복", "재밌", "재미있", "사랑", "기쁘", "즐겁", "설렌",
-        "happy", "love", "good", "great", "awesome", "fun",
-    ]
-    negative_words = [
-        "싫", "짜증", "화나", "불안", "우울", "힘들", "어렵", "슬프", "미워",
-        "sad", "angry", "anxious", "tired", "depress",
-    ]
-
-    pos_count = sum(1 for t in tokens if any(p in t for p in positive_words))
-    neg_count = sum(1 for t in tokens if any(n in t for n in negative_words))
-
-    def ratio(count: int, base: int) -> float:
-        if base <= 0:
-            return 0.0
-        return count / base
-
-    first_person_ratio = ratio(first_person_count, word_count)
-    question_ratio = ratio(question_mark_count, max(1, sentence_count))
-    exclamation_ratio = ratio(exclamation_mark_count, max(1, sentence_count))
-    positive_ratio = ratio(pos_count, max(1, word_count))
-    negative_ratio = ratio(neg_count, max(1, word_count))
-
-    features: Dict[str, Any] = {
-        "word_count": word_count,
-        "sentence_count": sentence_count,
-        "avg_sentence_len": avg_sentence_len,
-        "first_person_ratio": first_person_ratio,
-        "question_ratio": question_ratio,
-        "exclamation_ratio": exclamation_ratio,
-        "positive_ratio": positive_ratio,
-        "negative_ratio": negative_ratio,
-    }
 
-    return features
+    text: 문자열 하나, 또는 메시지 텍스트 iterable
+    (iterable이면 "\n"으로 이어붙인 문자열과 같은 결과를 이어붙이지 않고 블록 단위로 계산)
+    """
+    acc = TextFeatureAccumulator()
+    if isinstance(text, str):
+        acc.add(text)
+    else:
+        acc.add_texts(text)
+    return acc.to_features()
 
 
 # 옛 이름 유지 (혹시 CLI 코드 등에서 쓰고 있을 경우를 위해)
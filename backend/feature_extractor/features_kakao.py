@@ -1,9 +1,21 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Union
 import re
 
+import numpy as np
+
+from ..data_loader.message_table import MessageTable
+from ..util.time_utils import to_epoch_minutes
+from .frequency import ExactCounter, make_frequency_counter
+from .keyword_matcher import KeywordMatcher
+from .temporal_features import (
+    MAX_REPLY_MINUTES,
+    extract_temporal_features,
+    extract_temporal_features_by_sender,
+)
+
 # 욕설 / 강한 표현 (과제/연구용으로만 사용)
 SWEAR_WORDS = [
     "시발", "씨발", "ㅅㅂ", "ㅆㅂ", "ㅂㅅ", "병신", "븅신", "존나",
@@ -31,8 +43,34 @@ TOPIC_KEYWORDS = {
     "romance": ["연애", "소개팅", "데이트", "남친", "여친", "썸"],
 }
 
+# 이모티콘/반응 패턴 (ㅋㅋ 와 ㅋ 처럼 겹치는 패턴도 각각 따로 센다)
+EMO_PATTERNS = ["ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅠ", "ㅜㅜ", "ㅜ", "^^", "❤️", "♥", "ㅋ", "ㅎ"]
+
+# 욕설/게임/주제 키워드 + 이모티콘 패턴을 한 번에 훑는 오토마톤 (import 시 한 번 생성)
+_KAKAO_MATCHER = KeywordMatcher(
+    {
+        "swear": SWEAR_WORDS,
+        "game": GAME_WORDS,
+        **{f"topic_{topic}": keywords for topic, keywords in TOPIC_KEYWORDS.items()},
+    },
+    counted=EMO_PATTERNS,
+)
+_SWEAR_BIT = _KAKAO_MATCHER.group_bit("swear")
+_GAME_BIT = _KAKAO_MATCHER.group_bit("game")
+_TOPIC_BITS = [(topic, _KAKAO_MATCHER.group_bit(f"topic_{topic}")) for topic in TOPIC_KEYWORDS]
+
+# "내가 자주 쓰는 말" 예시 개수
+MAX_COMMON_SAMPLES = 5
+
 
 def _get_time_bucket(dt: datetime) -> str:
+    """
+    대략적인 활동 시간대 버킷 (datetime 버전).
+    """
+    return _get_hour_bucket(dt.hour)
+
+
+def _get_hour_bucket(h: int) -> str:
     """
     대략적인 활동 시간대 버킷:
     - night : 00~06시
@@ -40,7 +78,6 @@ def _get_time_bucket(dt: datetime) -> str:
     - afternoon : 12~18시
     - evening : 18~24시
     """
-    h = dt.hour
     if 0 <= h < 6:
         return "night"
     if 6 <= h < 12:
@@ -74,291 +111,506 @@ def _tokenize_basic(text: str) -> List[str]:
     return tokens
 
 
-def extract_kakao_features(parsed: Dict[str, Any]) -> Dict[str, Any]:
+def _is_sample_text(text: str) -> bool:
+    """"내가 자주 쓰는 말" 예시로 쓸 수 있는 메시지인지."""
+    # 🔥 Kakao 내보내기에서 이모티콘은 "이모티콘" 같은 텍스트로 들어오므로 걸러준다
+    if "이모티콘" in text:
+        return False
+    # 너무 짧은 건 제외
+    return len(text.strip()) >= 2
+
+
+def _ratio(count: float, base: int) -> float:
+    return count / base if base > 0 else 0.0
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """정렬된 값에서 q(0~1) 분위수 (구간 선형 보간, numpy 기본 방식과 동일)."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    frac = pos - lo
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * frac
+
+
+def reply_latency_stats(
+    reply_deltas: List[float],
+    partner_sums: Dict[str, float],
+    partner_counts: Dict[str, int],
+) -> Dict[str, Any]:
     """
-    카카오톡 파싱 결과(dict)를 받아,
-    - 발화자 비율
-    - 야행성 비율
-    - 질문/감탄/이모티콘 비율
-    - 욕설/게임 관련 대화 비율
-    - 평균 답장 시간(분)
-    - ✅ 내가 쓴 단어 수 / 방 전체 단어 수
-    - ✅ 시간대별 활동 비율, 상위 단어/이모티콘, 샘플 메시지
-    등을 계산한다.
+    답장 간격(분) 목록으로 답장 시간 분포 특징을 만든다.
+    - avg_reply_minutes: 평균 (기존 특징)
+    - reply_count: 답장으로 인정된 횟수
+    - reply_minutes_median / reply_minutes_p90: 중앙값 / 90분위
+    - reply_minutes_by_partner: 상대(답장한 메시지의 발화자)별 평균 답장 시간
     """
-    messages: List[Dict[str, Any]] = parsed.get("messages", [])
-    meta = parsed.get("meta", {})
-    user_sender = meta.get("user_sender")
+    if reply_deltas:
+        avg_reply_minutes = sum(reply_deltas) / len(reply_deltas)
+    else:
+        avg_reply_minutes = 0.0
 
-    total_messages = len(messages)
-    if total_messages == 0:
-        return {
-            "kakao_message_count": 0,
-            "kakao_sender_count": 0,
-            # 단어 수 0으로 세팅 (안전)
-            "word_count": 0,
-            "user_word_count": 0,
-            "room_word_count": 0,
-        }
+    ordered = sorted(reply_deltas)
+    return {
+        "avg_reply_minutes": avg_reply_minutes,
+        "reply_count": len(reply_deltas),
+        "reply_minutes_median": _percentile(ordered, 0.5),
+        "reply_minutes_p90": _percentile(ordered, 0.9),
+        "reply_minutes_by_partner": {
+            partner: partner_sums[partner] / cnt for partner, cnt in partner_counts.items()
+        },
+    }
 
-    # 발화자별 개수
-    sender_counts: Dict[str, int] = {}
-    for msg in messages:
-        s = msg["sender"]
-        sender_counts[s] = sender_counts.get(s, 0) + 1
 
-    # 가장 많이 말한 사람을 user로 가정 (fallback)
-    if not user_sender:
-        user_sender = max(sender_counts, key=sender_counts.get)
+class KakaoFeatureAccumulator:
+    """
+    카카오톡 타임라인을 "한 번만" 순회하면서 모든 카톡 특징을 누적하는 accumulator.
 
-    user_msgs = [m for m in messages if m["sender"] == user_sender]
-    other_msgs = [m for m in messages if m["sender"] != user_sender]
+    - 방 전체: 메시지 수, 단어 수, (필요하면) 발화자별 메시지 수
+    - 내 메시지: 시간대 버킷, 질문/감탄/이모티콘, 욕설/게임, 주제, 단어/이모티콘 빈도, 샘플
+    - 답장 시간: 내가 아직 답하지 않은 상대 메시지 시각을 모아두었다가
+      내 메시지가 나오면 한꺼번에 답장 간격을 계산한다.
+      상대 메시지마다 "다음 내 메시지"를 앞으로 찾아가는 대신,
+      대기 목록이 다음 내 메시지에서 한 번만 비워지므로 전체 O(n).
 
-    user_msg_count = len(user_msgs)
-    user_msg_ratio = user_msg_count / total_messages if total_messages > 0 else 0.0
+    add()는 datetime 대신 (시각의 hour, epoch 분) 값을 받으므로
+    dict 메시지가 아닌 다른 저장 형태에서도 그대로 사용할 수 있다.
 
-    # ✅ 단어 수: 내 메시지 기준 + 방 전체 기준
-    user_word_count = sum(_count_words(m["text"]) for m in user_msgs)
-    room_word_count = sum(_count_words(m["text"]) for m in messages)
+    track_replies=False면 답장 시간은 누적하지 않는다
+    (MessageTable 경로에서 temporal_features가 배열로 한 번에 계산).
+    """
 
-    # 평균 글자 수 (내 메시지 기준)
-    if user_msg_count > 0:
-        avg_user_len = sum(len(m["text"]) for m in user_msgs) / user_msg_count
-    else:
-        avg_user_len = 0.0
-
-    # 시간대/샘플/상위 단어/이모티콘 집계용
-    bucket_counts = {"night": 0, "morning": 0, "afternoon": 0, "evening": 0}
-    night_samples: List[str] = []
-    game_samples: List[str] = []
-    word_freq: Dict[str, int] = {}
-    emoji_freq: Dict[str, int] = {}
-
-    # 야행성 비율 (자기 메시지 중 밤/심야 비율)
-    night_count = 0
-
-    # 질문/감탄/이모티콘/욕설/게임 관련 비율
-    def is_question(text: str) -> bool:
-        return "?" in text
-
-    def is_exclamation(text: str) -> bool:
-        return "!" in text
-
-    EMO_PATTERNS = ["ㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅠ", "ㅜㅜ", "ㅜ", "^^", "❤️", "♥", "ㅋ", "ㅎ"]
-
-    def emoji_like_ratio(text: str) -> float:
-        if not text:
-            return 0.0
-        count = 0
-        for p in EMO_PATTERNS:
-            count += text.count(p)
-        # 너무 많이 나와도 최대 1.0까지만
-        return min(1.0, count / max(1, len(text)))
-
-    def contains_any(text: str, patterns: List[str]) -> bool:
-        return any(p in text for p in patterns)
-
-    q_cnt = 0
-    e_cnt = 0
-    emoji_ratios: List[float] = []
-    swear_msg_cnt = 0
-    game_msg_cnt = 0
-    night_game_msg_cnt = 0
-    topic_counts = {topic: 0 for topic in TOPIC_KEYWORDS}
-
-    for m in user_msgs:
-        t = m["text"]
-        bucket = _get_time_bucket(m["timestamp"])
-        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + 1
-
-        # 야간 메시지 카운트
-        if bucket == "night":
-            night_count += 1
-            if len(night_samples) < 3 and t:
-                night_samples.append(t)
+    def __init__(
+        self,
+        user_sender: str,
+        sender_counts: Optional[Dict[str, int]] = None,
+        track_replies: bool = True,
+    ) -> None:
+        self.user_sender = user_sender
+        self.track_replies = track_replies
+
+        # 파서가 이미 센 발화자 수가 있으면 그대로 쓰고, 없으면 순회하면서 센다.
+        self._count_senders = sender_counts is None
+        self.sender_counts: Dict[str, int] = {} if sender_counts is None else sender_counts
+
+        # 방 전체
+        self.total_messages = 0
+        self.room_word_count = 0
+
+        # 내 메시지
+        self.user_msg_count = 0
+        self.user_word_count = 0
+        self.user_char_count = 0
+        self.user_texts: List[str] = []
+
+        self.bucket_counts = {"night": 0, "morning": 0, "afternoon": 0, "evening": 0}
+        self.night_samples: List[str] = []
+        self.game_samples: List[str] = []
+        # 단어 종류는 대화가 길수록 끝없이 늘어나므로 메모리 상한이 있는 빈도표 (FREQ_BACKEND)
+        self.word_freq = make_frequency_counter()
+        # 이모티콘/반응은 EMO_PATTERNS 개수로 정해져 있어서 정확히 센다
+        self.emoji_freq = ExactCounter()
+
+        self.q_cnt = 0
+        self.e_cnt = 0
+        self.emoji_ratio_sum = 0.0
+        self.swear_msg_cnt = 0
+        self.game_msg_cnt = 0
+        self.night_game_msg_cnt = 0
+        self.topic_counts = {topic: 0 for topic in TOPIC_KEYWORDS}
+
+        # 답장 시간 (other -> user)
+        # - pending_*: 마지막 내 메시지 이후 아직 답하지 않은 상대 메시지 (시각, 발화자)
+        self.pending_reply_minutes: List[float] = []
+        self.pending_reply_senders: List[str] = []
+        self.reply_deltas: List[float] = []
+        self.reply_partner_sums: Dict[str, float] = {}
+        self.reply_partner_counts: Dict[str, int] = {}
+
+    def add_message(self, msg: Dict[str, Any]) -> None:
+        """{"timestamp", "sender", "text"} 메시지 dict 하나를 누적."""
+        ts = msg["timestamp"]
+        self.add(msg["sender"], msg["text"], ts.hour, to_epoch_minutes(ts))
+
+    def add(self, sender: str, text: str, hour: int, minute: float) -> None:
+        """
+        메시지 하나를 누적한다.
+        - hour: 메시지 시각의 시(0~23)
+        - minute: epoch 기준 분 (답장 간격 계산용)
+        """
+        word_count = _count_words(text)
+        self.total_messages += 1
+        self.room_word_count += word_count
+        if self._count_senders:
+            self.sender_counts[sender] = self.sender_counts.get(sender, 0) + 1
+
+        if sender != self.user_sender:
+            if self.track_replies:
+                self.pending_reply_minutes.append(minute)
+                self.pending_reply_senders.append(sender)
+            return
+
+        # 내가 답하지 않고 있던 상대 메시지들에 대한 답장 간격
+        if self.pending_reply_minutes:
+            self._resolve_replies(minute)
+
+        self.add_user_message(text, hour, word_count)
+
+    def add_user_message(self, text: str, hour: int, word_count: Optional[int] = None) -> None:
+        """
+        내 메시지 하나의 텍스트/시간대 특징만 누적한다 (방 전체 수치 / 답장 시간은 건드리지 않음).
+        - word_count: 이미 센 단어 수 (없으면 여기서 센다)
+        """
+        t = text
+        self.user_msg_count += 1
+        self.user_word_count += _count_words(t) if word_count is None else word_count
+        self.user_char_count += len(t)
+        self.user_texts.append(t)
+
+        bucket = _get_hour_bucket(hour)
+        self.bucket_counts[bucket] = self.bucket_counts.get(bucket, 0) + 1
+
+        # 야간 메시지 샘플
+        if bucket == "night" and len(self.night_samples) < 3 and t:
+            self.night_samples.append(t)
 
         # 질문/감탄/이모티콘
-        if is_question(t):
-            q_cnt += 1
-        if is_exclamation(t):
-            e_cnt += 1
+        if "?" in t:
+            self.q_cnt += 1
+        if "!" in t:
+            self.e_cnt += 1
+
+        # 욕설/게임/주제/이모티콘은 오토마톤으로 한 번만 훑는다
+        hit_mask, emo_counts = _KAKAO_MATCHER.scan(t)
 
-        emoji_ratios.append(emoji_like_ratio(t))
+        if t:
+            # 이모티콘 패턴 등장 수 / 글자 수 (너무 많이 나와도 최대 1.0까지만)
+            self.emoji_ratio_sum += min(1.0, sum(emo_counts) / max(1, len(t)))
 
         # 욕설/게임
-        has_swear = contains_any(t, SWEAR_WORDS)
-        has_game = contains_any(t, GAME_WORDS)
-
-        if has_swear:
-            swear_msg_cnt += 1
-        if has_game:
-            game_msg_cnt += 1
-            if len(game_samples) < 3 and t:
-                game_samples.append(t)
+        if hit_mask & _SWEAR_BIT:
+            self.swear_msg_cnt += 1
+        if hit_mask & _GAME_BIT:
+            self.game_msg_cnt += 1
+            if len(self.game_samples) < 3 and t:
+                self.game_samples.append(t)
             if bucket == "night":
-                night_game_msg_cnt += 1
-        
+                self.night_game_msg_cnt += 1
+
         # 주제 분석
-        for topic, keywords in TOPIC_KEYWORDS.items():
-            if contains_any(t, keywords):
-                topic_counts[topic] = topic_counts.get(topic, 0) + 1
+        for topic, bit in _TOPIC_BITS:
+            if hit_mask & bit:
+                self.topic_counts[topic] += 1
 
         # 상위 단어 수집
-        for w in _tokenize_basic(t):
-            w_lower = w.lower()
-            # 너무 짧은 단어/숫자만 있는 토큰은 제외 (노이즈 감소용)
-            if len(w_lower) < 2:
-                continue
-            if w_lower.isdigit():
-                continue
-            word_freq[w_lower] = word_freq.get(w_lower, 0) + 1
+        # 너무 짧은 단어/숫자만 있는 토큰은 제외 (노이즈 감소용)
+        self.word_freq.update(
+            w for w in (tok.lower() for tok in _tokenize_basic(t)) if len(w) >= 2 and not w.isdigit()
+        )
 
         # 상위 이모티콘/반응 수집
-        for p in EMO_PATTERNS:
-            c = t.count(p)
+        for p, c in zip(EMO_PATTERNS, emo_counts):
             if c > 0:
-                emoji_freq[p] = emoji_freq.get(p, 0) + c
-
-    if user_msg_count > 0:
-        user_night_ratio = night_count / user_msg_count
-        user_question_ratio = q_cnt / user_msg_count
-        user_exclamation_ratio = e_cnt / user_msg_count
-        user_emoji_ratio = sum(emoji_ratios) / len(emoji_ratios) if emoji_ratios else 0.0
-        user_swear_msg_ratio = swear_msg_cnt / user_msg_count
-        user_game_msg_ratio = game_msg_cnt / user_msg_count
-        user_night_game_msg_ratio = (
-            night_game_msg_cnt / game_msg_cnt if game_msg_cnt > 0 else 0.0
-        )
-    else:
-        user_night_ratio = 0.0
-        user_question_ratio = 0.0
-        user_exclamation_ratio = 0.0
-        user_emoji_ratio = 0.0
-        user_swear_msg_ratio = 0.0
-        user_game_msg_ratio = 0.0
-        user_night_game_msg_ratio = 0.0
-
-    # 시간대 비율 및 최다 활동 시간대
-    if user_msg_count > 0:
-        user_time_ratio_night = bucket_counts["night"] / user_msg_count
-        user_time_ratio_morning = bucket_counts["morning"] / user_msg_count
-        user_time_ratio_afternoon = bucket_counts["afternoon"] / user_msg_count
-        user_time_ratio_evening = bucket_counts["evening"] / user_msg_count
-        most_active_period = max(bucket_counts, key=bucket_counts.get)
-    else:
-        user_time_ratio_night = 0.0
-        user_time_ratio_morning = 0.0
-        user_time_ratio_afternoon = 0.0
-        user_time_ratio_evening = 0.0
-        most_active_period = None
-
-    # 주제 비율 계산
-    user_topic_ratios = {}
-    if user_msg_count > 0:
-        for topic, count in topic_counts.items():
-            user_topic_ratios[f"topic_{topic}_ratio"] = count / user_msg_count
-
-    # 상위 단어/이모티콘 정렬
-    def _top_n(d: Dict[str, int], n: int) -> List[str]:
-        return [k for k, _ in sorted(d.items(), key=lambda x: x[1], reverse=True)[:n]]
-
-    top_words = _top_n(word_freq, 10)
-    top_emojis = _top_n(emoji_freq, 5)
-
-    # === 내가 자주 쓰는 말 예시 (이모티콘/플레이스홀더 제외) ===
-    common_samples: List[str] = []
-    MAX_SAMPLES = 5
-
-    for w in top_words:
-        if len(common_samples) >= MAX_SAMPLES:
-            break
-        for m in user_msgs:
-            t = m["text"] or ""
-
-            # 🔥 Kakao 내보내기에서 이모티콘은 "이모티콘" 같은 텍스트로 들어오므로 걸러준다
-            if "이모티콘" in t:
+                self.emoji_freq.add(p, c)
+
+    def add_table(self, table: MessageTable) -> None:
+        """MessageTable 전체를 순서대로 누적 (메시지 dict / datetime을 만들지 않음)."""
+        names = table.sender_names
+        add = self.add
+        for minute, code, text in table.iter_rows():
+            add(names[code], text, (minute // 60) % 24, minute)
+
+    def _resolve_replies(self, minute: float) -> None:
+        """대기 중인 상대 메시지들이 모두 이번 내 메시지(minute)로 답장받은 것으로 처리."""
+        partner_sums = self.reply_partner_sums
+        partner_counts = self.reply_partner_counts
+        for prev, partner in zip(self.pending_reply_minutes, self.pending_reply_senders):
+            delta = minute - prev
+            # 하루 이상 차이나면 답장이라고 보지 않고 버림
+            if 0 < delta < MAX_REPLY_MINUTES:
+                self.reply_deltas.append(delta)
+                partner_sums[partner] = partner_sums.get(partner, 0.0) + delta
+                partner_counts[partner] = partner_counts.get(partner, 0) + 1
+        self.pending_reply_minutes.clear()
+        self.pending_reply_senders.clear()
+
+    def _common_samples(self, top_words: List[str]) -> List[str]:
+        """내가 자주 쓰는 말 예시 (이모티콘/플레이스홀더 제외)."""
+        common_samples: List[str] = []
+
+        for w in top_words:
+            if len(common_samples) >= MAX_COMMON_SAMPLES:
+                break
+            for t in self.user_texts:
+                t = t or ""
+                if not _is_sample_text(t):
+                    continue
+
+                if w in t and t not in common_samples:
+                    common_samples.append(t)
+                    if len(common_samples) >= MAX_COMMON_SAMPLES:
+                        break
+
+        return common_samples
+
+    def sample_user_texts(self, limit: int) -> List[str]:
+        """
+        _common_samples 후보가 될 수 있는 내 메시지를 앞에서부터 최대 limit개 (중복 제외).
+        전체 user_texts 대신 이것만 저장해 두면 메시지 본문을 통째로 남기지 않는다.
+        """
+        samples: List[str] = []
+        seen = set()
+        for t in self.user_texts:
+            t = t or ""
+            if t in seen or not _is_sample_text(t):
                 continue
+            seen.add(t)
+            samples.append(t)
+            if len(samples) >= limit:
+                break
+        return samples
+
+    def to_features(self, temporal: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        누적된 값으로 extract_kakao_features와 같은 특징 dict를 만든다.
+        temporal(extract_temporal_features 결과)을 주면 시간대/답장 특징은 그 값을 쓰고,
+        요일x시간 히스토그램/세션 특징도 덧붙인다.
+        """
+        if self.total_messages == 0:
+            return {
+                "kakao_message_count": 0,
+                "kakao_sender_count": 0,
+                # 단어 수 0으로 세팅 (안전)
+                "word_count": 0,
+                "user_word_count": 0,
+                "room_word_count": 0,
+            }
+
+        user_msg_count = self.user_msg_count
+        user_msg_ratio = self.user_msg_count / self.total_messages
+
+        # 평균 글자 수 (내 메시지 기준)
+        avg_user_len = _ratio(self.user_char_count, user_msg_count)
+
+        bucket_counts = self.bucket_counts
+        user_night_game_msg_ratio = _ratio(self.night_game_msg_cnt, self.game_msg_cnt)
+
+        # 시간대 비율 및 최다 활동 시간대
+        most_active_period = max(bucket_counts, key=bucket_counts.get) if user_msg_count > 0 else None
+
+        # 주제 비율 계산
+        user_topic_ratios = {}
+        if user_msg_count > 0:
+            for topic, count in self.topic_counts.items():
+                user_topic_ratios[f"topic_{topic}_ratio"] = count / user_msg_count
+
+        # 상위 단어/이모티콘 (전체 정렬 없이 heapq.nlargest)
+        top_words = self.word_freq.top(10)
+        top_emojis = self.emoji_freq.top(5)
+
+        if temporal is not None:
+            reply_stats = {k: temporal[k] for k in _REPLY_KEYS}
+        else:
+            reply_stats = reply_latency_stats(
+                self.reply_deltas, self.reply_partner_sums, self.reply_partner_counts
+            )
+
+        # 참여자 수 보정 발화량 (talkativeness)
+        sender_count = len(self.sender_counts)
+        talkativeness = 0.0
+        if sender_count > 0:
+            # 내가 말한 비율 / (1/n) -> n명이 동등하게 말했을 때 대비 얼마나 더 말했는가
+            talkativeness = user_msg_ratio / (1 / sender_count)
+
+        features: Dict[str, Any] = {
+            "kakao_message_count": self.total_messages,
+            "kakao_sender_count": sender_count,
+
+            "user_sender_name": self.user_sender,
+
+            # ✅ 단어 수 관련
+            # - word_count: "내가 쓴 단어 수" (MBTI/신뢰도에서 사용할 값)
+            # - user_word_count: 내가 쓴 단어 수 (디버그/표시용)
+            # - room_word_count: 방 전체 단어 수 (참고용)
+            "word_count": self.user_word_count,
+            "user_word_count": self.user_word_count,
+            "room_word_count": self.room_word_count,
+
+            "user_message_ratio": user_msg_ratio,
+            "talkativeness": talkativeness,  # ✅ 참여자 수 보정 발화량
+            "user_avg_chars_per_message": avg_user_len,
+            "user_night_message_ratio": _ratio(bucket_counts["night"], user_msg_count),
+            "user_question_ratio": _ratio(self.q_cnt, user_msg_count),
+            "user_exclamation_ratio": _ratio(self.e_cnt, user_msg_count),
+            "user_emoji_ratio": _ratio(self.emoji_ratio_sum, user_msg_count),
+            "user_swear_msg_ratio": _ratio(self.swear_msg_cnt, user_msg_count),
+            "user_game_msg_ratio": _ratio(self.game_msg_cnt, user_msg_count),
+            "user_night_game_msg_ratio": user_night_game_msg_ratio,
+            # ✅ 답장 시간 (평균 + 분포)
+            **reply_stats,
+
+            # ✅ 시간대 관련
+            "user_time_ratio_night": _ratio(bucket_counts["night"], user_msg_count),
+            "user_time_ratio_morning": _ratio(bucket_counts["morning"], user_msg_count),
+            "user_time_ratio_afternoon": _ratio(bucket_counts["afternoon"], user_msg_count),
+            "user_time_ratio_evening": _ratio(bucket_counts["evening"], user_msg_count),
+            "user_most_active_period": most_active_period,
+
+            # ✅ 상위 단어/이모티콘 + 샘플 메시지
+            "user_top_words": top_words,
+            "user_top_emojis": top_emojis,
+            "sample_night_messages": self.night_samples,
+            "sample_game_messages": self.game_samples,
+            "sample_common_messages": self._common_samples(top_words),
+        }
 
-            # (옵션) 너무 짧은 건 제외하고 싶으면 유지, 아니라면 지워도 됨
-            if len(t.strip()) < 2:
-                continue
+        # 주제 비율 추가
+        features.update(user_topic_ratios)
+
+        if temporal is not None:
+            # 시간대 비율은 배열로 계산한 값으로 (같은 값, 위치는 그대로)
+            for key in _TIME_KEYS:
+                features[key] = temporal[key]
+            for key, value in temporal.items():
+                if key not in features:
+                    features[key] = value
+
+        return features
+
+
+# temporal_features와 겹치는 기존 특징 키
+_REPLY_KEYS = (
+    "avg_reply_minutes",
+    "reply_count",
+    "reply_minutes_median",
+    "reply_minutes_p90",
+    "reply_minutes_by_partner",
+)
+_TIME_KEYS = (
+    "user_night_message_ratio",
+    "user_time_ratio_night",
+    "user_time_ratio_morning",
+    "user_time_ratio_afternoon",
+    "user_time_ratio_evening",
+    "user_most_active_period",
+)
+
+
+def _extract_table_features(
+    table: MessageTable,
+    user_sender: str,
+    sender_counts: Optional[Dict[str, int]],
+) -> Dict[str, Any]:
+    """
+    MessageTable 경로: 텍스트 특징은 accumulator로 한 번 순회하고,
+    시간대/답장/세션 특징은 시각·발화자 배열로 벡터 계산한다.
+    """
+    acc = KakaoFeatureAccumulator(user_sender, sender_counts, track_replies=False)
+    acc.add_table(table)
+    temporal = extract_temporal_features(
+        np.frombuffer(table.minutes, dtype=np.int64),
+        np.frombuffer(table.sender_codes, dtype=np.int32),
+        table.find_sender_code(user_sender),
+        table.sender_names,
+    )
+    return acc.to_features(temporal)
+
+
+def extract_kakao_features_by_sender(
+    table: MessageTable,
+    sender_counts: Optional[Dict[str, int]] = None,
+    min_messages: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    단톡방 참여자 전원의 카톡 특징을 한 번에 계산한다 (/analyze/kakao/batch 용).
 
-            if w in t and t not in common_samples:
-                common_samples.append(t)
-                if len(common_samples) >= MAX_SAMPLES:
-                    break
+    발화자마다 extract_kakao_features를 다시 돌리는 대신
+    - 타임라인은 한 번만 순회하며 각 메시지를 그 발화자의 accumulator에만 넣고
+      (방 전체 메시지 수 / 단어 수는 한 번 센 값을 모두에게 채움)
+    - 시간대/답장/세션 특징은 extract_temporal_features_by_sender로 묶어서 계산한다.
+    - sender_counts 기준 메시지 수가 min_messages보다 적은 발화자는 처음부터 계산하지 않는다.
 
+    반환: {발화자 이름: 특징 dict} (각 값은 user_sender를 그 사람으로 준 extract_kakao_features와 같음)
+    """
+    if len(table) == 0:
+        return {}
+    if sender_counts is None:
+        sender_counts = table.sender_counts()
+
+    names = table.sender_names
+    selected = [sender_counts.get(name, 0) >= min_messages for name in names]
+    accs = [
+        KakaoFeatureAccumulator(name, sender_counts, track_replies=False) if keep else None
+        for name, keep in zip(names, selected)
+    ]
+    room_word_count = 0
+    for minute, code, text in table.iter_rows():
+        word_count = _count_words(text)
+        room_word_count += word_count
+        acc = accs[code]
+        if acc is not None:
+            acc.add_user_message(text, (minute // 60) % 24, word_count)
+
+    temporal = extract_temporal_features_by_sender(
+        np.frombuffer(table.minutes, dtype=np.int64),
+        np.frombuffer(table.sender_codes, dtype=np.int32),
+        names,
+        selected,
+    )
+
+    features: Dict[str, Dict[str, Any]] = {}
+    for code, acc in enumerate(accs):
+        if acc is None or acc.user_msg_count == 0:
+            continue
+        acc.total_messages = len(table)
+        acc.room_word_count = room_word_count
+        features[names[code]] = acc.to_features(temporal[code])
+    return features
 
-    # 평균 답장 시간 (other -> user)
-    reply_deltas: List[float] = []
-    if user_msg_count > 0 and other_msgs:
-        n = len(messages)
-        for i, msg in enumerate(messages):
-            if msg["sender"] == user_sender:
-                continue
-            for j in range(i + 1, n):
-                if messages[j]["sender"] == user_sender:
-                    delta = messages[j]["timestamp"] - msg["timestamp"]
-                    minutes = delta.total_seconds() / 60.0
-                    # 하루 이상 차이나면 답장이라고 보지 않고 버림
-                    if 0 < minutes < 60 * 24:
-                        reply_deltas.append(minutes)
-                    break
 
-    if reply_deltas:
-        avg_reply_minutes = sum(reply_deltas) / len(reply_deltas)
-    else:
-        avg_reply_minutes = 0.0
+def extract_kakao_features(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    카카오톡 파싱 결과(dict)를 받아,
+    - 발화자 비율
+    - 야행성 비율
+    - 질문/감탄/이모티콘 비율
+    - 욕설/게임 관련 대화 비율
+    - 평균 답장 시간(분)
+    - ✅ 내가 쓴 단어 수 / 방 전체 단어 수
+    - ✅ 시간대별 활동 비율, 상위 단어/이모티콘, 샘플 메시지
+    등을 계산한다.
 
-    # 2. 참여자 수 보정 발화량 (talkativeness)
-    sender_count = len(sender_counts)
-    talkativeness = 0.0
-    if sender_count > 0:
-        # 내가 말한 비율 / (1/n) -> n명이 동등하게 말했을 때 대비 얼마나 더 말했는가
-        talkativeness = user_msg_ratio / (1 / sender_count)
-
-    features: Dict[str, Any] = {
-        "kakao_message_count": total_messages,
-        "kakao_sender_count": len(sender_counts),
-
-        "user_sender_name": user_sender,
-
-        # ✅ 단어 수 관련
-        # - word_count: "내가 쓴 단어 수" (MBTI/신뢰도에서 사용할 값)
-        # - user_word_count: 내가 쓴 단어 수 (디버그/표시용)
-        # - room_word_count: 방 전체 단어 수 (참고용)
-        "word_count": user_word_count,
-        "user_word_count": user_word_count,
-        "room_word_count": room_word_count,
-
-        "user_message_ratio": user_msg_ratio,
-        "talkativeness": talkativeness, # ✅ 참여자 수 보정 발화량
-        "user_avg_chars_per_message": avg_user_len,
-        "user_night_message_ratio": user_night_ratio,
-        "user_question_ratio": user_question_ratio,
-        "user_exclamation_ratio": user_exclamation_ratio,
-        "user_emoji_ratio": user_emoji_ratio,
-        "user_swear_msg_ratio": user_swear_msg_ratio,
-        "user_game_msg_ratio": user_game_msg_ratio,
-        "user_night_game_msg_ratio": user_night_game_msg_ratio,
-        "avg_reply_minutes": avg_reply_minutes,
+    모든 특징은 KakaoFeatureAccumulator로 타임라인을 한 번만 순회해서 계산한다.
+    parsed["messages"]는 메시지 dict 리스트 또는 MessageTable
+    (MessageTable이면 시간 관련 특징은 temporal_features로 계산하고,
+    요일x시간 히스토그램 / 대화 세션 특징이 추가된다).
+    """
+    messages: Union[List[Dict[str, Any]], MessageTable] = parsed.get("messages", [])
+    meta = parsed.get("meta", {})
+    user_sender = meta.get("user_sender")
+    # 파서(또는 analyze_kakao)가 이미 센 발화자 수
+    sender_counts: Optional[Dict[str, int]] = meta.get("senders") or None
 
-        # ✅ 시간대 관련
-        "user_time_ratio_night": user_time_ratio_night,
-        "user_time_ratio_morning": user_time_ratio_morning,
-        "user_time_ratio_afternoon": user_time_ratio_afternoon,
-        "user_time_ratio_evening": user_time_ratio_evening,
-        "user_most_active_period": most_active_period,
-
-        # ✅ 상위 단어/이모티콘 + 샘플 메시지
-        "user_top_words": top_words,
-        "user_top_emojis": top_emojis,
-        "sample_night_messages": night_samples,
-        "sample_game_messages": game_samples,
-        "sample_common_messages": common_samples,
-    }
-    
-    # 주제 비율 추가
-    features.update(user_topic_ratios)
+    if not messages:
+        return KakaoFeatureAccumulator(user_sender or "").to_features()
 
-    return features
+    # 가장 많이 말한 사람을 user로 가정 (fallback)
+    if not user_sender:
+        if isinstance(messages, MessageTable):
+            sender_counts = messages.sender_counts()
+        else:
+            sender_counts = {}
+            for msg in messages:
+                s = msg["sender"]
+                sender_counts[s] = sender_counts.get(s, 0) + 1
+        user_sender = max(sender_counts, key=sender_counts.get)
+
+    if isinstance(messages, MessageTable):
+        return _extract_table_features(messages, user_sender, sender_counts)
+
+    acc = KakaoFeatureAccumulator(user_sender, sender_counts)
+    for msg in messages:
+        acc.add_message(msg)
+    return acc.to_features()
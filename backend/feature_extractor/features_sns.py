@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Any, Iterable, Optional, Set
+
+from ..data_loader.sns_parser import SnsPost, TagVocabulary
+from .features_common import _lexicon_counts, _tokenize
+from .features_kakao import _get_hour_bucket
+from .frequency import ExactCounter
+
+# 글 길이 구간 (글자 수)
+SHORT_POST_CHARS = 20
+LONG_POST_CHARS = 200
+
+# 많이 쓴 해시태그 표시 개수
+MAX_TOP_HASHTAGS = 5
+
+# 시간대 버킷 (카톡과 같은 구간)
+_HOUR_BUCKETS = tuple(_get_hour_bucket(h) for h in range(24))
+
+_MINUTES_PER_WEEK = 7 * 1440
+
+
+def _ratio(count: float, base: int) -> float:
+    return count / base if base > 0 else 0.0
+
+
+class SnsFeatureAccumulator:
+    """
+    게시물을 한 건씩 받아 SNS 특징을 누적한다 (게시물 리스트를 들고 있지 않음).
+    상태 크기는 해시태그 종류 / 활동한 날짜·주 수만큼이라 내보내기 파일 크기와 상관없다.
+
+    - 글 길이: 평균 글자 수, 짧은 글 / 긴 글 비율
+    - 감정: features_common과 같은 긍정/부정 어휘 매칭 (단어 대비 비율 + 게시물 단위 비율)
+    - 해시태그 / 멘션: 게시물당 개수, 사용한 게시물 비율, 상위 해시태그
+    - 게시 주기: 활동 일수, 주당 게시 수, 주별 게시 수의 변동계수 (작을수록 규칙적)
+    """
+
+    def __init__(self) -> None:
+        self.post_count = 0
+        self.char_count = 0
+        self.short_count = 0
+        self.long_count = 0
+
+        self.word_count = 0
+        self.pos_count = 0
+        self.neg_count = 0
+        self.positive_posts = 0
+        self.negative_posts = 0
+        self.exclamation_posts = 0
+        self.question_posts = 0
+
+        self.hashtag_count = 0
+        self.hashtag_posts = 0
+        self.mention_count = 0
+        self.mention_posts = 0
+        self.hashtag_freq = ExactCounter()
+
+        self.timed_count = 0
+        self.bucket_counts = {"night": 0, "morning": 0, "afternoon": 0, "evening": 0}
+        self.days: Set[int] = set()
+        self.week_counts: Dict[int, int] = {}
+        self.first_minute: Optional[int] = None
+        self.last_minute: Optional[int] = None
+
+    def add(self, post: SnsPost) -> None:
+        text, minute, hashtag_ids, mention_ids = post
+        self.post_count += 1
+
+        chars = len(text)
+        self.char_count += chars
+        if chars < SHORT_POST_CHARS:
+            self.short_count += 1
+        elif chars >= LONG_POST_CHARS:
+            self.long_count += 1
+
+        tokens = _tokenize(text)
+        _, pos, neg = _lexicon_counts(tokens)
+        self.word_count += len(tokens)
+        self.pos_count += pos
+        self.neg_count += neg
+        if pos > neg:
+            self.positive_posts += 1
+        elif neg > pos:
+            self.negative_posts += 1
+        # 카톡 user_question_ratio / user_exclamation_ratio와 같은 기준 (해당 문자가 들어간 글 비율)
+        if "!" in text:
+            self.exclamation_posts += 1
+        if "?" in text:
+            self.question_posts += 1
+
+        if hashtag_ids:
+            self.hashtag_count += len(hashtag_ids)
+            self.hashtag_posts += 1
+            for tag_id in hashtag_ids:
+                self.hashtag_freq.add(tag_id)
+        if mention_ids:
+            self.mention_count += len(mention_ids)
+            self.mention_posts += 1
+
+        if minute is not None:
+            self.timed_count += 1
+            self.bucket_counts[_HOUR_BUCKETS[(minute // 60) % 24]] += 1
+            self.days.add(minute // 1440)
+            week = minute // _MINUTES_PER_WEEK
+            self.week_counts[week] = self.week_counts.get(week, 0) + 1
+            if self.first_minute is None or minute < self.first_minute:
+                self.first_minute = minute
+            if self.last_minute is None or minute > self.last_minute:
+                self.last_minute = minute
+
+    def _cadence(self) -> Dict[str, Any]:
+        """주 단위 게시 수 (처음 ~ 마지막 주 사이의 빈 주 포함)의 평균 / 변동계수."""
+        if not self.week_counts:
+            return {"sns_posts_per_week": 0.0, "sns_weekly_cv": 0.0}
+        weeks = max(self.week_counts) - min(self.week_counts) + 1
+        mean = self.timed_count / weeks
+        sq_sum = sum(c * c for c in self.week_counts.values())
+        variance = max(0.0, sq_sum / weeks - mean * mean)
+        return {
+            "sns_posts_per_week": mean,
+            "sns_weekly_cv": math.sqrt(variance) / mean if mean > 0 else 0.0,
+        }
+
+    def to_features(self, vocab: Optional[TagVocabulary] = None) -> Dict[str, Any]:
+        """vocab(iter_sns_posts에 넘긴 사전)을 주면 상위 해시태그를 이름으로 넣는다."""
+        post_count = self.post_count
+        if post_count == 0:
+            return {"sns_post_count": 0, "sns_word_count": 0}
+
+        bucket_counts = self.bucket_counts
+        timed = self.timed_count
+        most_active_period = max(bucket_counts, key=bucket_counts.get) if timed > 0 else None
+
+        period_days = 0.0
+        if self.first_minute is not None and self.last_minute is not None:
+            period_days = (self.last_minute - self.first_minute) / 1440
+
+        features: Dict[str, Any] = {
+            "sns_post_count": post_count,
+            "sns_word_count": self.word_count,
+
+            # 글 길이
+            "sns_avg_post_chars": _ratio(self.char_count, post_count),
+            "sns_short_post_ratio": _ratio(self.short_count, post_count),
+            "sns_long_post_ratio": _ratio(self.long_count, post_count),
+
+            # 감정 표현
+            "sns_positive_ratio": _ratio(self.pos_count, max(1, self.word_count)),
+            "sns_negative_ratio": _ratio(self.neg_count, max(1, self.word_count)),
+            "sns_emotion_intensity": _ratio(self.pos_count + self.neg_count, max(1, self.word_count)),
+            "sns_positive_post_ratio": _ratio(self.positive_posts, post_count),
+            "sns_negative_post_ratio": _ratio(self.negative_posts, post_count),
+            "sns_exclamation_post_ratio": _ratio(self.exclamation_posts, post_count),
+            "sns_question_post_ratio": _ratio(self.question_posts, post_count),
+
+            # 해시태그 / 멘션
+            "sns_hashtags_per_post": _ratio(self.hashtag_count, post_count),
+            "sns_hashtag_post_ratio": _ratio(self.hashtag_posts, post_count),
+            "sns_unique_hashtag_count": len(self.hashtag_freq),
+            "sns_mentions_per_post": _ratio(self.mention_count, post_count),
+            "sns_mention_post_ratio": _ratio(self.mention_posts, post_count),
+
+            # 시간대 / 게시 주기
+            "sns_time_ratio_night": _ratio(bucket_counts["night"], timed),
+            "sns_time_ratio_morning": _ratio(bucket_counts["morning"], timed),
+            "sns_time_ratio_afternoon": _ratio(bucket_counts["afternoon"], timed),
+            "sns_time_ratio_evening": _ratio(bucket_counts["evening"], timed),
+            "sns_most_active_period": most_active_period,
+            "sns_active_days": len(self.days),
+            "sns_period_days": period_days,
+            **self._cadence(),
+        }
+        if vocab is not None:
+            features["sns_top_hashtags"] = [vocab.name(tag_id) for tag_id in self.hashtag_freq.top(MAX_TOP_HASHTAGS)]
+        return features
+
+
+def extract_sns_features(posts: Iterable[SnsPost], vocab: Optional[TagVocabulary] = None) -> Dict[str, Any]:
+    """
+    게시물(iter_sns_posts 결과 등)을 한 번 훑어서 SNS 특징 dict를 만든다.
+
+        vocab = TagVocabulary()
+        features = extract_sns_features(iter_sns_posts(path, vocab=vocab), vocab)
+    """
+    acc = SnsFeatureAccumulator()
+    add = acc.add
+    for post in posts:
+        add(post)
+    return acc.to_features(vocab)
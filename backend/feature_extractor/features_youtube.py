@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Any, Iterable, Optional, Set
+
+from ..data_loader.youtube_parser import WatchRecord
+from .features_kakao import _get_hour_bucket
+from .frequency import ExactCounter
+from .keyword_matcher import KeywordMatcher
+
+# 영상 유형 분류용 키워드 (제목 + 채널 이름, 소문자로 비교). 규칙 기반이라 대략적인 값.
+CATEGORY_KEYWORDS = {
+    "info": [
+        "뉴스", "news", "리뷰", "review", "정리", "요약", "분석", "정보", "팁", "tips", "꿀팁",
+        "방법", "how to", "비교", "언박싱", "unboxing", "브리핑", "경제", "주식", "테크", "tech",
+    ],
+    "entertainment": [
+        "예능", "웃긴", "레전드", "ㅋㅋ", "funny", "먹방", "브이로그", "vlog", "게임", "game",
+        "롤", "배그", "마인크래프트", "minecraft", "하이라이트", "highlights", "챌린지", "challenge",
+        "드라마", "영화", "movie", "리액션", "reaction", "밈", "meme",
+    ],
+    "education": [
+        "강의", "강좌", "lecture", "수업", "공부", "study", "tutorial", "튜토리얼", "입문", "기초",
+        "코딩", "coding", "프로그래밍", "programming", "파이썬", "python", "수학", "영어", "토익",
+        "시험", "교육", "course",
+    ],
+    "emotional": [
+        "노래", "음악", "music", "playlist", "플레이리스트", "m/v", "official video", "lyrics",
+        "가사", "커버", "cover", "감성", "힐링", "healing", "asmr", "위로", "새벽", "잔잔한", "lofi",
+    ],
+}
+
+_YOUTUBE_MATCHER = KeywordMatcher({cat: words for cat, words in CATEGORY_KEYWORDS.items()})
+_CATEGORY_BITS = [(cat, _YOUTUBE_MATCHER.group_bit(cat)) for cat in CATEGORY_KEYWORDS]
+
+# 쇼츠 표시 (Takeout에는 영상 길이가 없어서 제목의 #shorts로 짧은 영상 위주인지 본다)
+SHORTS_MARKERS = ("#shorts", "#short", "#쇼츠")
+
+# 시간대 버킷 (카톡과 같은 구간)
+_HOUR_BUCKETS = tuple(_get_hour_bucket(h) for h in range(24))
+
+# 많이 본 채널 표시 개수
+MAX_TOP_CHANNELS = 5
+
+
+def _ratio(count: float, base: int) -> float:
+    return count / base if base > 0 else 0.0
+
+
+class YoutubeFeatureAccumulator:
+    """
+    시청 기록을 한 건씩 받아 유튜브 특징을 누적한다 (기록 리스트를 들고 있지 않음).
+    - 시간대: 시각이 있는 기록 기준 비율
+    - 채널 다양성: 채널 수 / 시청 수, 채널 분포의 정규화 엔트로피 (0~1)
+    - 영상 유형: CATEGORY_KEYWORDS 그룹별로 해당되는 기록 비율 (한 영상이 여러 유형일 수 있음)
+    """
+
+    def __init__(self) -> None:
+        self.watch_count = 0
+        self.timed_count = 0
+        self.bucket_counts = {"night": 0, "morning": 0, "afternoon": 0, "evening": 0}
+        self.channel_freq = ExactCounter()
+        self.category_counts = {cat: 0 for cat in CATEGORY_KEYWORDS}
+        self.shorts_count = 0
+        self.days: Set[int] = set()
+        self.first_minute: Optional[int] = None
+        self.last_minute: Optional[int] = None
+
+    def add(self, record: WatchRecord) -> None:
+        self.watch_count += 1
+        title, channel, minute = record
+
+        if channel:
+            self.channel_freq.add(channel)
+
+        text = f"{title} {channel or ''}".lower()
+        mask, _ = _YOUTUBE_MATCHER.scan(text)
+        if mask:
+            for cat, bit in _CATEGORY_BITS:
+                if mask & bit:
+                    self.category_counts[cat] += 1
+        if any(marker in text for marker in SHORTS_MARKERS):
+            self.shorts_count += 1
+
+        if minute is not None:
+            self.timed_count += 1
+            self.bucket_counts[_HOUR_BUCKETS[(minute // 60) % 24]] += 1
+            self.days.add(minute // 1440)
+            if self.first_minute is None or minute < self.first_minute:
+                self.first_minute = minute
+            if self.last_minute is None or minute > self.last_minute:
+                self.last_minute = minute
+
+    def to_features(self) -> Dict[str, Any]:
+        watch_count = self.watch_count
+        if watch_count == 0:
+            return {"youtube_watch_count": 0, "youtube_channel_count": 0}
+
+        counts = self.channel_freq.counts
+        channel_total = sum(counts.values())
+        entropy = 0.0
+        if len(counts) > 1:
+            for c in counts.values():
+                p = c / channel_total
+                entropy -= p * math.log(p)
+            entropy /= math.log(len(counts))
+
+        bucket_counts = self.bucket_counts
+        timed = self.timed_count
+        most_active_period = max(bucket_counts, key=bucket_counts.get) if timed > 0 else None
+
+        category_ratios = {
+            f"youtube_category_{cat}_ratio": _ratio(count, watch_count)
+            for cat, count in self.category_counts.items()
+        }
+        top_category = max(self.category_counts, key=self.category_counts.get)
+        if self.category_counts[top_category] == 0:
+            top_category = None
+
+        period_days = 0.0
+        if self.first_minute is not None and self.last_minute is not None:
+            period_days = (self.last_minute - self.first_minute) / 1440
+
+        return {
+            "youtube_watch_count": watch_count,
+            "youtube_channel_count": len(counts),
+            "youtube_channel_diversity": _ratio(len(counts), watch_count),
+            "youtube_channel_entropy": entropy,
+            "youtube_top_channels": self.channel_freq.top(MAX_TOP_CHANNELS),
+
+            "youtube_time_ratio_night": _ratio(bucket_counts["night"], timed),
+            "youtube_time_ratio_morning": _ratio(bucket_counts["morning"], timed),
+            "youtube_time_ratio_afternoon": _ratio(bucket_counts["afternoon"], timed),
+            "youtube_time_ratio_evening": _ratio(bucket_counts["evening"], timed),
+            "youtube_most_active_period": most_active_period,
+
+            **category_ratios,
+            "youtube_top_category": top_category,
+            "youtube_shorts_ratio": _ratio(self.shorts_count, watch_count),
+
+            "youtube_active_days": len(self.days),
+            "youtube_period_days": period_days,
+        }
+
+
+def extract_youtube_features(records: Iterable[WatchRecord]) -> Dict[str, Any]:
+    """
+    시청 기록(iter_youtube_history 결과 등)을 한 번 훑어서 유튜브 특징 dict를 만든다.
+    제너레이터를 넘기면 파일 파싱과 특징 계산이 같이 진행되어 기록 전체를 메모리에 두지 않는다.
+    """
+    acc = YoutubeFeatureAccumulator()
+    add = acc.add
+    for record in records:
+        add(record)
+    return acc.to_features()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import heapq
+import os
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Union
+
+# 단어 빈도 집계 방식 (환경 변수로 조정)
+# - FREQ_BACKEND: "space_saving"(기본, 메모리 상한) 또는 "exact"(전부 셈)
+# - FREQ_CAPACITY: space_saving이 끝까지 들고 있는 단어 수 (표는 최대 2배까지 커졌다가 줄어듦)
+FREQ_BACKEND = os.getenv("FREQ_BACKEND", "space_saving")
+FREQ_CAPACITY = int(os.getenv("FREQ_CAPACITY", "10000"))
+
+
+class ExactCounter:
+    """
+    모든 항목을 정확히 세는 빈도표 (dict).
+    top(n)은 전체 정렬 대신 heapq.nlargest로 고르며,
+    횟수가 같으면 먼저 나온 항목이 앞 (sorted(..., reverse=True)[:n]와 같은 순서).
+    """
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def add(self, key: str, count: int = 1) -> None:
+        counts = self.counts
+        counts[key] = counts.get(key, 0) + count
+
+    def update(self, keys: Iterable[str]) -> None:
+        """항목마다 1씩 더한다 (메시지 하나의 토큰들을 한 번에)."""
+        counts = self.counts
+        for key in keys:
+            counts[key] = counts.get(key, 0) + 1
+
+    def top(self, n: int) -> List[str]:
+        return [key for key, _ in heapq.nlargest(n, self.counts.items(), key=itemgetter(1))]
+
+    @property
+    def exact(self) -> bool:
+        return True
+
+
+class SpaceSavingCounter(ExactCounter):
+    """
+    메모리 상한이 있는 Space-Saving 빈도표 (heavy hitters).
+
+    - 항목 수가 2 * capacity를 넘으면 상위 capacity개만 남기고 나머지를 버린다.
+      버린 것 중 가장 큰 횟수가 floor가 된다.
+    - 그 뒤 처음 보는 항목은 floor에서 시작한다 (그 전에 최대 floor번 나왔을 수 있으므로, 과대 추정).
+    - 실제 횟수가 floor보다 큰 항목은 항상 표에 남아 있으므로 상위 단어는 빠지지 않는다.
+    - 한 번도 줄인 적이 없으면 (어휘가 작으면) ExactCounter와 결과가 같다.
+    """
+
+    def __init__(self, capacity: int = FREQ_CAPACITY) -> None:
+        super().__init__()
+        self.capacity = max(1, capacity)
+        self.floor = 0
+
+    def add(self, key: str, count: int = 1) -> None:
+        counts = self.counts
+        counts[key] = counts.get(key, self.floor) + count
+        if len(counts) > 2 * self.capacity:
+            self._compact()
+
+    def update(self, keys: Iterable[str]) -> None:
+        counts = self.counts
+        floor = self.floor
+        for key in keys:
+            counts[key] = counts.get(key, floor) + 1
+        if len(counts) > 2 * self.capacity:
+            self._compact()
+
+    def _compact(self) -> None:
+        """상위 capacity개만 남긴다 (남은 항목의 처음 등장 순서는 유지)."""
+        ranked = heapq.nlargest(self.capacity + 1, self.counts.items(), key=itemgetter(1))
+        self.floor = max(self.floor, ranked[-1][1])
+        kept = {key for key, _ in ranked[:-1]}
+        self.counts = {key: c for key, c in self.counts.items() if key in kept}
+
+    @property
+    def exact(self) -> bool:
+        return self.floor == 0
+
+
+FrequencyCounter = Union[ExactCounter, SpaceSavingCounter]
+
+
+def make_frequency_counter(backend: Optional[str] = None, capacity: Optional[int] = None) -> FrequencyCounter:
+    """FREQ_BACKEND / FREQ_CAPACITY 설정대로 빈도표를 만든다 (인자로 덮어쓸 수 있음)."""
+    backend = backend or FREQ_BACKEND
+    if backend == "exact":
+        return ExactCounter()
+    if backend == "space_saving":
+        return SpaceSavingCounter(FREQ_CAPACITY if capacity is None else capacity)
+    raise ValueError(f"unknown frequency backend: {backend!r}")
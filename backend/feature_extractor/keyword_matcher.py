@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    여러 키워드 사전을 한 번에 매칭하는 Aho–Corasick 오토마톤.
+
+    - groups: {"그룹 이름": [키워드, ...]} → 메시지 안에 그룹 키워드가 하나라도 있는지
+      (기존 any(p in text for p in keywords)와 동일)
+    - counted: 등장 횟수를 셀 패턴 목록 → 패턴별 text.count(p)와 동일한 값
+      (같은 패턴끼리는 겹치지 않게, 서로 다른 패턴끼리는 "ㅋ" / "ㅋㅋ" 처럼 겹쳐도 각각 셈)
+
+    모듈 import 시점에 한 번 만들어 두고, 메시지는 scan()으로 한 번만 훑는다.
+    """
+
+    def __init__(
+        self,
+        groups: Dict[str, Iterable[str]],
+        counted: Iterable[str] = (),
+    ) -> None:
+        self.group_names: List[str] = list(groups)
+        self.counted: List[str] = list(dict.fromkeys(counted))
+
+        # 패턴 → (그룹 bitmask, 카운트 대상이면 counted 인덱스 / 아니면 -1)
+        pattern_masks: Dict[str, int] = {}
+        for gi, name in enumerate(self.group_names):
+            for kw in groups[name]:
+                if kw:
+                    pattern_masks[kw] = pattern_masks.get(kw, 0) | (1 << gi)
+        for p in self.counted:
+            pattern_masks.setdefault(p, 0)
+
+        self._patterns: List[str] = list(pattern_masks)
+        self._masks: List[int] = [pattern_masks[p] for p in self._patterns]
+        counted_index = {p: i for i, p in enumerate(self.counted)}
+        self._count_slots: List[int] = [counted_index.get(p, -1) for p in self._patterns]
+        self._lengths: List[int] = [len(p) for p in self._patterns]
+
+        self._build()
+
+    def _build(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        for pid, pattern in enumerate(self._patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(pid)
+
+        # BFS로 실패 링크 계산 + 실패 링크 쪽 출력 합치기 (루트 자식의 실패 링크는 루트)
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                outputs[nxt].extend(outputs[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs: List[Tuple[int, ...]] = [tuple(o) for o in outputs]
+
+    def scan(self, text: str) -> Tuple[int, List[int]]:
+        """
+        text를 한 번 훑어서 (그룹 bitmask, counted 패턴별 등장 횟수 리스트)를 반환한다.
+        그룹 이름으로 보고 싶으면 groups_of(mask)를 사용.
+        """
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        root = goto[0]
+
+        mask = 0
+        counts = [0] * len(self.counted)
+        last_end: Dict[int, int] = {}
+        state = 0
+
+        for i, ch in enumerate(text):
+            if state == 0:
+                state = root.get(ch, 0)
+                if state == 0:
+                    continue
+            else:
+                nxt = goto[state].get(ch)
+                while nxt is None and state:
+                    state = fail[state]
+                    nxt = goto[state].get(ch)
+                state = nxt or 0
+
+            out = outputs[state]
+            if not out:
+                continue
+            end = i + 1
+            for pid in out:
+                mask |= self._masks[pid]
+                slot = self._count_slots[pid]
+                if slot >= 0 and end - self._lengths[pid] >= last_end.get(pid, 0):
+                    # str.count와 같이 같은 패턴은 겹치지 않게 센다
+                    counts[slot] += 1
+                    last_end[pid] = end
+
+        return mask, counts
+
+    def group_bit(self, name: str) -> int:
+        return 1 << self.group_names.index(name)
+
+    def groups_of(self, mask: int) -> Set[str]:
+        return {name for gi, name in enumerate(self.group_names) if mask & (1 << gi)}
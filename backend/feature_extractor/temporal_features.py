@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 하루 이상 차이나면 답장이라고 보지 않음
+MAX_REPLY_MINUTES = 60 * 24
+
+# 시간대 버킷 (hour // 6 순서: 00~06 / 06~12 / 12~18 / 18~24)
+BUCKET_NAMES = ["night", "morning", "afternoon", "evening"]
+
+# 이 시간(분)보다 오래 대화가 끊기면 새 대화 세션으로 본다
+SESSION_GAP_MINUTES = 60
+
+# 단톡방 일괄 분석에서 한 번에 펼치는 (답장 간격, 상대) 쌍 수 (메모리 상한)
+REPLY_PAIR_CHUNK = 1 << 22
+
+# 1970-01-01은 목요일 → (epoch 일수 + 3) % 7 == 0 이 월요일
+_EPOCH_WEEKDAY_OFFSET = 3
+
+
+def _percentile_sorted(sorted_values: np.ndarray, q: float) -> float:
+    """features_kakao._percentile과 같은 선형 보간 (결과를 똑같이 맞추기 위해 직접 계산)."""
+    n = len(sorted_values)
+    if n == 0:
+        return 0.0
+    pos = (n - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, n - 1)
+    frac = pos - lo
+    low = float(sorted_values[lo])
+    return low + (float(sorted_values[hi]) - low) * frac
+
+
+def _summarize_replies(
+    deltas: np.ndarray,
+    partners: np.ndarray,
+    sender_names: Sequence[str],
+) -> Dict[str, Any]:
+    """답장 간격(분)과 그 상대 발화자 코드(상대 메시지 행 순서)로 답장 특징을 만든다."""
+    reply_count = int(len(deltas))
+    avg_reply_minutes = float(deltas.sum()) / reply_count if reply_count else 0.0
+    ordered = np.sort(deltas)
+
+    # 상대별 평균 (처음 답장한 순서대로)
+    by_partner: Dict[str, float] = {}
+    if reply_count:
+        sums = np.bincount(partners, weights=deltas, minlength=len(sender_names))
+        counts = np.bincount(partners, minlength=len(sender_names))
+        first = np.full(len(sender_names), reply_count)
+        np.minimum.at(first, partners, np.arange(reply_count))
+        codes = np.flatnonzero(counts)
+        codes = codes[np.argsort(first[codes], kind="stable")]
+        means = sums[codes] / counts[codes]
+        by_partner = dict(zip([sender_names[code] for code in codes.tolist()], means.tolist()))
+
+    return {
+        "avg_reply_minutes": avg_reply_minutes,
+        "reply_count": reply_count,
+        "reply_minutes_median": _percentile_sorted(ordered, 0.5),
+        "reply_minutes_p90": _percentile_sorted(ordered, 0.9),
+        "reply_minutes_by_partner": by_partner,
+    }
+
+
+def _reply_stats(
+    minutes: np.ndarray,
+    is_user: np.ndarray,
+    sender_codes: np.ndarray,
+    sender_names: Sequence[str],
+) -> Dict[str, Any]:
+    """
+    상대 메시지 각각에 대해 "다음 내 메시지"까지의 간격(분)을 한 번에 계산한다.
+    (KakaoFeatureAccumulator의 답장 대기 목록 방식과 같은 결과)
+    """
+    n = len(minutes)
+
+    # 각 행에서 (자기 자신 포함) 다음에 오는 첫 내 메시지 행: 뒤에서부터 누적 최솟값
+    user_row_or_n = np.where(is_user, np.arange(n), n)
+    next_user_row = np.minimum.accumulate(user_row_or_n[::-1])[::-1]
+
+    other_rows = np.flatnonzero(~is_user)
+    next_rows = next_user_row[other_rows]
+    answered = next_rows < n
+    other_rows = other_rows[answered]
+    deltas = minutes[next_rows[answered]] - minutes[other_rows]
+
+    valid = (deltas > 0) & (deltas < MAX_REPLY_MINUTES)
+    return _summarize_replies(deltas[valid], sender_codes[other_rows[valid]], sender_names)
+
+
+def _iter_replies_by_sender(
+    minutes: np.ndarray,
+    sender_codes: np.ndarray,
+    order: np.ndarray,
+    bounds: np.ndarray,
+    selected: np.ndarray,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    발화자 전원의 답장 간격을 한 번에 모은다 (발화자 수만큼 전체 배열을 다시 훑지 않음).
+
+    발화자 u의 메시지 j를 "다음 내 메시지"로 갖는 상대 메시지는 u의 직전 메시지와 j 사이의 행들이고,
+    minutes가 시각 순이라 그중 간격이 (0, MAX_REPLY_MINUTES)인 행은 연속 구간 [lo, hi)가 된다.
+    구간 계산은 배열 연산 한 번이고, 구간을 펼친 (답장 간격, 상대) 쌍은 REPLY_PAIR_CHUNK개 안팎씩
+    발화자 묶음 단위로 만든다 (비용은 메시지 수 + 실제 답장 수에 비례, 메모리는 묶음 크기로 제한).
+
+    order / bounds: 발화자 코드로 안정 정렬한 행 번호와 발화자별 경계
+    selected: 발화자별 bool (False인 발화자는 쌍을 만들지 않고 빈 배열)
+    yield: 발화자 코드 순으로 (답장 간격, 상대 발화자 코드) — 상대 메시지 행 순
+    """
+    # 같은 발화자의 직전 메시지 행 (없으면 -1)
+    prev_same = np.full(len(minutes), -1, dtype=np.int64)
+    same = sender_codes[order[1:]] == sender_codes[order[:-1]]
+    prev_same[order[1:][same]] = order[:-1][same]
+
+    reply_minutes = minutes[order]
+    lo = np.maximum(
+        prev_same[order] + 1,
+        np.searchsorted(minutes, reply_minutes - MAX_REPLY_MINUTES, side="right"),
+    )
+    hi = np.searchsorted(minutes, reply_minutes, side="left")
+    lengths = np.maximum(hi - lo, 0)
+    lengths[~selected[sender_codes[order]]] = 0
+    pair_bounds = np.concatenate(([0], np.cumsum(lengths)))[bounds]
+
+    sender_count = len(bounds) - 1
+    code = 0
+    while code < sender_count:
+        # 이번 묶음: 쌍이 REPLY_PAIR_CHUNK개를 넘지 않는 만큼의 발화자 (적어도 한 명)
+        stop = int(np.searchsorted(pair_bounds, pair_bounds[code] + REPLY_PAIR_CHUNK, side="right")) - 1
+        stop = min(max(stop, code + 1), sender_count)
+
+        rows = slice(bounds[code], bounds[stop])
+        chunk_lengths = lengths[rows]
+        chunk_ends = np.cumsum(chunk_lengths)
+        total = int(chunk_ends[-1]) if len(chunk_ends) else 0
+        other_rows = np.arange(total) - np.repeat(chunk_ends - chunk_lengths - lo[rows], chunk_lengths)
+        deltas = np.repeat(reply_minutes[rows], chunk_lengths) - minutes[other_rows]
+        partners = sender_codes[other_rows]
+
+        base = pair_bounds[code]
+        for c in range(code, stop):
+            pairs = slice(pair_bounds[c] - base, pair_bounds[c + 1] - base)
+            yield deltas[pairs], partners[pairs]
+        code = stop
+
+
+def _room_sessions(minutes: np.ndarray) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """SESSION_GAP_MINUTES 넘게 끊기면 나누는 대화 세션 (방 전체 기준). 반환: (세션 시작 행, 통계)."""
+    if len(minutes) == 0:
+        return np.zeros(0, dtype=np.int64), {
+            "session_count": 0,
+            "avg_session_messages": 0.0,
+            "avg_session_minutes": 0.0,
+            "session_gap_minutes_median": 0.0,
+        }
+
+    gaps = np.diff(minutes)
+    breaks = np.flatnonzero(gaps > SESSION_GAP_MINUTES)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(minutes) - 1]))
+    session_count = int(len(starts))
+
+    return starts, {
+        "session_count": session_count,
+        "avg_session_messages": len(minutes) / session_count,
+        "avg_session_minutes": float((minutes[ends] - minutes[starts]).mean()),
+        "session_gap_minutes_median": _percentile_sorted(np.sort(gaps[breaks]), 0.5),
+    }
+
+
+def _user_time_features(
+    user_minutes: np.ndarray,
+    reply_stats: Dict[str, Any],
+    sessions: Dict[str, Any],
+    session_start_ratio: float,
+) -> Dict[str, Any]:
+    """내 메시지 시각으로 시간대 비율 / 요일x시간 히스토그램을 만들고 답장·세션 특징과 합친다."""
+    user_msg_count = int(len(user_minutes))
+
+    hours = (user_minutes // 60) % 24
+    weekdays = (user_minutes // (60 * 24) + _EPOCH_WEEKDAY_OFFSET) % 7
+
+    bucket_counts = np.bincount(hours // 6, minlength=4)
+    bucket_dict = {name: int(c) for name, c in zip(BUCKET_NAMES, bucket_counts)}
+    ratios: List[float] = [
+        int(c) / user_msg_count if user_msg_count > 0 else 0.0 for c in bucket_counts
+    ]
+
+    hour_of_week = np.bincount(weekdays * 24 + hours, minlength=7 * 24).reshape(7, 24)
+    weekend_count = int(hour_of_week[5:].sum())
+
+    return {
+        "user_night_message_ratio": ratios[0],
+        **reply_stats,
+        "user_time_ratio_night": ratios[0],
+        "user_time_ratio_morning": ratios[1],
+        "user_time_ratio_afternoon": ratios[2],
+        "user_time_ratio_evening": ratios[3],
+        "user_most_active_period": (
+            max(bucket_dict, key=bucket_dict.get) if user_msg_count > 0 else None
+        ),
+        "user_hour_of_week_hist": hour_of_week.tolist(),
+        "user_weekend_message_ratio": weekend_count / user_msg_count if user_msg_count > 0 else 0.0,
+        **sessions,
+        # 대화를 먼저 시작한 비율 (세션 첫 메시지가 내 메시지)
+        "user_session_start_ratio": session_start_ratio,
+    }
+
+
+def extract_temporal_features(
+    minutes: np.ndarray,
+    sender_codes: np.ndarray,
+    user_code: int,
+    sender_names: Sequence[str],
+) -> Dict[str, Any]:
+    """
+    시각/발화자 배열만으로 시간 관련 카톡 특징을 벡터 연산으로 계산한다.
+
+    - minutes: epoch 기준 분 (int64, 시각 순 정렬)
+    - sender_codes: 발화자 코드 (sender_names[code] 가 이름)
+    - user_code: "나"의 발화자 코드 (-1이면 내 메시지 없음)
+
+    반환:
+    - user_time_ratio_* / user_night_message_ratio / user_most_active_period (기존 특징과 같은 값)
+    - avg_reply_minutes / reply_count / reply_minutes_median / reply_minutes_p90 / reply_minutes_by_partner
+    - user_hour_of_week_hist: 7 x 24 (월요일부터, 0~23시) 내 메시지 수
+    - user_weekend_message_ratio
+    - session_count / avg_session_messages / avg_session_minutes /
+      session_gap_minutes_median / user_session_start_ratio
+    """
+    minutes = np.asarray(minutes, dtype=np.int64)
+    sender_codes = np.asarray(sender_codes, dtype=np.int64)
+    is_user = sender_codes == user_code
+
+    starts, sessions = _room_sessions(minutes)
+    start_ratio = float(is_user[starts].mean()) if len(starts) else 0.0
+    return _user_time_features(
+        minutes[is_user],
+        _reply_stats(minutes, is_user, sender_codes, sender_names),
+        sessions,
+        start_ratio,
+    )
+
+
+def extract_temporal_features_by_sender(
+    minutes: np.ndarray,
+    sender_codes: np.ndarray,
+    sender_names: Sequence[str],
+    selected: Optional[Sequence[bool]] = None,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    발화자 전원에 대해 extract_temporal_features를 한 번에 계산한다 (단톡방 일괄 분석용).
+    세션 구간과 답장 간격은 방 전체에서 한 번에 계산하고, 발화자별로는 묶어 둔 결과를 요약만 한다.
+
+    selected: 발화자 코드별로 계산할지 여부 (None이면 전원)
+    반환: 발화자 코드 순서의 특징 dict 리스트 (결과는 user_code별로 따로 호출한 것과 같음,
+    selected가 False인 자리는 None)
+    """
+    minutes = np.asarray(minutes, dtype=np.int64)
+    sender_codes = np.asarray(sender_codes, dtype=np.int64)
+    sender_count = len(sender_names)
+    selected = np.ones(sender_count, dtype=bool) if selected is None else np.asarray(selected, dtype=bool)
+
+    starts, sessions = _room_sessions(minutes)
+    start_counts = np.bincount(sender_codes[starts], minlength=sender_count)
+
+    # 발화자별 행 번호를 한 번의 안정 정렬로 묶어 둔다
+    order = np.argsort(sender_codes, kind="stable")
+    bounds = np.searchsorted(sender_codes[order], np.arange(sender_count + 1))
+    replies = _iter_replies_by_sender(minutes, sender_codes, order, bounds, selected)
+
+    out: List[Optional[Dict[str, Any]]] = []
+    for code, (deltas, partners) in enumerate(replies):
+        if not selected[code]:
+            out.append(None)
+            continue
+        rows = order[bounds[code]:bounds[code + 1]]
+        start_ratio = int(start_counts[code]) / len(starts) if len(starts) else 0.0
+        out.append(
+            _user_time_features(
+                minutes[rows],
+                _summarize_replies(deltas, partners, sender_names),
+                sessions,
+                start_ratio,
+            )
+        )
+    return out
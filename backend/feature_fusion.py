@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import math
+import os
+from typing import Dict, Any, List, Optional, Tuple
+
+from .mbti_scorer import FEATURE_COLUMNS
+
+# 분석 소스 종류 (/analyze/multi 업로드 파일마다 하나로 판별)
+SOURCE_TYPES = ("kakao", "youtube", "sns")
+
+# 소스별 가중치 (환경 변수 FUSION_WEIGHTS="kakao=1,youtube=0.5,sns=0.5" 형식으로 조정)
+# 같은 점수 특징을 여러 소스가 주면 가중 평균한다. 소스가 하나뿐인 특징은 그 값을 그대로 쓴다.
+DEFAULT_FUSION_WEIGHTS = "kakao=1.0,youtube=0.5,sns=0.5"
+
+# 유튜브 / SNS 특징 → score_mbti 특징 (카톡 특징과 의미가 같은 것만)
+# 카톡은 score_mbti 특징을 그대로 가지고 있으므로 매핑이 필요 없다.
+SOURCE_FEATURE_MAP: Dict[str, Dict[str, str]] = {
+    "youtube": {
+        "user_night_message_ratio": "youtube_time_ratio_night",
+        "topic_hobby_ratio": "youtube_category_entertainment_ratio",
+        "topic_school_ratio": "youtube_category_education_ratio",
+        "topic_emotion_ratio": "youtube_category_emotional_ratio",
+        "topic_info_request_ratio": "youtube_category_info_ratio",
+    },
+    "sns": {
+        "positive_ratio": "sns_positive_ratio",
+        "negative_ratio": "sns_negative_ratio",
+        "user_question_ratio": "sns_question_post_ratio",
+        "user_exclamation_ratio": "sns_exclamation_post_ratio",
+        "user_night_message_ratio": "sns_time_ratio_night",
+    },
+}
+
+# 신뢰도(데이터 양)에 쓰는 "내가 쓴 단어 수"에 더하는 소스별 특징
+_WORD_COUNT_KEYS = {"kakao": "word_count", "sns": "sns_word_count"}
+
+
+def parse_fusion_weights(spec: str) -> Dict[str, float]:
+    """
+    "kakao=1,youtube=0.5" → {"kakao": 1.0, "youtube": 0.5}.
+    적지 않은 소스는 기본 가중치를 쓴다. 모르는 소스 / 음수 / 숫자가 아니거나 inf / nan이면 ValueError.
+    """
+    weights: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, sep, value = part.partition("=")
+        name = name.strip()
+        if not sep or name not in SOURCE_TYPES:
+            raise ValueError(f"invalid fusion weight {part.strip()!r} (expected one of {SOURCE_TYPES} = number)")
+        weight = float(value)
+        # inf는 가중 평균을 nan으로 만들므로 유한한 값만
+        if not math.isfinite(weight) or weight < 0:
+            raise ValueError(f"fusion weight for {name} must be a finite number >= 0")
+        weights[name] = weight
+    return weights
+
+
+FUSION_WEIGHTS = {
+    **parse_fusion_weights(DEFAULT_FUSION_WEIGHTS),
+    **parse_fusion_weights(os.getenv("FUSION_WEIGHTS", "")),
+}
+
+
+def resolve_fusion_weights(overrides: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """기본 가중치(FUSION_WEIGHTS)에 요청별 가중치를 덮어쓴 값."""
+    return {**FUSION_WEIGHTS, **(overrides or {})}
+
+
+def _providers(source_features: Dict[str, Dict[str, Any]], column: str) -> List[Tuple[str, Any]]:
+    """column 값을 가진 (소스, 값) 목록."""
+    providers = []
+    for source, features in source_features.items():
+        if source == "kakao":
+            key: Optional[str] = column
+        else:
+            key = SOURCE_FEATURE_MAP.get(source, {}).get(column)
+        if key is not None and key in features:
+            providers.append((source, features[key]))
+    return providers
+
+
+def fuse_features(
+    source_features: Dict[str, Dict[str, Any]],
+    weights: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    소스별 특징 dict들을 score_mbti에 넣을 특징 dict 하나로 합친다.
+
+    - 소스별 특징은 모두 그대로 포함 (유튜브 / SNS는 youtube_ / sns_ 접두사라 겹치지 않음)
+    - score_mbti 특징(FEATURE_COLUMNS)은 값을 가진 소스들의 가중 평균
+      (가진 소스가 하나면 그 값 그대로 → 카톡만 올리면 /analyze/kakao와 같은 점수)
+    - word_count: 카톡 + SNS 단어 수 합 (신뢰도 데이터 양)
+    """
+    weights = resolve_fusion_weights(weights)
+
+    fused: Dict[str, Any] = {}
+    for source in SOURCE_TYPES:
+        if source in source_features:
+            fused.update(source_features[source])
+
+    for column in FEATURE_COLUMNS:
+        providers = _providers(source_features, column)
+        if len(providers) == 1:
+            fused[column] = providers[0][1]
+            continue
+        weighted = [(weights.get(source, 0.0), value) for source, value in providers]
+        total = sum(w for w, _ in weighted)
+        if total <= 0:
+            # 값을 가진 소스 가중치가 전부 0이면 단순 평균
+            weighted = [(1.0, v) for _, v in weighted]
+            total = float(len(weighted))
+        if weighted:
+            fused[column] = sum(w * v for w, v in weighted) / total
+
+    word_counts = [
+        source_features[source].get(key, 0) or 0
+        for source, key in _WORD_COUNT_KEYS.items()
+        if source in source_features
+    ]
+    if word_counts:
+        fused["word_count"] = sum(word_counts)
+    return fused
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+# 동시에 돌릴 분석 작업 수 / 메모리에 보관할 작업 수
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+MAX_STORED_JOBS = int(os.getenv("MAX_STORED_JOBS", "200"))
+# 아직 끝나지 않은(queued / running) 작업 상한. 대기 중인 작업도 업로드 임시 파일을 들고 있으므로
+# 넘으면 새 작업을 받지 않는다.
+MAX_PENDING_JOBS = int(os.getenv("MAX_PENDING_JOBS", "20"))
+
+
+class JobQueueFull(Exception):
+    """끝나지 않은 작업이 이미 max_pending개라서 새 작업을 받을 수 없음."""
+
+
+class Job:
+    """
+    백그라운드 분석 작업 하나.
+    - status: queued → running → done / error
+    - events: 지금까지 발생한 단계 이벤트 (SSE 구독자가 처음부터 다시 받을 수 있게 보관)
+    """
+
+    def __init__(self) -> None:
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.created_at = time.time()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, str]] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error")
+
+    def emit(self, stage: str, data: Dict[str, Any]) -> None:
+        """이벤트 추가 (데이터는 이 시점의 JSON으로 고정) 후 구독자 깨우기."""
+        self.events.append(
+            {"event": stage, "data": json.dumps(data, ensure_ascii=False, default=str)}
+        )
+        asyncio.get_running_loop().create_task(self._notify())
+
+    async def _notify(self) -> None:
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def iter_events(self) -> AsyncIterator[Dict[str, str]]:
+        """처음 이벤트부터 순서대로 yield, 작업이 끝나면 종료."""
+        index = 0
+        while True:
+            async with self._changed:
+                while index >= len(self.events) and not self.finished:
+                    await self._changed.wait()
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.finished:
+                return
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stages": [e["event"] for e in self.events],
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    분석 작업 실행기.
+    - submit(): 작업을 만들고 바로 반환, 실제 실행은 백그라운드 task
+    - 동시에 JOB_WORKERS개까지만 실행 (나머지는 queued 상태로 대기)
+    - 끝나지 않은 작업은 MAX_PENDING_JOBS개까지만 받음 (넘으면 JobQueueFull)
+    - 끝난 작업은 MAX_STORED_JOBS개까지만 보관 (오래된 것부터 삭제)
+    - shutdown(): 대기 / 실행 중인 작업을 취소 (각 작업의 cleanup은 그대로 실행됨)
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_jobs: int = MAX_STORED_JOBS,
+        max_pending: int = MAX_PENDING_JOBS,
+    ) -> None:
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: set = set()
+        self._pending = 0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    @property
+    def pending(self) -> int:
+        """queued / running 상태인 작업 수."""
+        return self._pending
+
+    @property
+    def full(self) -> bool:
+        return self._pending >= self.max_pending
+
+    def submit(
+        self,
+        run: Callable[[Callable[[str, Dict[str, Any]], None]], Awaitable[Dict[str, Any]]],
+        cleanup: Optional[Callable[[], None]] = None,
+    ) -> Job:
+        """
+        run(progress) 코루틴 함수를 백그라운드로 실행한다.
+        progress(stage, data)로 보낸 단계는 job 이벤트가 되고,
+        끝나면 "done"(결과 전체) 또는 "error" 이벤트가 붙는다.
+
+        cleanup: 작업이 끝나거나 실행 전에 취소되거나 받지 못했을 때(JobQueueFull) 한 번 호출
+        (업로드 임시 파일 정리 등).
+        """
+        if self.full:
+            if cleanup is not None:
+                cleanup()
+            raise JobQueueFull(f"{self._pending} jobs are already pending")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.workers)
+
+        job = Job()
+        self._jobs[job.id] = job
+        self._pending += 1
+        self._evict()
+
+        task = asyncio.get_running_loop().create_task(self._run(job, run))
+        self._tasks.add(task)
+        # 실행 전에 취소된 task는 코루틴 본문이 아예 돌지 않으므로 정리는 done 콜백에서 한다
+        task.add_done_callback(lambda t: self._finished(job, t, cleanup))
+        return job
+
+    async def _run(self, job: Job, run: Callable[..., Awaitable[Dict[str, Any]]]) -> None:
+        assert self._semaphore is not None
+        async with self._semaphore:
+            job.status = "running"
+            job.emit("running", {})
+            try:
+                result = await run(job.emit)
+            except Exception as e:
+                print(f"[jobs] job {job.id} failed: {e}")
+                job.error = str(e)
+                job.status = "error"
+                job.emit("error", {"detail": job.error})
+                return
+            job.result = result
+            job.status = "done"
+            job.emit("done", result)
+
+    def _finished(self, job: Job, task: "asyncio.Task[None]", cleanup: Optional[Callable[[], None]]) -> None:
+        self._tasks.discard(task)
+        self._pending -= 1
+        if task.cancelled() and not job.finished:
+            job.error = "cancelled"
+            job.status = "error"
+            job.emit("error", {"detail": job.error})
+        if cleanup is not None:
+            cleanup()
+
+    def _evict(self) -> None:
+        while len(self._jobs) > self.max_jobs:
+            oldest_id = next(
+                (jid for jid, j in self._jobs.items() if j.finished),
+                None,
+            )
+            if oldest_id is None:
+                break
+            del self._jobs[oldest_id]
+
+    async def shutdown(self) -> None:
+        """서버 종료 시: 남은 작업 task를 모두 취소하고 끝날 때까지 기다린다."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_manager = JobManager()
+
+
+def format_sse(event: Dict[str, str]) -> str:
+    """Server-Sent Events 한 건 직렬화."""
+    return f"event: {event['event']}\ndata: {event['data']}\n\n"
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from .data_loader.message_table import MessageTable
+from .feature_extractor.features_common import extract_text_features
+from .feature_extractor.features_kakao import extract_kakao_features, extract_kakao_features_by_sender
+from .mbti_scorer import score_mbti, score_mbti_matrix, features_to_matrix
+from .pipeline import parse_kakao_uploads, merge_kakao_batches
+from .confidence_engine import compute_confidence
+from .llm_runner import generate_llm_outputs
+from .analysis_cache import (
+    analysis_cache,
+    make_analysis_key,
+    make_batch_key,
+    make_batch_report_key,
+)
+from .metrics import StageTimings
+from .data_loader.kakao_parser import (
+    ParsedChat,
+    detect_kakao_encoding,
+    find_first_message_line,
+    parse_kakao_buffer,
+)
+from .room_state import (
+    RoomState,
+    RoomStateStore,
+    body_digest,
+    get_room_state_store,
+    make_room_key,
+)
+from .util.file_utils import UploadSource, open_upload_buffer
+
+# 단계별 진행 상황 콜백: progress(stage, data)
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def _notify(progress: Optional[ProgressCallback], stage: str, data: Dict[str, Any]) -> None:
+    if progress is not None:
+        progress(stage, data)
+
+
+def _resolve_user_sender(user_name: str, senders: Dict[str, int]) -> Optional[str]:
+    """user_name이 실제 발화자면 그 이름, 없으면 가장 많이 말한 사람 (발화자가 없으면 None)."""
+    if user_name in senders:
+        return user_name
+    if senders:
+        # 못 찾으면 예전처럼 가장 많이 말한 사람으로 fallback
+        return max(senders, key=senders.get)
+    return None
+
+
+def _extract_features(
+    all_messages: MessageTable,
+    total_line_count: int,
+    senders_merged: Dict[str, int],
+    user_name: str,
+    timings: StageTimings,
+) -> Dict[str, Any]:
+    """합쳐진 타임라인에서 공통 + 카톡 특징을 뽑는다 (CPU 작업, 스레드에서 실행)."""
+    user_sender_name = _resolve_user_sender(user_name, senders_merged)
+
+    # raw_text는 필요할 때만 만들어진다 (ParsedChat)
+    parsed_all = ParsedChat(
+        messages=all_messages,
+        meta={
+            "source": "kakao",
+            "line_count": total_line_count,
+            "message_count": len(all_messages),
+            "senders": senders_merged,
+            "user_sender": user_sender_name,
+        },
+    )
+
+    # 공통 텍스트 특징 (전체 대화 텍스트 기반, 방 전체 문자열을 만들지 않고 블록 단위로)
+    with timings.span("features_text"):
+        common_features = extract_text_features(parsed_all.texts())
+
+    # 카카오톡 전용 특징 (여기서 user_sender = user_name 기반으로 잡힘)
+    with timings.span("features_kakao"):
+        kakao_features = extract_kakao_features(parsed_all)
+
+    # 공통 + 카톡 특징 합치기
+    return {**common_features, **kakao_features}
+
+
+async def _parse_and_merge(
+    raw_files: List[UploadSource],
+    timings: StageTimings,
+    progress: Optional[ProgressCallback],
+    file_digests: Optional[List[str]] = None,
+) -> Tuple[MessageTable, int, Dict[str, int], Optional[int]]:
+    """
+    업로드 파일들을 파싱해서 하나의 타임라인으로 합친다 (단건 / 일괄 분석 공용).
+    file_digests를 주면 예전에 파싱한 적 있는 파일은 파싱 결과 캐시(chat_cache)에서 불러온다.
+    반환: (MessageTable, 전체 줄 수, 발화자별 메시지 수, 마지막 파일 끝에서의 날짜)
+    """
+    # 각 파일 파싱은 프로세스 풀에서 파일당 작업 하나씩 동시에 돌린다.
+    # (이벤트 루프를 막지 않고, 파일이 여러 개면 가장 큰 파일 시간 정도만 걸림)
+    # 디코딩도 워커 안에서 파싱과 같이 일어나므로 "parse"에 포함된다.
+    with timings.span("parse"):
+        batches = await parse_kakao_uploads(raw_files, file_digests)
+
+    # === 여러 파일을 하나로 합치기 ===
+    # 파일별로 이미 정렬된 배치를 타임스탬프 순 k-way merge
+    with timings.span("merge"):
+        all_messages, total_line_count, senders_merged = merge_kakao_batches(batches)
+    tail_day = batches[-1].get("current_day") if batches else None
+    del batches
+    timings.count("line_count", total_line_count)
+    timings.count("message_count", len(all_messages))
+    timings.count("sender_count", len(senders_merged))
+    _notify(
+        progress,
+        "parsed",
+        {"message_count": len(all_messages), "sender_count": len(senders_merged)},
+    )
+    return all_messages, total_line_count, senders_merged, tail_day
+
+
+def _incremental_features(
+    store: RoomStateStore,
+    source: UploadSource,
+    user_name: str,
+    timings: StageTimings,
+) -> Optional[Tuple[Dict[str, Any], int, int]]:
+    """
+    (스레드에서 실행) 저장된 방 상태가 있고 업로드가 그 뒤에 메시지만 더 붙은 파일이면
+    새 부분만 파싱 / 누적해서 특징을 만든다. 반환: (특징, 메시지 수, 발화자 수) 또는 None(처음부터 분석).
+    """
+    with open_upload_buffer(source) as buf:
+        with timings.span("room_lookup"):
+            encoding = detect_kakao_encoding(buf)
+            body_start = find_first_message_line(buf, encoding)
+            if body_start is None:
+                return None
+            key = make_room_key(buf, body_start, encoding, user_name)
+            state = store.get(key) if key is not None else None
+            hasher = state.check_prefix(buf, body_start, encoding) if state is not None else None
+            if hasher is None:
+                return None
+
+        # 새로 붙은 부분만 파싱 (스타일 B는 저장해 둔 마지막 날짜부터 이어서)
+        tail = body_start + state.body_bytes
+        with timings.span("parse"):
+            stats: Dict[str, Any] = {}
+            delta = parse_kakao_buffer(
+                buf, encoding=encoding, stats=stats, start=tail, current_day=state.current_day
+            ).sorted_by_time()
+            with memoryview(buf) as view, view[tail:] as part:
+                hasher.update(part)
+        header_lines = buf[:body_start].count(b"\n")
+        body_bytes = len(buf) - body_start
+        # 마지막 줄이 줄바꿈으로 끝나야 다음 파일에서 그 위치부터 이어서 파싱할 수 있다
+        resumable = buf[-1:] == b"\n"
+
+    senders = dict(state.sender_counts)
+    for name, count in stats["senders"].items():
+        senders[name] = senders.get(name, 0) + count
+    if not state.can_extend(delta) or _resolve_user_sender(user_name, senders) != state.user_sender:
+        return None
+
+    with timings.span("merge"):
+        state.extend(
+            delta, stats["line_count"], stats["current_day"], body_bytes, hasher.hexdigest(), timings
+        )
+    timings.count("line_count", header_lines + state.line_count)
+    timings.count("message_count", len(state))
+    timings.count("sender_count", len(state.sender_counts))
+    timings.count("new_message_count", len(delta))
+
+    features = state.features(timings)
+    if resumable:
+        store.put(key, state)
+    return features, len(state), len(state.sender_counts)
+
+
+def _build_room_features(
+    store: RoomStateStore,
+    source: UploadSource,
+    all_messages: MessageTable,
+    total_line_count: int,
+    senders_merged: Dict[str, int],
+    tail_day: Optional[int],
+    user_name: str,
+    timings: StageTimings,
+) -> Dict[str, Any]:
+    """
+    (스레드에서 실행) 파일 하나를 처음부터 분석할 때: 방 상태를 새로 만들어 특징을 계산하고 저장한다.
+    본문이 짧아 방 키를 못 만들거나 줄바꿈으로 끝나지 않는 파일이면 저장 없이 _extract_features로.
+    """
+    with open_upload_buffer(source) as buf:
+        encoding = detect_kakao_encoding(buf)
+        body_start = find_first_message_line(buf, encoding)
+        key = None
+        if body_start is not None and buf[-1:] == b"\n":
+            key = make_room_key(buf, body_start, encoding, user_name)
+        if key is not None:
+            header_lines = buf[:body_start].count(b"\n")
+            body_bytes = len(buf) - body_start
+            prefix_digest = body_digest(buf, body_start, len(buf))
+
+    if key is None:
+        return _extract_features(all_messages, total_line_count, senders_merged, user_name, timings)
+
+    state = RoomState(user_name, _resolve_user_sender(user_name, senders_merged), encoding)
+    state.extend(
+        all_messages, total_line_count - header_lines, tail_day, body_bytes, prefix_digest, timings
+    )
+    features = state.features(timings)
+    store.put(key, state)
+    return features
+
+
+async def run_kakao_analysis(
+    raw_files: List[UploadSource],
+    file_digests: List[str],
+    user_name: str,
+    progress: Optional[ProgressCallback] = None,
+    llm_client: Optional[Any] = None,
+    timings: Optional[StageTimings] = None,
+    debug: bool = False,
+) -> Dict[str, Any]:
+    """
+    카카오톡 분석 파이프라인 전체 (/analyze/kakao 와 /jobs/kakao 공용).
+
+    1) 분석 결과 캐시 확인 (파일 digest + 이름)
+    2) 파일별 파싱 (프로세스 풀, 전에 파싱한 파일은 chat_cache에서 불러옴) → k-way merge
+       (파일이 하나고 같은 방의 저장된 상태가 있으면 새로 붙은 메시지만 파싱 / 누적, room_state 참고)
+    3) 특징 추출 (스레드)
+    4) MBTI 점수 + 신뢰도
+    5) LLM 라벨 / 페르소나 개요 / 리포트 (동시 호출)
+
+    progress가 있으면 단계가 끝날 때마다
+    "parsed" / "features" / "scored" / "report" (캐시 적중 시 "cached") 를 알려준다.
+    "scored" 데이터에는 LLM 없이 바로 보여줄 수 있는 mbti / confidence / meta 가 들어간다.
+    llm_client: 테스트/벤치마크용 가짜 클라이언트 (None이면 각 모듈의 OpenAI 클라이언트)
+
+    단계별 시간은 항상 timings(없으면 새로 만듦)와 /metrics 히스토그램에 기록되고,
+    debug=True면 응답 meta["debug"]에 단계별 ms / 메시지 수 / peak RSS가 들어간다.
+    """
+    if timings is None:
+        timings = StageTimings()
+
+    with timings.span("cache_lookup"):
+        cache_key = make_analysis_key(file_digests, user_name)
+        cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        cached["meta"]["cached"] = True
+        _finish(timings, cached, debug)
+        _notify(progress, "cached", {})
+        return cached
+
+    file_count = len(raw_files)
+
+    # 파일 하나면 같은 방의 예전 분석 상태에 새 메시지만 이어서 누적해 본다
+    room_store = get_room_state_store() if file_count == 1 else None
+    incremental = None
+    if room_store is not None:
+        incremental = await asyncio.to_thread(
+            _incremental_features, room_store, raw_files[0], user_name, timings
+        )
+
+    if incremental is not None:
+        all_features, message_count, sender_count = incremental
+        _notify(progress, "parsed", {"message_count": message_count, "sender_count": sender_count})
+    else:
+        all_messages, total_line_count, senders_merged, tail_day = await _parse_and_merge(
+            raw_files, timings, progress, file_digests
+        )
+        if room_store is not None:
+            all_features = await asyncio.to_thread(
+                _build_room_features, room_store, raw_files[0], all_messages,
+                total_line_count, senders_merged, tail_day, user_name, timings,
+            )
+        else:
+            all_features = await asyncio.to_thread(
+                _extract_features, all_messages, total_line_count, senders_merged, user_name, timings
+            )
+        del all_messages
+    _notify(progress, "features", {"word_count": all_features.get("word_count", 0)})
+
+    with timings.span("score"):
+        mbti_result = score_mbti(all_features)
+        confidence = compute_confidence(all_features, source_count=file_count)
+    meta = {
+        "file_count": file_count,
+        "user_name_input": user_name,
+        "user_sender_resolved": all_features.get("user_sender_name"),
+        "cached": False,
+    }
+    _notify(progress, "scored", {"mbti": mbti_result, "confidence": confidence, "meta": meta})
+
+    # ★ 수식어 라벨 / 페르소나 개요 / 리포트 LLM 호출 3개를 동시에 (호출별 timeout + fallback)
+    # (LLM 호출별 시간은 llm_label / llm_persona / llm_report 단계로 기록)
+    llm_outputs = await generate_llm_outputs(
+        mbti_result, confidence, llm_client=llm_client, timings=timings
+    )
+    label = llm_outputs["label"]
+    report = llm_outputs["report"]
+
+    # ★ mbti_result 딕셔너리에 바로 붙여서 프론트로 넘김
+    mbti_result["persona_overview"] = llm_outputs["persona_overview"]
+    _notify(progress, "report", {})
+
+    result = {
+        "mbti": mbti_result,
+        "confidence": confidence,
+        "label": label,
+        "report": report,
+        "meta": meta,
+    }
+
+    # LLM 호출이 timeout / API 오류로 fallback을 쓴 결과는 다음 재시도에서 다시 생성되도록 캐시하지 않는다.
+    if not llm_outputs["failed"]:
+        analysis_cache.set(cache_key, result)
+
+    _finish(timings, result, debug)
+    return result
+
+
+def _extract_batch_features(
+    all_messages: MessageTable,
+    senders_merged: Dict[str, int],
+    min_messages: int,
+    timings: StageTimings,
+) -> Dict[str, Dict[str, Any]]:
+    """메시지가 min_messages 이상인 참여자의 공통 + 카톡 특징 (CPU 작업, 스레드에서 실행)."""
+    # 공통 텍스트 특징은 방 전체 텍스트 기준이라 모두에게 같은 값
+    with timings.span("features_text"):
+        common_features = extract_text_features(all_messages.text_blocks())
+
+    with timings.span("features_kakao"):
+        by_sender = extract_kakao_features_by_sender(all_messages, senders_merged, min_messages)
+
+    return {sender: {**common_features, **features} for sender, features in by_sender.items()}
+
+
+async def run_kakao_batch_analysis(
+    raw_files: List[UploadSource],
+    file_digests: List[str],
+    min_messages: int = 1,
+    include_reports: bool = False,
+    llm_client: Optional[Any] = None,
+    timings: Optional[StageTimings] = None,
+    debug: bool = False,
+) -> Dict[str, Any]:
+    """
+    단톡방 참여자 전원의 MBTI (/analyze/kakao/batch).
+
+    1) 일괄 분석 결과 캐시 확인 (파일 digest + min_messages 기준, 키가 곧 batch_id)
+    2) 파싱 / 병합은 한 번만
+    3) min_messages 이상 말한 발화자의 특징만 한 번의 순회로 같이 계산 (extract_kakao_features_by_sender)
+    4) 전원의 MBTI 점수를 특징 행렬로 한 번에 (score_mbti_matrix) + 발화자별 신뢰도
+
+    LLM 리포트는 기본으로 만들지 않는다. 필요한 사람만
+    generate_batch_report(batch_id, sender)로 나중에 만들고 (결과는 따로 캐시),
+    include_reports=True면 응답에 포함된 참여자 전원 것을 동시에 만든다.
+
+    participants는 메시지 수가 많은 순서이며, min_messages보다 적게 말한 사람은
+    특징 / 점수 계산 없이 skipped_senders에 이름만 남긴다.
+    """
+    if timings is None:
+        timings = StageTimings()
+
+    with timings.span("cache_lookup"):
+        batch_id = make_batch_key(file_digests, min_messages)
+        batch = analysis_cache.get(batch_id)
+
+    if batch is not None:
+        batch["meta"]["cached"] = True
+    else:
+        file_count = len(raw_files)
+        all_messages, _, senders_merged, _ = await _parse_and_merge(raw_files, timings, None, file_digests)
+
+        features_by_sender = await asyncio.to_thread(
+            _extract_batch_features, all_messages, senders_merged, min_messages, timings
+        )
+        message_count = len(all_messages)
+        del all_messages
+
+        # 참여자 전원을 특징 행렬 하나로 한 번에 채점 (행별 결과는 score_mbti와 같음)
+        with timings.span("score"):
+            senders = list(features_by_sender)
+            features_list = [features_by_sender[sender] for sender in senders]
+            scored = score_mbti_matrix(features_to_matrix(features_list))
+            participants = [
+                {
+                    "sender": sender,
+                    "message_count": senders_merged.get(sender, 0),
+                    "mbti": scored.row(i, features),
+                    "confidence": compute_confidence(features, source_count=file_count),
+                }
+                for i, (sender, features) in enumerate(zip(senders, features_list))
+            ]
+        participants.sort(key=lambda p: p["message_count"], reverse=True)
+        skipped = [sender for sender, count in senders_merged.items() if 0 < count < min_messages]
+        skipped.sort(key=senders_merged.__getitem__, reverse=True)
+
+        batch = {
+            "batch_id": batch_id,
+            "participants": participants,
+            "skipped_senders": skipped,
+            "meta": {
+                "file_count": file_count,
+                "message_count": message_count,
+                "sender_count": len(senders_merged),
+                "cached": False,
+            },
+        }
+        analysis_cache.set(batch_id, batch)
+
+    if include_reports:
+        participants = batch["participants"]
+        reports = await asyncio.gather(*(
+            _batch_report(batch_id, p, llm_client, timings) for p in participants
+        ))
+        for participant, report in zip(participants, reports):
+            participant.update(report)
+
+    _finish(timings, batch, debug)
+    return batch
+
+
+async def generate_batch_report(
+    batch_id: str,
+    sender: str,
+    llm_client: Optional[Any] = None,
+    timings: Optional[StageTimings] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    일괄 분석 결과 중 한 사람의 라벨 / 페르소나 개요 / 리포트를 (처음 요청할 때) 만든다.
+    batch_id 결과가 캐시에서 밀려났거나 그런 발화자가 없으면 None.
+    """
+    batch = analysis_cache.get(batch_id)
+    if batch is None:
+        return None
+    for participant in batch["participants"]:
+        if participant["sender"] == sender:
+            return {"sender": sender, **await _batch_report(batch_id, participant, llm_client, timings)}
+    return None
+
+
+async def _batch_report(
+    batch_id: str,
+    participant: Dict[str, Any],
+    llm_client: Optional[Any],
+    timings: Optional[StageTimings],
+) -> Dict[str, Any]:
+    """참여자 한 명의 LLM 출력 (발화자별 캐시 키, timeout / API 오류가 난 결과는 캐시하지 않음)."""
+    key = make_batch_report_key(batch_id, participant["sender"])
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached
+
+    llm_outputs = await generate_llm_outputs(
+        participant["mbti"], participant["confidence"], llm_client=llm_client, timings=timings
+    )
+    report = {
+        "label": llm_outputs["label"],
+        "persona_overview": llm_outputs["persona_overview"],
+        "report": llm_outputs["report"],
+    }
+    if not llm_outputs["failed"]:
+        analysis_cache.set(key, report)
+    return report
+
+
+def _finish(timings: StageTimings, result: Dict[str, Any], debug: bool) -> None:
+    """전체 시간 기록 + (debug면) 응답 meta에 단계별 시간 추가 (캐시에는 넣지 않음)."""
+    timings.record("total", time.perf_counter() - timings.started_at)
+    if debug:
+        result["meta"]["debug"] = timings.to_meta()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import os
 import re
 import random
@@ -8,6 +8,8 @@ import random
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from .llm_cache import get_llm_cache_for, make_cache_key
+
 # ==============================
 # 환경 변수(.env) 로드 & 클라이언트 설정
 # ==============================
@@ -23,6 +25,11 @@ else:
 
 print("[keyword_engine] API_KEY set:", bool(API_KEY), "client is None:", client is None)
 
+LABEL_SYSTEM_PROMPT = (
+    "반드시 label1, label2, label3 형태로만 출력하라. "
+    "설명 금지. 다른 문장 금지. 형식 변경 금지."
+)
+
 
 # ==============================
 # Dominant Aspect 계산
@@ -127,20 +134,47 @@ label3: 감성파 ENFP
     return prompt
 
 
+def _request_options(timeout: Optional[float]) -> Dict[str, Any]:
+    """timeout이 있으면 요청별 timeout 옵션 (None을 넘기면 SDK가 timeout을 아예 끄므로 빼고 넘김)."""
+    return {"timeout": timeout} if timeout is not None else {}
+
+
 # ==============================
 # 최종 라벨 + 키워드 생성
 # ==============================
 def generate_label_with_llm(
     mbti_result: Dict[str, Any],
     confidence: Dict[str, Any],
+    llm_client: Optional[Any] = None,
+    timeout: Optional[float] = None,
 ) -> Dict[str, str]:
+    """
+    LLM으로 '수식어 + MBTI' 라벨을 만든다.
+    - llm_client: 테스트용 가짜 클라이언트 (None이면 모듈 OpenAI 클라이언트 사용)
+    - timeout: OpenAI 요청 timeout(초), None이면 클라이언트 기본값
+    """
+    label, _ = try_generate_label_with_llm(mbti_result, confidence, llm_client, timeout)
+    return label
+
 
+def try_generate_label_with_llm(
+    mbti_result: Dict[str, Any],
+    confidence: Dict[str, Any],
+    llm_client: Optional[Any] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[Dict[str, str], bool]:
+    """
+    generate_label_with_llm과 같지만 (라벨, 성공 여부)를 돌려준다.
+    API 오류 / 응답 파싱 실패로 기본 라벨을 쓴 경우 False (결과를 캐시하지 않도록).
+    API 키가 없어서 기본 라벨을 쓰는 것은 실패로 보지 않는다.
+    """
     mbti_type = mbti_result.get("type", "XXXX")
     fallback_label = f"기본형 {mbti_type}"
     fallback_keyword = "기본형"
 
-    if client is None:
-        return {"label": fallback_label, "keyword": fallback_keyword}
+    active_client = client if llm_client is None else llm_client
+    if active_client is None:
+        return {"label": fallback_label, "keyword": fallback_keyword}, True
 
     prompt = _build_label_prompt(mbti_result, confidence)
 
@@ -149,25 +183,28 @@ def generate_label_with_llm(
         print("[keyword_engine] model is o3*, fallback gpt-4o-mini")
         model_for_chat = "gpt-4o-mini"
 
-    try:
-        completion = client.chat.completions.create(
-            model=model_for_chat,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "반드시 label1, label2, label3 형태로만 출력하라. "
-                        "설명 금지. 다른 문장 금지. 형식 변경 금지."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            max_tokens=128,
-            temperature=1.3,
-            top_p=0.9,
-        )
+    # 같은 모델 + 같은 프롬프트면 캐시된 후보 3개를 재사용 (선택은 매번 랜덤)
+    cache = get_llm_cache_for(llm_client)
+    cache_key = make_cache_key(model_for_chat, LABEL_SYSTEM_PROMPT, prompt)
+    cached = cache.get(cache_key) if cache is not None else None
 
-        raw_text = (completion.choices[0].message.content or "").strip()
+    try:
+        if cached:
+            raw_text = cached
+        else:
+            completion = active_client.chat.completions.create(
+                model=model_for_chat,
+                messages=[
+                    {"role": "system", "content": LABEL_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                max_tokens=128,
+                temperature=1.3,
+                top_p=0.9,
+                **_request_options(timeout),
+            )
+
+            raw_text = (completion.choices[0].message.content or "").strip()
 
         # 라인별 파싱
         lines = [l.strip() for l in raw_text.split("\n") if l.strip()]
@@ -182,7 +219,10 @@ def generate_label_with_llm(
 
         if not labels:
             print("[keyword_engine] parsing failed, fallback")
-            return {"label": fallback_label, "keyword": fallback_keyword}
+            return {"label": fallback_label, "keyword": fallback_keyword}, False
+
+        if not cached and cache is not None:
+            cache.set(cache_key, raw_text)
 
         # 🎯 후보 3개 중 랜덤 1개 선택
         selected = random.choice(labels)
@@ -205,8 +245,8 @@ def generate_label_with_llm(
         return {
             "label": final_label,
             "keyword": keyword_part,
-        }
+        }, True
 
     except Exception as e:
         print(f"[keyword_engine] ERROR: {e}")
-        return {"label": fallback_label, "keyword": fallback_keyword}
+        return {"label": fallback_label, "keyword": fallback_keyword}, False
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# 기본 설정 (환경 변수로 조정)
+# - LLM_CACHE_PATH: SQLite 파일 경로 ("" 이면 디스크 계층 사용 안 함)
+# - LLM_CACHE_TTL_SECONDS: 캐시 유효 시간
+# - LLM_CACHE_MAX_ENTRIES: 메모리 LRU 최대 항목 수
+DEFAULT_CACHE_PATH = str(BASE_DIR / ".cache" / "llm_cache.sqlite3")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH)
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+
+
+def make_cache_key(model: str, *prompt_parts: str) -> str:
+    """모델 이름 + 프롬프트(시스템/사용자 메시지) 내용으로 만든 SHA-256 키."""
+    h = hashlib.sha256(model.encode("utf-8"))
+    for part in prompt_parts:
+        h.update(b"\x00")
+        h.update(part.encode("utf-8"))
+    return h.hexdigest()
+
+
+class LLMCache:
+    """
+    LLM 응답 텍스트 캐시 (내용 주소 기반).
+
+    - 1계층: 메모리 LRU (OrderedDict, 최대 max_entries개)
+    - 2계층: SQLite 파일 (db_path가 있을 때만, 서버 재시작 후에도 유지)
+    - TTL이 지난 항목은 읽을 때 버리고, 쓸 때 디스크에서도 정리한다.
+    - hit/miss 카운터는 stats()로 확인
+
+    스레드 풀에서 동시에 호출되므로 모든 접근은 lock으로 보호한다.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        db_path: Optional[str] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._expired(created_at, now):
+                        self._remember(key, created_at, value)
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+                )
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+
+_llm_cache: Optional[LLMCache] = None
+_llm_cache_configured = False
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """공용 LLM 캐시 (처음 쓸 때 환경 변수 설정으로 생성, 비활성화되어 있으면 None)."""
+    global _llm_cache, _llm_cache_configured
+    with _llm_cache_lock:
+        if not _llm_cache_configured:
+            _llm_cache = LLMCache(db_path=LLM_CACHE_PATH or None)
+            _llm_cache_configured = True
+        return _llm_cache
+
+
+def get_llm_cache_for(llm_client: Optional[Any]) -> Optional[LLMCache]:
+    """
+    LLM 호출에 쓸 캐시. 호출자가 클라이언트를 직접 넘기면(테스트용 가짜 클라이언트 등) None.
+    (키에 클라이언트가 들어가지 않으므로, 주입한 클라이언트의 응답이 실제 요청에 섞이지 않게 한다)
+    """
+    if llm_client is not None:
+        return None
+    return get_llm_cache()
+
+
+def set_llm_cache(cache: Optional[Any]) -> None:
+    """
+    공용 캐시 교체 (get/set 메서드만 있으면 다른 구현도 가능).
+    None을 넘기면 캐시를 끈다.
+    """
+    global _llm_cache, _llm_cache_configured
+    with _llm_cache_lock:
+        _llm_cache = cache
+        _llm_cache_configured = True
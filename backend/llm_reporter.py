@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import os
 
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from .llm_cache import get_llm_cache_for, make_cache_key
+
 # ==============================
 # 환경 변수(.env) 로드 & 클라이언트 설정
 # ==============================
@@ -19,6 +21,16 @@ if API_KEY:
 else:
     client = None  # API 키 없을 때를 대비
 
+REPORT_HEADER = "=== Real MBTI 리포트 (AI 분석) ===\n"
+
+REPORT_SYSTEM_PROMPT = "당신은 전문 심리 분석가이자 데이터 과학자입니다."
+PERSONA_SYSTEM_PROMPT = "너는 한국어로 친근하고 간결하게 성격을 설명해 주는 도우미야."
+
+
+def _request_options(timeout: Optional[float]) -> Dict[str, Any]:
+    """timeout이 있으면 요청별 timeout 옵션 (None을 넘기면 SDK가 timeout을 아예 끄므로 빼고 넘김)."""
+    return {"timeout": timeout} if timeout is not None else {}
+
 
 def _build_prompt(mbti_result: Dict[str, Any], confidence: Dict[str, Any]) -> str:
     scores = mbti_result["scores"]
@@ -111,29 +123,63 @@ def _build_prompt(mbti_result: Dict[str, Any], confidence: Dict[str, Any]) -> st
     return prompt
 
 
-def generate_report(mbti_result: Dict[str, Any], confidence: Dict[str, Any]) -> str:
-    header = "=== Real MBTI 리포트 (AI 분석) ===\n"
+def generate_report(
+    mbti_result: Dict[str, Any],
+    confidence: Dict[str, Any],
+    llm_client: Optional[Any] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    MBTI 결과 + 신뢰도로 LLM 분석 리포트를 생성한다.
+    - llm_client: 테스트용 가짜 클라이언트 (None이면 모듈 OpenAI 클라이언트 사용)
+    - timeout: OpenAI 요청 timeout(초), None이면 클라이언트 기본값
+    """
+    report, _ = try_generate_report(mbti_result, confidence, llm_client, timeout)
+    return report
+
 
-    if client is None:
+def try_generate_report(
+    mbti_result: Dict[str, Any],
+    confidence: Dict[str, Any],
+    llm_client: Optional[Any] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[str, bool]:
+    """
+    generate_report와 같지만 (리포트, 성공 여부)를 돌려준다.
+    API 오류 / 빈 응답 / 형식 오류로 안내 문구를 대신 넣은 경우 False (결과를 캐시하지 않도록).
+    API 키가 없다는 안내는 실패로 보지 않는다.
+    """
+    header = REPORT_HEADER
+    active_client = client if llm_client is None else llm_client
+
+    if active_client is None:
         # API 키가 설정 안 된 경우 안전하게 처리
         return (
             header
             + "AI 리포트를 생성하려면 OPENAI_API_KEY 환경변수가 필요합니다.\n"
             + "서버의 .env 파일 또는 환경변수를 확인해주세요."
-        )
+        ), True
 
     prompt = _build_prompt(mbti_result, confidence)
 
+    # 같은 모델 + 같은 프롬프트면 캐시된 리포트 재사용
+    cache = get_llm_cache_for(llm_client)
+    cache_key = make_cache_key(GPT_MODEL_NAME, REPORT_SYSTEM_PROMPT, prompt)
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached:
+        return header + cached, True
+
     try:
         # o3-mini / o3 는 Responses API 사용 + temperature 등 미지원
-        response = client.responses.create(
+        response = active_client.responses.create(
             model=GPT_MODEL_NAME,
             reasoning={"effort": "medium"},  # 필요 없으면 제거해도 됨
             input=[
-                {"role": "system", "content": "당신은 전문 심리 분석가이자 데이터 과학자입니다."},
+                {"role": "system", "content": REPORT_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
             max_output_tokens=2000,  # 리포트 길이 제한
+            **_request_options(timeout),
         )
 
         # 최신 SDK에서는 output_text 속성 제공
@@ -148,11 +194,14 @@ def generate_report(mbti_result: Dict[str, Any], confidence: Dict[str, Any]) ->
                 llm_text = getattr(getattr(first_content, "text", ""), "value", "").strip()
             except Exception:
                 llm_text = "AI 응답 파싱 중 예상치 못한 형식이 감지되었습니다."
+                return header + llm_text, False
 
         if not llm_text:
-            llm_text = "AI로부터 유효한 리포트를 받지 못했습니다."
+            return header + "AI로부터 유효한 리포트를 받지 못했습니다.", False
+        if cache is not None:
+            cache.set(cache_key, llm_text)
 
-        return header + llm_text
+        return header + llm_text, True
 
     except Exception as e:
         print(f"OpenAI API Error: {e}")
@@ -160,7 +209,7 @@ def generate_report(mbti_result: Dict[str, Any], confidence: Dict[str, Any]) ->
             header
             + "AI 서버와의 연결이 원활하지 않아 상세 리포트를 생성하지 못했습니다.\n\n"
             + f"(디버그용 에러 메시지: {str(e)})"
-        )
+        ), False
     
 def _build_persona_prompt(mbti_result: Dict[str, Any]) -> str:
     """
@@ -203,29 +252,53 @@ def _build_persona_prompt(mbti_result: Dict[str, Any]) -> str:
 """
     return prompt
 
-def generate_persona_overview(mbti_result: Dict[str, Any]) -> str:
+def generate_persona_overview(
+    mbti_result: Dict[str, Any],
+    llm_client: Optional[Any] = None,
+    timeout: Optional[float] = None,
+) -> str:
     """
     MBTI 결과를 기반으로 한 페르소나 개요 문단을 생성한다.
     - OPENAI_API_KEY가 없거나 오류가 나면 빈 문자열("")을 반환한다.
+    - llm_client: 테스트용 가짜 클라이언트 (None이면 모듈 OpenAI 클라이언트 사용)
+    - timeout: OpenAI 요청 timeout(초), None이면 클라이언트 기본값
     """
-    if client is None:
+    text, _ = try_generate_persona_overview(mbti_result, llm_client, timeout)
+    return text
+
+
+def try_generate_persona_overview(
+    mbti_result: Dict[str, Any],
+    llm_client: Optional[Any] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[str, bool]:
+    """
+    generate_persona_overview와 같지만 (개요, 성공 여부)를 돌려준다.
+    API 오류 / 빈 응답으로 ""를 돌려주는 경우 False (API 키가 없어서 ""인 것은 실패가 아님).
+    """
+    active_client = client if llm_client is None else llm_client
+    if active_client is None:
         # API 키 없으면 조용히 빈 문자열 리턴 (프론트에서 옵션으로 처리)
-        return ""
+        return "", True
 
     prompt = _build_persona_prompt(mbti_result)
 
+    cache = get_llm_cache_for(llm_client)
+    cache_key = make_cache_key(GPT_MODEL_NAME, PERSONA_SYSTEM_PROMPT, prompt)
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached:
+        return cached, True
+
     try:
-        response = client.responses.create(
+        response = active_client.responses.create(
             model=GPT_MODEL_NAME,
             reasoning={"effort": "medium"},
             input=[
-                {
-                    "role": "system",
-                    "content": "너는 한국어로 친근하고 간결하게 성격을 설명해 주는 도우미야.",
-                },
+                {"role": "system", "content": PERSONA_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
             max_output_tokens=2000,
+            **_request_options(timeout),
         )
 
         text = ""
@@ -240,7 +313,9 @@ def generate_persona_overview(mbti_result: Dict[str, Any]) -> str:
             except Exception:
                 text = ""
 
-        return text
+        if text and cache is not None:
+            cache.set(cache_key, text)
+        return text, bool(text)
     except Exception as e:
         print(f"OpenAI API Error (persona): {e}")
-        return ""
+        return "", False
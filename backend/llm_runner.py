@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from .llm_reporter import try_generate_report, try_generate_persona_overview, REPORT_HEADER
+from .keyword_engine import try_generate_label_with_llm
+from .metrics import StageTimings, span
+
+# LLM 호출 하나당 최대 대기 시간(초)
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+# 동기 OpenAI 호출을 돌릴 스레드 풀 (요청 하나당 3개 호출)
+_llm_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_WORKERS", "12")),
+    thread_name_prefix="llm",
+)
+
+
+async def _call_with_timeout(
+    fn: Callable[..., Any],
+    *args: Any,
+    timeout: float,
+    fallback: Any,
+    stage: str,
+    timings: Optional[StageTimings] = None,
+    **kwargs: Any,
+) -> Tuple[Any, str]:
+    """
+    동기 LLM 함수를 스레드 풀에서 실행하고, timeout을 넘기면 fallback 값을 돌려준다.
+    fn은 (결과, 성공 여부)를 돌려주는 try_generate_* 함수. 기다린 시간은 stage 이름으로 기록한다.
+
+    느린 호출이 스레드 풀을 계속 붙잡지 않도록 마감 시각을 같이 넘긴다.
+    - 대기열에 있다가 마감이 지난 호출은 시작하지 않는다 (기다리던 쪽이 취소함)
+    - 시작한 호출은 남은 시간을 fn(timeout=...)으로 받아 OpenAI 요청 자체의 timeout으로 쓴다
+
+    반환: (결과, 상태) — 상태는 "ok" / "failed"(API 오류 등으로 안내 문구 사용) / "timed_out"
+    """
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + timeout
+
+    def run() -> Any:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"{fn.__name__} waited past its deadline in the queue")
+        return fn(*args, timeout=remaining, **kwargs)
+
+    with span(timings, stage):
+        future = loop.run_in_executor(_llm_executor, run)
+        try:
+            result, ok = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            print(f"[llm_runner] {fn.__name__} timed out after {timeout:.0f}s, fallback")
+            return fallback, "timed_out"
+        except Exception as e:
+            print(f"[llm_runner] {fn.__name__} failed: {e!r}, fallback")
+            return fallback, "failed"
+    return result, "ok" if ok else "failed"
+
+
+async def generate_llm_outputs(
+    mbti_result: Dict[str, Any],
+    confidence: Dict[str, Any],
+    timeout: float = LLM_TIMEOUT_SECONDS,
+    llm_client: Optional[Any] = None,
+    timings: Optional[StageTimings] = None,
+) -> Dict[str, Any]:
+    """
+    수식어 라벨 / 페르소나 개요 / 리포트 3개의 LLM 호출을 동시에 보낸다.
+    - 전체 지연 시간 = 세 호출 중 가장 느린 것 (합이 아님)
+    - 호출별 timeout, 넘기면 각 함수의 기본(fallback) 텍스트 사용
+    - llm_client: 테스트용 가짜 클라이언트 (None이면 각 모듈의 OpenAI 클라이언트)
+    - timings: 호출별 대기 시간을 llm_label / llm_persona / llm_report 단계로 기록
+
+    반환: {"label": {...}, "persona_overview": str, "report": str, "timed_out": [...], "failed": [...]}
+    - timed_out: timeout으로 fallback이 쓰인 항목 이름
+    - failed: timeout 포함, 제대로 된 응답을 못 받은 항목 이름 (비어 있을 때만 결과를 캐시)
+    """
+    mbti_type = mbti_result.get("type", "XXXX")
+
+    (label, label_status), (persona_overview, persona_status), (report, report_status) = await asyncio.gather(
+        _call_with_timeout(
+            try_generate_label_with_llm,
+            mbti_result,
+            confidence,
+            llm_client=llm_client,
+            timeout=timeout,
+            fallback={"label": f"기본형 {mbti_type}", "keyword": "기본형"},
+            stage="llm_label",
+            timings=timings,
+        ),
+        _call_with_timeout(
+            try_generate_persona_overview,
+            mbti_result,
+            llm_client=llm_client,
+            timeout=timeout,
+            fallback="",
+            stage="llm_persona",
+            timings=timings,
+        ),
+        _call_with_timeout(
+            try_generate_report,
+            mbti_result,
+            confidence,
+            llm_client=llm_client,
+            timeout=timeout,
+            fallback=(
+                REPORT_HEADER
+                + "AI 응답이 지연되어 상세 리포트를 생성하지 못했습니다.\n"
+                + "잠시 후 다시 시도해주세요."
+            ),
+            stage="llm_report",
+            timings=timings,
+        ),
+    )
+
+    statuses = (("label", label_status), ("persona_overview", persona_status), ("report", report_status))
+
+    return {
+        "label": label,
+        "persona_overview": persona_overview,
+        "report": report,
+        "timed_out": [name for name, status in statuses if status == "timed_out"],
+        "failed": [name for name, status in statuses if status != "ok"],
+    }
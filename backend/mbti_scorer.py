@@ -1,12 +1,65 @@
 from __future__ import annotations
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+# 점수 규칙/가중치 버전. 규칙을 바꾸면 올려서 저장된 분석 결과 캐시가 재사용되지 않게 한다.
+SCORER_VERSION = "1"
+
+# score_mbti가 읽는 특징과 기본값 (score_mbti_matrix 입력 행렬의 열 순서)
+FEATURE_DEFAULTS: Dict[str, float] = {
+    "avg_sentence_len": 0.0,
+    "first_person_ratio": 0.0,
+    "question_ratio": 0.0,
+    "exclamation_ratio": 0.0,
+    "positive_ratio": 0.0,
+    "negative_ratio": 0.0,
+    "talkativeness": 1.0,  # 1.0이 평균
+    "user_night_message_ratio": 0.0,
+    "user_question_ratio": 0.0,  # 없으면 question_ratio
+    "user_exclamation_ratio": 0.0,  # 없으면 exclamation_ratio
+    "user_emoji_ratio": 0.0,
+    "avg_reply_minutes": 0.0,
+    "user_swear_msg_ratio": 0.0,
+    "user_game_msg_ratio": 0.0,
+    "user_night_game_msg_ratio": 0.0,
+    "topic_daily_life_ratio": 0.0,
+    "topic_emotion_ratio": 0.0,
+    "topic_planning_ratio": 0.0,
+    "topic_development_ratio": 0.0,
+    "topic_school_ratio": 0.0,
+    "topic_hobby_ratio": 0.0,
+    "topic_meme_ratio": 0.0,
+    "topic_info_request_ratio": 0.0,
+    "topic_economy_ratio": 0.0,
+    "topic_romance_ratio": 0.0,
+}
+FEATURE_COLUMNS = tuple(FEATURE_DEFAULTS)
+
+# 사용자 기준 값이 없을 때 대신 쓰는 방 전체 값
+_FEATURE_FALLBACKS = {
+    "user_question_ratio": "question_ratio",
+    "user_exclamation_ratio": "exclamation_ratio",
+}
+
+PERSONAS = ("developer", "socializer", "hobbyist", "planner")
+AXES = ("E_I", "S_N", "T_F", "J_P")
 
 
 def _clamp(value: float, min_value: float = 0.0, max_value: float = 100.0) -> float:
     return max(min_value, min(max_value, value))
 
 
+def _feature_values(features: Dict[str, Any]) -> Dict[str, Any]:
+    """특징 dict에서 점수 계산에 쓰는 값만 (score_mbti와 같은 기본값 / fallback)."""
+    values = {name: features.get(name, default) for name, default in FEATURE_DEFAULTS.items()}
+    for name, fallback in _FEATURE_FALLBACKS.items():
+        if name not in features:
+            values[name] = values[fallback]
+    return values
+
+
 def score_mbti(features: Dict[str, Any]) -> Dict[str, Any]:
     """
     특징(features)을 받아 MBTI 4축 점수(E/I, S/N, T/F, J/P)를 계산한다.
@@ -180,6 +233,98 @@ def score_mbti(features: Dict[str, Any]) -> Dict[str, Any]:
     mbti_type += "J" if j >= p else "P"
 
     # ---------- 여기서부터 설명(explanation) 생성 ----------
+    explanations = _build_explanations(persona, _feature_values(features))
+
+    # ---------- 축별 메타 정보 / 애매한 축 계산 ----------
+    ambiguous_axes: list[str] = []
+
+    def check_ambiguous(a: int, b: int, name: str, threshold: int = 8) -> None:
+        """
+        두 축 점수 차이가 threshold 미만이면 '애매한 축'으로 취급.
+        예: E=52, I=48, threshold=8 -> E/I 애매
+        """
+        if abs(a - b) < threshold:
+            ambiguous_axes.append(name)
+
+    check_ambiguous(e, i_, "E/I")
+    check_ambiguous(s, n, "S/N")
+    check_ambiguous(t, f, "T/F")
+    check_ambiguous(j, p, "J/P")
+
+    axis_details = {
+        "E_I": {
+            "dominant": "E" if e >= i_ else "I",
+            "margin": abs(e - i_),
+            "scores": {"E": e, "I": i_},
+            "contributions": contrib_e,
+        },
+        "S_N": {
+            "dominant": "S" if s >= n else "N",
+            "margin": abs(s - n),
+            "scores": {"S": s, "N": n},
+            "contributions": contrib_n,
+        },
+        "T_F": {
+            "dominant": "T" if t >= f else "F",
+            "margin": abs(t - f),
+            "scores": {"T": t, "F": f},
+            "contributions": contrib_t,
+        },
+        "J_P": {
+            "dominant": "J" if j >= p else "P",
+            "margin": abs(j - p),
+            "scores": {"J": j, "P": p},
+            "contributions": contrib_j,
+        },
+    }
+
+    # ---------- 최종 결과 패키징 ----------
+    result: Dict[str, Any] = {
+        "type": mbti_type,
+        "scores": {
+            "E": e,
+            "I": i_,
+            "S": s,
+            "N": n,
+            "T": t,
+            "F": f,
+            "J": j,
+            "P": p,
+        },
+        "features": features,
+        "explanation": explanations,
+        "axis_details": axis_details,       # 축별 점수/마진/기여도
+        "ambiguous_axes": ambiguous_axes,   # 애매한 축 리스트
+        "persona": persona,                 # 선택된 페르소나
+    }
+    return result
+
+
+def _build_explanations(persona: str, values: Dict[str, float]) -> Dict[str, Any]:
+    """
+    축별 근거 문장 (score_mbti / MBTIScoreMatrix.row 공용).
+    values: _feature_values() 결과 (FEATURE_COLUMNS 이름 → 값)
+    """
+    avg_sentence_len = values["avg_sentence_len"]
+    positive_ratio = values["positive_ratio"]
+    negative_ratio = values["negative_ratio"]
+    talkativeness = values["talkativeness"]
+    user_night_ratio = values["user_night_message_ratio"]
+    user_question_ratio = values["user_question_ratio"]
+    user_emoji_ratio = values["user_emoji_ratio"]
+    avg_reply_minutes = values["avg_reply_minutes"]
+    user_swear_ratio = values["user_swear_msg_ratio"]
+    user_game_ratio = values["user_game_msg_ratio"]
+    topic_daily_life = values["topic_daily_life_ratio"]
+    topic_emotion = values["topic_emotion_ratio"]
+    topic_planning = values["topic_planning_ratio"]
+    topic_development = values["topic_development_ratio"]
+    topic_hobby = values["topic_hobby_ratio"]
+    topic_meme = values["topic_meme_ratio"]
+    topic_info_request = values["topic_info_request_ratio"]
+    topic_economy = values["topic_economy_ratio"]
+    topic_romance = values["topic_romance_ratio"]
+
     explanations = {
         "persona": persona,  # 페르소나 정보 추가
         "E": [],
@@ -193,7 +338,6 @@ def score_mbti(features: Dict[str, Any]) -> Dict[str, Any]:
     }
 
     # E / I 근거
-    user_msg_ratio = features.get("user_message_ratio", 0.0)
     if talkativeness > 0:
         if talkativeness >= 1.2:
             explanations["E"].append(
@@ -292,66 +436,220 @@ def score_mbti(features: Dict[str, Any]) -> Dict[str, Any]:
     if topic_hobby > 0.05 or topic_meme > 0.05:
         explanations["P"].append("취미, 밈(meme) 등 즉흥적이고 자유로운 주제의 대화를 즐기는 편입니다.")
 
-    # ---------- 축별 메타 정보 / 애매한 축 계산 ----------
-    ambiguous_axes: list[str] = []
+    return explanations
 
-    def check_ambiguous(a: int, b: int, name: str, threshold: int = 8) -> None:
+
+# =====================================================================
+#   행렬 버전: N명(행) x FEATURE_COLUMNS(열)을 한 번에 채점
+#   - score_mbti와 같은 연산을 같은 순서로 배열에 적용하므로 결과가 정확히 같다
+#   - 설명(explanation)은 row(i)로 필요한 행만 만든다
+# =====================================================================
+
+
+def features_to_matrix(features_list: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """특징 dict 목록 → N x len(FEATURE_COLUMNS) float64 행렬 (score_mbti와 같은 기본값 적용)."""
+    matrix = np.empty((len(features_list), len(FEATURE_COLUMNS)), dtype=np.float64)
+    for row, features in enumerate(features_list):
+        values = _feature_values(features)
+        matrix[row] = [values[name] for name in FEATURE_COLUMNS]
+    return matrix
+
+
+def _clamp_array(values: np.ndarray, min_value: float = 0.0, max_value: float = 100.0) -> np.ndarray:
+    """_clamp와 같은 규칙 (max(min_value, min(max_value, v)), NaN도 같은 결과)."""
+    capped = np.where(values < max_value, values, max_value)
+    return np.where(capped > min_value, capped, min_value)
+
+
+def _axis_score(base: float, contributions: Dict[str, np.ndarray]) -> np.ndarray:
+    """base + sum(contributions.values()) 를 같은 덧셈 순서로."""
+    total = np.zeros_like(next(iter(contributions.values())))
+    for value in contributions.values():
+        total = total + value
+    return _clamp_array(base + total)
+
+
+class MBTIScoreMatrix:
+    """
+    score_mbti_matrix 결과.
+
+    - scores: {"E": int 배열, "I": ..., ..., "P": ...}
+    - types: MBTI 문자열 목록
+    - margins: N x 4 (AXES 순서) 두 점수 차이
+    - ambiguous: N x 4 bool (차이가 8 미만인 축)
+    - contributions: {축: {기여 항목: float 배열}}
+      (J_P의 reply_speed는 reply_speed_applied가 True인 행에만 있는 항목)
+    - personas: 행별 페르소나 이름
+
+    row(i)는 score_mbti(features_i)와 같은 dict를 만든다 (이때만 설명 문장 생성).
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        personas: List[str],
+        scores: Dict[str, np.ndarray],
+        contributions: Dict[str, Dict[str, np.ndarray]],
+        reply_speed_applied: np.ndarray,
+    ) -> None:
+        self.matrix = matrix
+        self.personas = personas
+        self.scores = scores
+        self.contributions = contributions
+        self.reply_speed_applied = reply_speed_applied
+
+        pairs = [("E", "I"), ("S", "N"), ("T", "F"), ("J", "P")]
+        dominant = np.stack([scores[a] >= scores[b] for a, b in pairs], axis=1)
+        self.margins = np.stack([np.abs(scores[a] - scores[b]) for a, b in pairs], axis=1)
+        self.ambiguous = self.margins < 8
+        self.types = [
+            "".join(a if d else b for (a, b), d in zip(pairs, row_dominant))
+            for row_dominant in dominant.tolist()
+        ]
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def feature_values(self, i: int) -> Dict[str, float]:
+        return {name: float(v) for name, v in zip(FEATURE_COLUMNS, self.matrix[i])}
+
+    def explanation(self, i: int) -> Dict[str, Any]:
+        return _build_explanations(self.personas[i], self.feature_values(i))
+
+    def row(self, i: int, features: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        두 축 점수 차이가 threshold 미만이면 '애매한 축'으로 취급.
-        예: E=52, I=48, threshold=8 -> E/I 애매
+        i번째 행의 score_mbti 형식 결과.
+        features: 결과 "features"에 그대로 넣을 원래 특징 dict (없으면 행렬 값)
         """
-        if abs(a - b) < threshold:
-            ambiguous_axes.append(name)
+        scores = {letter: int(values[i]) for letter, values in self.scores.items()}
+        persona = self.personas[i]
+
+        axis_details: Dict[str, Any] = {}
+        for k, axis in enumerate(AXES):
+            a, b = axis.split("_")
+            contributions = {
+                name: float(values[i])
+                for name, values in self.contributions[axis].items()
+                if name != "reply_speed" or self.reply_speed_applied[i]
+            }
+            axis_details[axis] = {
+                "dominant": a if scores[a] >= scores[b] else b,
+                "margin": int(self.margins[i, k]),
+                "scores": {a: scores[a], b: scores[b]},
+                "contributions": contributions,
+            }
+
+        return {
+            "type": self.types[i],
+            "scores": scores,
+            "features": features if features is not None else self.feature_values(i),
+            "explanation": self.explanation(i),
+            "axis_details": axis_details,
+            "ambiguous_axes": [
+                axis.replace("_", "/") for k, axis in enumerate(AXES) if self.ambiguous[i, k]
+            ],
+            "persona": persona,
+        }
+
+
+def score_mbti_matrix(matrix: np.ndarray) -> MBTIScoreMatrix:
+    """
+    N x len(FEATURE_COLUMNS) 특징 행렬 (features_to_matrix)을 한 번에 채점한다.
+    각 행의 결과는 score_mbti(그 행의 특징)와 정확히 같다.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    col = {name: matrix[:, k] for k, name in enumerate(FEATURE_COLUMNS)}
+
+    avg_sentence_len = col["avg_sentence_len"]
+    first_person_ratio = col["first_person_ratio"]
+    positive_ratio = col["positive_ratio"]
+    negative_ratio = col["negative_ratio"]
+    talkativeness = col["talkativeness"]
+    user_night_ratio = col["user_night_message_ratio"]
+    user_question_ratio = col["user_question_ratio"]
+    user_exclamation_ratio = col["user_exclamation_ratio"]
+    user_emoji_ratio = col["user_emoji_ratio"]
+    avg_reply_minutes = col["avg_reply_minutes"]
+    user_swear_ratio = col["user_swear_msg_ratio"]
+    user_game_ratio = col["user_game_msg_ratio"]
+    user_night_game_ratio = col["user_night_game_msg_ratio"]
+
+    # ---- 페르소나 추정 (임계값 0.1을 넘는 최댓값, 같으면 앞쪽) ----
+    persona_scores = np.stack(
+        [
+            col["topic_development_ratio"] * 1.5 + col["topic_school_ratio"] + col["topic_economy_ratio"],
+            col["topic_romance_ratio"] * 1.5 + col["topic_emotion_ratio"] + col["topic_daily_life_ratio"],
+            col["topic_hobby_ratio"] * 1.2 + col["topic_meme_ratio"] + user_game_ratio,
+            col["topic_planning_ratio"] * 2.0,
+        ],
+        axis=1,
+    )
+    # NaN은 score_mbti에서 절대 선택되지 않으므로 -inf로
+    persona_scores = np.where(np.isnan(persona_scores), -np.inf, persona_scores)
+    best = np.argmax(persona_scores, axis=1)
+    has_persona = persona_scores[np.arange(len(matrix)), best] > 0.1
+    persona_index = np.where(has_persona, best, -1)
+    personas = [PERSONAS[k] if k >= 0 else "default" for k in persona_index.tolist()]
+
+    # 페르소나 기반 가중치 (score_mbti의 weights와 같은 값)
+    t_f_swear = np.select([persona_index == 0, persona_index == 1], [50.0, 20.0], 40.0)
+    j_p_night = np.where(persona_index == 2, -30.0, -20.0)
+    j_p_game = np.where(persona_index == 2, -30.0, -20.0)
+    j_p_reply_fast = np.where(persona_index == 3, 15.0, 10.0)
 
-    check_ambiguous(e, i_, "E/I")
-    check_ambiguous(s, n, "S/N")
-    check_ambiguous(t, f, "T/F")
-    check_ambiguous(j, p, "J/P")
+    # ---- E / I ----
+    contrib_e = {
+        "question_exclamation": (user_question_ratio + user_exclamation_ratio) * 25.0,
+        "emoji": user_emoji_ratio * 30.0,
+        "talkativeness": (talkativeness - 1.0) * 20.0,
+        "swear": user_swear_ratio * 10.0,
+        "game": user_game_ratio * 10.0,
+        "first_person": -first_person_ratio * 10.0,
+    }
+    e_score = _axis_score(50.0, contrib_e)
 
-    axis_details = {
-        "E_I": {
-            "dominant": "E" if e >= i_ else "I",
-            "margin": abs(e - i_),
-            "scores": {"E": e, "I": i_},
-            "contributions": contrib_e,
-        },
-        "S_N": {
-            "dominant": "S" if s >= n else "N",
-            "margin": abs(s - n),
-            "scores": {"S": s, "N": n},
-            "contributions": contrib_n,
-        },
-        "T_F": {
-            "dominant": "T" if t >= f else "F",
-            "margin": abs(t - f),
-            "scores": {"T": t, "F": f},
-            "contributions": contrib_t,
-        },
-        "J_P": {
-            "dominant": "J" if j >= p else "P",
-            "margin": abs(j - p),
-            "scores": {"J": j, "P": p},
-            "contributions": contrib_j,
-        },
+    # ---- S / N ----
+    contrib_n = {
+        "sentence_len": (avg_sentence_len - 5.0) / (30.0 - 5.0) * 25.0,
+        "night_active": (user_night_ratio - 0.2) * 30.0,
+        "night_game": user_night_game_ratio * 20.0,
     }
+    n_score = _axis_score(50.0, contrib_n)
 
-    # ---------- 최종 결과 패키징 ----------
-    result: Dict[str, Any] = {
-        "type": mbti_type,
-        "scores": {
-            "E": e,
-            "I": i_,
-            "S": s,
-            "N": n,
-            "T": t,
-            "F": f,
-            "J": j,
-            "P": p,
-        },
-        "features": features,
-        "explanation": explanations,
-        "axis_details": axis_details,       # 축별 점수/마진/기여도
-        "ambiguous_axes": ambiguous_axes,   # 애매한 축 리스트
-        "persona": persona,                 # 선택된 페르소나
+    # ---- T / F ----
+    contrib_t = {
+        "negative": negative_ratio * 80.0,
+        "positive": -positive_ratio * 40.0,
+        "emoji": -user_emoji_ratio * 20.0,
+        "swear": user_swear_ratio * t_f_swear,
     }
-    return result
+    t_score = _axis_score(50.0, contrib_t)
+
+    # ---- J / P ----
+    # 답장 속도 항목은 조건에 맞는 행에만 (나머지 행은 0을 더해도 합이 같음)
+    reply_fast = (avg_reply_minutes > 0) & (avg_reply_minutes <= 5)
+    reply_slow = (avg_reply_minutes > 0) & ~(avg_reply_minutes <= 5) & (avg_reply_minutes >= 60)
+    contrib_j = {
+        "sentence_len": avg_sentence_len * 0.8,
+        "question": -user_question_ratio * 30.0,
+        "night": user_night_ratio * j_p_night,
+        "reply_speed": np.select([reply_fast, reply_slow], [0.0 + j_p_reply_fast, 0.0 - 10.0], 0.0),
+        "game": -user_game_ratio * j_p_game,
+        "swear": -user_swear_ratio * 10.0,
+    }
+    j_score = _axis_score(50.0, contrib_j)
+
+    # 정수화 (round와 같은 짝수 반올림)
+    scores: Dict[str, np.ndarray] = {}
+    for a, b, score in (("E", "I", e_score), ("N", "S", n_score), ("T", "F", t_score), ("J", "P", j_score)):
+        scores[a] = np.rint(score).astype(np.int64)
+        scores[b] = np.rint(100.0 - score).astype(np.int64)
+    scores = {letter: scores[letter] for letter in "EISNTFJP"}
+
+    return MBTIScoreMatrix(
+        matrix,
+        personas,
+        scores,
+        {"E_I": contrib_e, "S_N": contrib_n, "T_F": contrib_t, "J_P": contrib_j},
+        reply_fast | reply_slow,
+    )
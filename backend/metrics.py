@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows에는 resource 모듈이 없음
+    resource = None
+
+# 단계별 소요 시간 히스토그램 버킷 (초)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+class StageHistogram:
+    """
+    stage 라벨별 누적 히스토그램 (Prometheus histogram 형식으로 내보냄).
+    LLM 호출은 스레드 풀에서 끝나므로 observe()는 lock으로 보호한다.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # stage -> (버킷별 개수, 합계, 전체 개수)
+        self._series: Dict[str, Tuple[List[int], float, int]] = {}
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            counts, total, n = self._series.get(stage) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+            self._series[stage] = (counts, total + seconds, n + 1)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((stage, list(c), s, n) for stage, (c, s, n) in self._series.items())
+        for stage, counts, total, n in series:
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{stage="{stage}",le="{_format_float(bound)}"}} {count}')
+            lines.append(f'{self.name}_bucket{{stage="{stage}",le="+Inf"}} {n}')
+            lines.append(f'{self.name}_sum{{stage="{stage}"}} {_format_float(total)}')
+            lines.append(f'{self.name}_count{{stage="{stage}"}} {n}')
+        return lines
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+STAGE_DURATION = StageHistogram(
+    "mbti_stage_duration_seconds",
+    "Duration of analysis pipeline stages in seconds.",
+)
+
+
+class StageTimings:
+    """
+    요청 하나의 단계별 시간 / 개수 기록.
+    - span(stage): with 블록 시간을 재서 이 요청 기록 + 전역 히스토그램에 남긴다
+    - count(name, value): 메시지 수 등 참고 값
+    - to_meta(): 응답 meta["debug"]에 넣을 dict
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - t0)
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        STAGE_DURATION.observe(stage, seconds)
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = value
+
+    def to_meta(self) -> Dict[str, Any]:
+        return {
+            "stages_ms": {stage: round(sec * 1000, 2) for stage, sec in self.stages.items()},
+            "elapsed_ms": round((time.perf_counter() - self.started_at) * 1000, 2),
+            "counts": dict(self.counts),
+            "peak_rss_mb": _round_or_none(peak_rss_mb()),
+        }
+
+
+@contextmanager
+def span(timings: Optional[StageTimings], stage: str) -> Iterator[None]:
+    """timings가 없어도 전역 히스토그램에는 기록하는 span."""
+    if timings is not None:
+        with timings.span(stage):
+            yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_DURATION.observe(stage, time.perf_counter() - t0)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """이 프로세스의 최대 RSS (MB). resource 모듈이 없는 환경(Windows)에서는 None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 bytes 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _round_or_none(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 1)
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
+
+
+def render_prometheus(extra_counters: Optional[Dict[str, Tuple[str, Dict[str, float]]]] = None) -> str:
+    """
+    Prometheus text exposition 형식 (/metrics 응답 본문).
+    extra_counters: {metric 이름: (설명, {라벨 값 "kind": 값})} — 캐시 hit/miss 등
+    """
+    lines = STAGE_DURATION.render()
+    for name, (help_text, values) in (extra_counters or {}).items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for kind, value in values.items():
+            lines.append(f'{name}{{kind="{kind}"}} {_format_float(value)}')
+    peak = peak_rss_mb()
+    if peak is not None:
+        lines.append("# HELP process_peak_rss_bytes Peak resident set size of the server process.")
+        lines.append("# TYPE process_peak_rss_bytes gauge")
+        lines.append(f"process_peak_rss_bytes {int(peak * 1024 * 1024)}")
+    return "\n".join(lines) + "\n"
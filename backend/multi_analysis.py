@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+from .analysis_cache import analysis_cache, make_multi_key
+from .confidence_engine import compute_confidence
+from .data_loader.kakao_parser import detect_kakao_encoding, find_first_message_line
+from .data_loader.sns_parser import TEXT_FIELDS
+from .data_loader.youtube_parser import sniff_youtube_format
+from .feature_fusion import SOURCE_TYPES, fuse_features, resolve_fusion_weights
+from .kakao_analysis import ProgressCallback, _extract_features, _finish, _notify, _parse_and_merge
+from .llm_runner import generate_llm_outputs
+from .mbti_scorer import score_mbti
+from .metrics import StageTimings
+from .pipeline import extract_sns_upload_features, extract_youtube_upload_features, get_process_pool
+from .util.file_utils import UploadSource
+from .util.stream_utils import read_head
+
+# 소스 판별에 읽는 파일 앞부분 크기 (카톡 첫 메시지 줄 탐색 범위와 같음)
+SNIFF_BYTES = 64 * 1024
+
+# 유튜브 Takeout JSON 판별은 키 구조로만 한다 (본문에 유튜브 주소가 있는 SNS 글을 유튜브로 보지 않도록)
+# - "titleUrl" 키, 또는 "header": "YouTube" 와 "products" / "subtitles" 키가 함께 있음
+_YOUTUBE_TITLE_URL_KEY = re.compile(rb'"titleUrl"\s*:')
+_YOUTUBE_HEADER_KEY = re.compile(rb'"header"\s*:\s*"YouTube"')
+_YOUTUBE_ENTRY_KEYS = re.compile(rb'"(?:products|subtitles)"\s*:')
+
+# 유튜브 / SNS 파일을 워커 프로세스에서 파싱 + 특징 추출하는 함수 (파일 목록 → 특징 dict)
+_POOL_EXTRACTORS: Dict[str, Callable[[List[UploadSource]], Dict[str, Any]]] = {
+    "youtube": extract_youtube_upload_features,
+    "sns": extract_sns_upload_features,
+}
+
+
+def _is_youtube_takeout_json(head: bytes) -> bool:
+    """JSON 앞부분에 유튜브 Takeout 시청 기록 항목의 키가 있는지."""
+    if _YOUTUBE_TITLE_URL_KEY.search(head):
+        return True
+    return bool(_YOUTUBE_HEADER_KEY.search(head) and _YOUTUBE_ENTRY_KEYS.search(head))
+
+
+def sniff_upload_source(source: UploadSource) -> Optional[str]:
+    """
+    업로드 파일 앞부분으로 소스 종류를 판별한다 ("kakao" / "youtube" / "sns", 모르면 None).
+    - 카톡: 앞부분에 카톡 날짜 줄 / 메시지 줄이 있음
+    - 유튜브: Takeout HTML, 또는 Takeout 시청 기록 키(titleUrl, header + products / subtitles)가 있는 JSON
+    - SNS: 그 밖의 JSON, 또는 첫 줄에 본문 열 이름(text, caption 등)이 있는 CSV
+    """
+    head = read_head(source, SNIFF_BYTES)
+    if not head.strip():
+        return None
+
+    if find_first_message_line(head, detect_kakao_encoding(head), limit=SNIFF_BYTES) is not None:
+        return "kakao"
+
+    fmt = sniff_youtube_format(head)
+    if fmt == "html":
+        return "youtube"
+    if fmt == "json":
+        return "youtube" if _is_youtube_takeout_json(head) else "sns"
+    if head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"window."):
+        return "sns"
+
+    first_line = head.lstrip(b"\xef\xbb\xbf").split(b"\n", 1)[0].decode("utf-8", errors="ignore").lower()
+    columns = {c.strip().strip('"') for c in first_line.split(",")}
+    if len(columns) > 1 and columns & set(TEXT_FIELDS):
+        return "sns"
+    return None
+
+
+def detect_upload_sources(raw_files: List[UploadSource]) -> List[Optional[str]]:
+    """업로드 파일마다 sniff_upload_source (파일 앞부분만 읽으므로 가벼움)."""
+    return [sniff_upload_source(source) for source in raw_files]
+
+
+async def run_multi_analysis(
+    raw_files: List[UploadSource],
+    file_digests: List[str],
+    source_types: List[str],
+    user_name: str = "",
+    weights: Optional[Dict[str, float]] = None,
+    progress: Optional[ProgressCallback] = None,
+    llm_client: Optional[Any] = None,
+    timings: Optional[StageTimings] = None,
+    debug: bool = False,
+) -> Dict[str, Any]:
+    """
+    카톡 / 유튜브 / SNS 파일을 섞어 올린 통합 분석 (/analyze/multi).
+
+    1) 분석 결과 캐시 확인 (파일 digest + 이름 + 가중치)
+    2) 소스별 파이프라인을 동시에 실행 → 전체 시간은 가장 느린 소스 정도
+       - 카톡: /analyze/kakao와 같은 파싱(프로세스 풀) + 특징 추출(스레드)
+       - 유튜브 / SNS: 워커 프로세스에서 스트리밍 파싱 + 특징 누적 (features_youtube / features_sns 단계)
+    3) 소스별 특징을 가중치로 합친 뒤 (feature_fusion, fuse 단계) MBTI 점수 + 신뢰도
+       (소스 다양성은 파일 수가 아니라 소스 종류 수 기준)
+    4) LLM 라벨 / 페르소나 개요 / 리포트
+
+    source_types: raw_files와 같은 순서의 소스 종류 (detect_upload_sources 결과)
+    user_name: 카톡 파일이 있을 때 "나"로 볼 발화자 이름
+    """
+    if timings is None:
+        timings = StageTimings()
+    weights = resolve_fusion_weights(weights)
+
+    with timings.span("cache_lookup"):
+        cache_key = make_multi_key(file_digests, user_name, weights)
+        cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        cached["meta"]["cached"] = True
+        _finish(timings, cached, debug)
+        _notify(progress, "cached", {})
+        return cached
+
+    groups: Dict[str, List[UploadSource]] = {}
+    kakao_digests: List[str] = []
+    for source, digest, source_type in zip(raw_files, file_digests, source_types):
+        groups.setdefault(source_type, []).append(source)
+        if source_type == "kakao":
+            kakao_digests.append(digest)
+
+    async def run_kakao(sources: List[UploadSource]) -> Dict[str, Any]:
+        all_messages, total_line_count, senders_merged, _ = await _parse_and_merge(
+            sources, timings, progress, kakao_digests
+        )
+        return await asyncio.to_thread(
+            _extract_features, all_messages, total_line_count, senders_merged, user_name, timings
+        )
+
+    async def run_in_pool(source_type: str, sources: List[UploadSource]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        with timings.span(f"features_{source_type}"):
+            return await loop.run_in_executor(get_process_pool(), _POOL_EXTRACTORS[source_type], sources)
+
+    tasks: Dict[str, Awaitable[Dict[str, Any]]] = {}
+    for source_type in SOURCE_TYPES:
+        sources = groups.get(source_type)
+        if not sources:
+            continue
+        tasks[source_type] = run_kakao(sources) if source_type == "kakao" else run_in_pool(source_type, sources)
+    results = await asyncio.gather(*tasks.values())
+    source_features = dict(zip(tasks, results))
+
+    with timings.span("fuse"):
+        all_features = fuse_features(source_features, weights)
+    _notify(progress, "features", {"word_count": all_features.get("word_count", 0)})
+
+    with timings.span("score"):
+        mbti_result = score_mbti(all_features)
+        confidence = compute_confidence(all_features, source_count=len(source_features))
+    meta = {
+        "file_count": len(raw_files),
+        "sources": {source_type: len(groups[source_type]) for source_type in source_features},
+        "fusion_weights": {source_type: weights.get(source_type, 0.0) for source_type in source_features},
+        "user_name_input": user_name,
+        "user_sender_resolved": all_features.get("user_sender_name"),
+        "cached": False,
+    }
+    _notify(progress, "scored", {"mbti": mbti_result, "confidence": confidence, "meta": meta})
+
+    llm_outputs = await generate_llm_outputs(
+        mbti_result, confidence, llm_client=llm_client, timings=timings
+    )
+    mbti_result["persona_overview"] = llm_outputs["persona_overview"]
+    _notify(progress, "report", {})
+
+    result = {
+        "mbti": mbti_result,
+        "confidence": confidence,
+        "label": llm_outputs["label"],
+        "report": llm_outputs["report"],
+        "meta": meta,
+    }
+    if not llm_outputs["failed"]:
+        analysis_cache.set(cache_key, result)
+
+    _finish(timings, result, debug)
+    return result
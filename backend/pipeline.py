@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from .chat_cache import get_chat_cache_store
+from .data_loader.kakao_parser import parse_kakao_buffer, detect_kakao_encoding, find_kakao_chunks
+from .data_loader.message_table import MessageTable, merge_tables, concat_tables
+from .data_loader.sns_parser import TagVocabulary, iter_sns_posts
+from .data_loader.youtube_parser import iter_youtube_history
+from .feature_extractor.features_sns import SnsFeatureAccumulator
+from .feature_extractor.features_youtube import YoutubeFeatureAccumulator
+from .util.file_utils import UploadSource, open_upload_buffer
+
+# 프로세스 풀 크기 (기본: CPU 코어 수, 최대 8)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+
+# 이 크기보다 큰 파일 하나는 구간으로 나눠서 여러 워커가 나눠 파싱한다
+PARSE_CHUNK_BYTES = int(os.getenv("PARSE_CHUNK_BYTES", str(16 << 20)))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    파싱 등 CPU 작업용 공용 프로세스 풀 (처음 쓸 때 생성).
+    이벤트 루프가 돌고 있는 서버 프로세스를 fork 하지 않도록 spawn 컨텍스트를 사용한다.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def parse_kakao_batch(source: UploadSource) -> Dict[str, Any]:
+    """
+    (워커 프로세스에서 실행) 업로드 파일 하나를 파싱해서 MessageTable 배치로 돌려준다.
+
+    - source: 파일 내용(bytes) 또는 임시 파일 경로 (경로면 mmap으로 열어서 파싱)
+    - table: 타임스탬프 순으로 안정 정렬된 MessageTable
+      (배열 몇 개라서 부모 프로세스로 pickle 할 때도 메시지 수와 상관없이 가볍다)
+    - line_count / senders / encoding: 파서가 센 메타 정보
+    - current_day: 파일 끝에서의 날짜 (이어서 파싱할 때 필요, room_state 참고)
+    """
+    stats: Dict[str, Any] = {}
+    with open_upload_buffer(source) as buf:
+        table = parse_kakao_buffer(buf, stats=stats)
+
+    # 파일 안에서 먼저 정렬해 두면 부모 프로세스에서는 k-way merge만 하면 된다.
+    return {
+        "table": table.sorted_by_time(),
+        "line_count": stats["line_count"],
+        "senders": stats["senders"],
+        "encoding": stats["encoding"],
+        "current_day": stats["current_day"],
+    }
+
+
+def parse_kakao_chunk(
+    source: UploadSource,
+    start: int,
+    end: Optional[int],
+    encoding: str,
+    current_day: Optional[int],
+) -> Dict[str, Any]:
+    """
+    (워커 프로세스에서 실행) 파일의 [start, end) 구간 하나를 파싱한다 (정렬은 하지 않음).
+    source가 bytes면 이미 잘라낸 구간 내용이다.
+    """
+    stats: Dict[str, Any] = {}
+    with open_upload_buffer(source) as buf:
+        table = parse_kakao_buffer(
+            buf, encoding=encoding, stats=stats, start=start, end=end, current_day=current_day
+        )
+    return {"table": table, "line_count": stats["line_count"], "current_day": stats["current_day"]}
+
+
+def _upload_size(source: UploadSource) -> int:
+    return len(source) if isinstance(source, bytes) else os.path.getsize(source)
+
+
+def _plan_chunks(source: UploadSource, chunk_bytes: int) -> Tuple[str, List[Tuple[Any, ...]]]:
+    """
+    큰 업로드를 구간으로 나눠 parse_kakao_chunk 인자 목록을 만든다.
+    (경계 찾기는 날짜 줄 / 스타일 A 헤더 후보만 정규식으로 훑으므로 파일 전체 파싱보다 훨씬 가볍다)
+    """
+    with open_upload_buffer(source) as buf:
+        encoding = detect_kakao_encoding(buf)
+        args: List[Tuple[Any, ...]] = []
+        for start, end, current_day in find_kakao_chunks(buf, chunk_bytes, encoding):
+            if isinstance(source, bytes):
+                # 메모리에 있는 파일은 구간 내용만 워커로 보낸다
+                args.append((buf[start:end], 0, None, encoding, current_day))
+            else:
+                # 임시 파일은 경로만 보내고 워커가 각자 mmap
+                args.append((source, start, end, encoding, current_day))
+    return encoding, args
+
+
+def _stitch_chunks(parts: List[Dict[str, Any]], encoding: str) -> Dict[str, Any]:
+    """구간별 결과를 원래 순서대로 이어붙이고 정렬 → parse_kakao_batch와 같은 배치."""
+    table = concat_tables([part["table"] for part in parts])
+    return {
+        "table": table.sorted_by_time(),
+        "line_count": sum(part["line_count"] for part in parts),
+        "senders": table.sender_counts(),
+        "encoding": encoding,
+        "current_day": parts[-1]["current_day"],
+    }
+
+
+async def _parse_one_upload(source: UploadSource, digest: Optional[str] = None) -> Dict[str, Any]:
+    """업로드 하나 파싱 (digest를 주면 파싱 결과 캐시를 먼저 보고, 없으면 파싱한 뒤 저장)."""
+    store = get_chat_cache_store() if digest else None
+    if store is not None:
+        batch = await asyncio.to_thread(store.get, digest)
+        if batch is not None:
+            return batch
+
+    batch = await _parse_upload(source)
+    if store is not None:
+        await asyncio.to_thread(store.put, digest, batch)
+    return batch
+
+
+async def _parse_upload(source: UploadSource) -> Dict[str, Any]:
+    """
+    업로드 하나를 프로세스 풀에서 파싱.
+    - PARSE_CHUNK_BYTES 이하: 워커 하나가 통째로 (parse_kakao_batch)
+    - 그보다 크면: 구간으로 나눠 여러 워커가 동시에 파싱한 뒤 이어붙인다
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+
+    if _upload_size(source) <= PARSE_CHUNK_BYTES:
+        return await loop.run_in_executor(pool, parse_kakao_batch, source)
+
+    encoding, chunk_args = await asyncio.to_thread(_plan_chunks, source, PARSE_CHUNK_BYTES)
+    if len(chunk_args) == 1:
+        return await loop.run_in_executor(pool, parse_kakao_batch, source)
+
+    parts = await asyncio.gather(
+        *(loop.run_in_executor(pool, parse_kakao_chunk, *args) for args in chunk_args)
+    )
+    return await asyncio.to_thread(_stitch_chunks, list(parts), encoding)
+
+
+async def parse_kakao_uploads(
+    raw_files: List[UploadSource],
+    file_digests: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    업로드 파일들을 프로세스 풀에서 동시에 파싱한다 (큰 파일은 구간별로 나눠서).
+    file_digests(업로드 SHA-256)를 주면 같은 파일의 예전 파싱 결과를 chat_cache에서 바로 불러온다.
+    """
+    digests = file_digests or [None] * len(raw_files)
+    return list(await asyncio.gather(
+        *(_parse_one_upload(raw, digest) for raw, digest in zip(raw_files, digests))
+    ))
+
+
+def merge_kakao_batches(batches: List[Dict[str, Any]]) -> Tuple[MessageTable, int, Dict[str, int]]:
+    """
+    파일별 배치를 타임스탬프 기준 k-way merge로 하나의 타임라인으로 합친다.
+    같은 시각이면 앞 파일의 메시지가 먼저 오므로, 기존의 "이어붙이고 정렬"과 결과가 같다.
+
+    반환: (MessageTable, 전체 줄 수, 발화자별 메시지 수)
+    """
+    total_line_count = 0
+    senders_merged: Dict[str, int] = {}
+    for batch in batches:
+        total_line_count += batch.get("line_count", 0)
+        for s, cnt in batch.get("senders", {}).items():
+            senders_merged[s] = senders_merged.get(s, 0) + cnt
+
+    table = merge_tables([batch["table"] for batch in batches])
+    return table, total_line_count, senders_merged
+
+
+def extract_youtube_upload_features(sources: List[UploadSource]) -> Dict[str, Any]:
+    """
+    (워커 프로세스에서 실행) 유튜브 시청 기록 파일들을 스트리밍으로 읽어 특징 하나로 누적한다.
+    파일이 여러 개면 (JSON + HTML 등) 같은 accumulator에 이어서 넣는다.
+    """
+    acc = YoutubeFeatureAccumulator()
+    for source in sources:
+        for record in iter_youtube_history(source):
+            acc.add(record)
+    return acc.to_features()
+
+
+def extract_sns_upload_features(sources: List[UploadSource]) -> Dict[str, Any]:
+    """(워커 프로세스에서 실행) SNS 내보내기 파일들을 스트리밍으로 읽어 특징 하나로 누적한다."""
+    acc = SnsFeatureAccumulator()
+    vocab = TagVocabulary()
+    for source in sources:
+        for post in iter_sns_posts(source, vocab=vocab):
+            acc.add(post)
+    return acc.to_features(vocab)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from .data_loader.kakao_parser import starts_new_message
+from .data_loader.message_table import MessageTable
+from .feature_extractor.features_common import TextFeatureAccumulator
+from .feature_extractor.features_kakao import KakaoFeatureAccumulator
+from .feature_extractor.temporal_features import extract_temporal_features
+from .metrics import StageTimings, span
+
+# 기본 설정 (환경 변수로 조정)
+# - ROOM_STATE_DIR: 방별 누적 분석 상태를 저장할 디렉터리 (기본 "" = 증분 분석 사용 안 함)
+#   상태 파일에는 발화자 이름 / 메시지 시각과 내 메시지 일부가 남으므로 직접 켜야 한다
+#   (예: ROOM_STATE_DIR=.cache/room_state)
+# - ROOM_STATE_TTL_SECONDS: 이 시간 동안 다시 안 쓰인 상태는 버림
+# - ROOM_STATE_SAMPLE_TEXTS: "내가 자주 쓰는 말" 예시 후보로 저장할 내 메시지 수 (본문 전체는 저장하지 않음)
+ROOM_STATE_DIR = os.getenv("ROOM_STATE_DIR", "")
+ROOM_STATE_TTL_SECONDS = float(os.getenv("ROOM_STATE_TTL_SECONDS", str(30 * 24 * 3600)))
+ROOM_STATE_SAMPLE_TEXTS = int(os.getenv("ROOM_STATE_SAMPLE_TEXTS", "200"))
+
+# 같은 방인지 알아보는 데 쓰는 본문 앞부분 크기 (본문이 이보다 짧은 대화는 상태를 저장하지 않음)
+ROOM_KEY_BYTES = 4096
+
+# RoomState 구조를 바꾸면 올려서 예전 pickle을 쓰지 않게 한다
+ROOM_STATE_VERSION = 3
+
+
+def make_room_key(buf: Any, body_start: int, encoding: str, user_name: str) -> Optional[str]:
+    """
+    본문(첫 날짜 줄 / 메시지 헤더부터) 앞부분 + 인코딩 + 사용자 이름으로 만든 방 키.
+    본문이 ROOM_KEY_BYTES보다 짧으면 None.
+    """
+    head = buf[body_start:body_start + ROOM_KEY_BYTES]
+    if len(head) < ROOM_KEY_BYTES:
+        return None
+    h = hashlib.sha256(f"room:{ROOM_STATE_VERSION}:{encoding}".encode("utf-8"))
+    h.update(b"\x00" + head)
+    h.update(b"\x00user:" + user_name.encode("utf-8"))
+    return h.hexdigest()
+
+
+def body_digest(buf: Any, start: int, end: int) -> str:
+    """buf[start:end]의 SHA-256 (mmap도 복사 없이)."""
+    h = hashlib.sha256()
+    with memoryview(buf) as view, view[start:end] as part:
+        h.update(part)
+    return h.hexdigest()
+
+
+class RoomState:
+    """
+    단톡방 하나 + 사용자 이름의 누적 분석 상태 (디스크에 pickle로 저장).
+
+    매주 다시 내보낸 파일은 "예전 파일 + 새 메시지" 이므로,
+    예전 본문과 같은지(prefix_digest)만 확인하고 새로 붙은 부분만 파싱해서 누적한다.
+
+    - body_bytes / prefix_digest: 지금까지 반영한 본문 길이와 SHA-256
+      (본문 = 첫 날짜 줄 / 메시지 헤더부터. 그 앞의 "저장한 날짜" 줄은 매번 달라짐)
+    - current_day: 본문 끝에서의 날짜 (스타일 B를 이어서 파싱할 때 필요)
+    - minutes / sender_codes / sender_names: 답장 / 세션 특징을 다시 계산할 배열 (텍스트 없음)
+    - text_acc / kakao_acc: 공통 텍스트 / 카톡 특징 accumulator
+      (저장할 때 kakao_acc.user_texts는 ROOM_STATE_SAMPLE_TEXTS개 예시 후보로 줄인다 → features() 참고)
+    """
+
+    def __init__(self, user_name: str, user_sender: Optional[str], encoding: str) -> None:
+        self.version = ROOM_STATE_VERSION
+        self.user_name = user_name
+        self.user_sender = user_sender
+        self.encoding = encoding
+
+        self.body_bytes = 0
+        self.prefix_digest = ""
+        self.current_day: Optional[int] = None
+        self.line_count = 0
+
+        self.minutes = array("q")
+        self.sender_codes = array("i")
+        self.sender_names: List[str] = []
+        self.sender_counts: Dict[str, int] = {}
+
+        self.text_acc = TextFeatureAccumulator()
+        # sender_counts dict를 같이 쓰므로 새 발화자 수도 바로 반영된다
+        self.kakao_acc = KakaoFeatureAccumulator(user_sender or "", self.sender_counts, track_replies=False)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # 내 메시지 본문은 예시 후보만 남기고 저장 (메모리의 상태는 그대로)
+        kakao_acc = copy.copy(self.kakao_acc)
+        kakao_acc.user_texts = self.kakao_acc.sample_user_texts(ROOM_STATE_SAMPLE_TEXTS)
+        return {**self.__dict__, "kakao_acc": kakao_acc}
+
+    def __len__(self) -> int:
+        return len(self.minutes)
+
+    @property
+    def last_minute(self) -> Optional[int]:
+        return self.minutes[-1] if self.minutes else None
+
+    def check_prefix(self, buf: Any, body_start: int, encoding: str) -> Optional[Any]:
+        """
+        buf가 이 상태의 본문 뒤에 메시지만 더 붙은 파일인지 확인한다.
+        맞으면 지금까지의 본문을 넣은 SHA-256 객체 (새 부분을 update해서 다음 prefix_digest로), 아니면 None.
+        """
+        if encoding != self.encoding or len(buf) - body_start < self.body_bytes:
+            return None
+        tail = body_start + self.body_bytes
+        h = hashlib.sha256()
+        with memoryview(buf) as view, view[body_start:tail] as part:
+            h.update(part)
+        if h.hexdigest() != self.prefix_digest:
+            return None
+        # 새 부분이 이어쓰기 줄로 시작하면 마지막 메시지 내용이 바뀌므로 처음부터 다시
+        if not starts_new_message(buf, tail, encoding, self.current_day):
+            return None
+        return h
+
+    def can_extend(self, table: MessageTable) -> bool:
+        """새 메시지가 모두 마지막 메시지 이후인지 (그래야 전체를 다시 정렬한 것과 순서가 같음)."""
+        last = self.last_minute
+        return len(table) == 0 or last is None or table.minutes[0] >= last
+
+    def extend(
+        self,
+        table: MessageTable,
+        line_count: int,
+        current_day: Optional[int],
+        body_bytes: int,
+        prefix_digest: str,
+        timings: Optional[StageTimings] = None,
+    ) -> None:
+        """
+        시각 순으로 정렬된 새 메시지 테이블을 누적한다.
+        body_bytes / prefix_digest / current_day는 새 부분까지 포함한 본문 기준 값.
+        """
+        code_map = array("i", (self._sender_code(name) for name in table.sender_names))
+        self.minutes.extend(table.minutes)
+        self.sender_codes.extend(array("i", map(code_map.__getitem__, table.sender_codes)))
+        for name, count in table.sender_counts().items():
+            self.sender_counts[name] = self.sender_counts.get(name, 0) + count
+
+        with span(timings, "features_text"):
+            if len(table):
+                self.text_acc.add_texts(table.text_blocks())
+        with span(timings, "features_kakao"):
+            self.kakao_acc.add_table(table)
+
+        self.line_count += line_count
+        self.current_day = current_day
+        self.body_bytes = body_bytes
+        self.prefix_digest = prefix_digest
+
+    def _sender_code(self, name: str) -> int:
+        try:
+            return self.sender_names.index(name)
+        except ValueError:
+            self.sender_names.append(name)
+            return len(self.sender_names) - 1
+
+    def features(self, timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+        """
+        지금까지 누적한 값으로 공통 + 카톡 특징.
+        처음부터 누적한 상태는 _extract_features와 같은 결과.
+        디스크에서 다시 읽은 상태는 sample_common_messages만 근사값이다.
+        저장해 둔 예시 후보(ROOM_STATE_SAMPLE_TEXTS개)와 새 메시지 안에서만 고르기 때문이다
+        (예시 후보가 될 내 메시지가 그보다 많은 방이면 전체 분석과 다를 수 있음).
+        """
+        with span(timings, "features_text"):
+            common_features = self.text_acc.to_features()
+        with span(timings, "features_kakao"):
+            if len(self) == 0:
+                kakao_features = KakaoFeatureAccumulator(self.user_sender or "").to_features()
+            else:
+                user_code = (
+                    self.sender_names.index(self.user_sender)
+                    if self.user_sender in self.sender_names
+                    else -1
+                )
+                temporal = extract_temporal_features(
+                    np.frombuffer(self.minutes, dtype=np.int64),
+                    np.frombuffer(self.sender_codes, dtype=np.int32),
+                    user_code,
+                    self.sender_names,
+                )
+                kakao_features = self.kakao_acc.to_features(temporal)
+        return {**common_features, **kakao_features}
+
+
+class RoomStateStore:
+    """
+    RoomState를 방 키별 pickle 파일로 저장하는 디렉터리 저장소.
+    - 쓸 때는 임시 파일에 쓰고 os.replace로 바꿔서 읽는 쪽이 반쯤 쓴 파일을 보지 않게 한다
+    - TTL이 지났거나 버전이 다르거나 읽을 수 없는 파일은 없는 것으로 본다
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = ROOM_STATE_TTL_SECONDS) -> None:
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pkl"
+
+    def get(self, key: str) -> Optional[RoomState]:
+        path = self._path(key)
+        state: Optional[RoomState] = None
+        try:
+            if time.time() - path.stat().st_mtime <= self.ttl_seconds:
+                with open(path, "rb") as f:
+                    state = pickle.load(f)
+            else:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[room_state] failed to load {path.name}: {e!r}")
+
+        if not isinstance(state, RoomState) or getattr(state, "version", None) != ROOM_STATE_VERSION:
+            state = None
+        with self._lock:
+            if state is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return state
+
+    def put(self, key: str, state: RoomState) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_room_states: Optional[RoomStateStore] = None
+_room_states_configured = False
+_room_states_lock = threading.Lock()
+
+
+def get_room_state_store() -> Optional[RoomStateStore]:
+    """공용 방 상태 저장소 (처음 쓸 때 환경 변수 설정으로 생성, 비활성화되어 있으면 None)."""
+    global _room_states, _room_states_configured
+    with _room_states_lock:
+        if not _room_states_configured:
+            _room_states = RoomStateStore(ROOM_STATE_DIR) if ROOM_STATE_DIR else None
+            _room_states_configured = True
+        return _room_states
+
+
+def set_room_state_store(store: Optional[RoomStateStore]) -> None:
+    """공용 저장소 교체 (None이면 증분 분석을 끈다)."""
+    global _room_states, _room_states_configured
+    with _room_states_lock:
+        _room_states = store
+        _room_states_configured = True
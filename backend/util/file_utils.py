@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple, Union
+
+from fastapi import UploadFile
+
+# 업로드 파일을 읽을 때 한 번에 읽는 크기
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# 이 크기보다 큰 업로드는 메모리 대신 임시 파일로 저장한다 (파싱은 mmap으로)
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(8 << 20)))
+
+# 업로드 하나: 작은 파일은 bytes, 큰 파일은 임시 파일 경로
+UploadSource = Union[bytes, str]
+
+
+async def spool_upload_with_digest(
+    upload: UploadFile,
+    threshold: int = UPLOAD_SPOOL_THRESHOLD,
+) -> Tuple[UploadSource, str]:
+    """
+    UploadFile을 청크 단위로 읽으면서 SHA-256을 같이 계산한다.
+    threshold를 넘는 파일은 임시 파일에 써서 경로를 돌려준다.
+    (워커 프로세스에 파일 내용 대신 경로만 넘기고, 워커는 mmap으로 읽는다)
+
+    반환: (bytes 또는 임시 파일 경로, hex digest)
+    임시 파일은 사용 후 discard_uploads()로 지워야 한다.
+    """
+    h = hashlib.sha256()
+    chunks: List[bytes] = []
+    size = 0
+    spool = None
+    await upload.seek(0)
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+            size += len(chunk)
+            if spool is None and size > threshold:
+                spool = tempfile.NamedTemporaryFile(prefix="upload_", suffix=".txt", delete=False)
+                await asyncio.to_thread(spool.writelines, chunks)
+                chunks = []
+            if spool is not None:
+                await asyncio.to_thread(spool.write, chunk)
+            else:
+                chunks.append(chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if spool is None:
+        return b"".join(chunks), h.hexdigest()
+    spool.close()
+    return spool.name, h.hexdigest()
+
+
+def discard_uploads(sources: List[UploadSource]) -> None:
+    """spool_upload_with_digest가 만든 임시 파일 삭제 (bytes는 무시)."""
+    for source in sources:
+        if isinstance(source, str):
+            try:
+                os.unlink(source)
+            except FileNotFoundError:
+                pass
+
+
+@contextmanager
+def open_upload_buffer(source: UploadSource) -> Iterator[Any]:
+    """
+    업로드 내용을 버퍼로 연다.
+    - bytes면 그대로
+    - 경로면 읽기 전용 mmap (필요한 페이지만 OS가 읽어옴)
+    """
+    if isinstance(source, bytes):
+        yield source
+        return
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 빈 파일은 mmap 할 수 없음
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import codecs
+import json
+import os
+from typing import Any, BinaryIO, Iterator, Optional, Union
+
+# 큰 내보내기 파일(유튜브 / SNS)을 읽을 때 한 번에 읽는 크기
+STREAM_CHUNK_SIZE = 1 << 20
+
+# JSON 배열 원소 하나의 최대 크기 (글자 수). 이보다 커져도 디코딩이 안 되면 깨진 파일로 본다.
+STREAM_MAX_ELEMENT_CHARS = int(os.getenv("STREAM_MAX_ELEMENT_CHARS", str(16 << 20)))
+
+# 청크 경계에서 잘린 원소는 버퍼 끝 이만큼 안에서 디코딩 오류가 난다 (잘린 "fals", "-Infin", "\u12" 등)
+_JSON_TAIL_CHARS = 16
+
+# 스트리밍 입력: bytes, 파일 경로, 또는 바이너리 파일 객체
+StreamSource = Union[bytes, str, BinaryIO]
+
+
+def iter_byte_chunks(source: StreamSource, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield bytes(view[start:start + chunk_size])
+        return
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+        return
+    yield from iter(lambda: source.read(chunk_size), b"")
+
+
+def read_head(source: StreamSource, size: int = 4096) -> bytes:
+    """형식 판별용 앞부분 (파일 객체는 읽은 뒤 원래 위치로 되돌림 → seek 가능해야 함)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:size])
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return f.read(size)
+    pos = source.tell()
+    head = source.read(size)
+    source.seek(pos)
+    return head
+
+
+class TextStream:
+    """
+    바이트 청크를 UTF-8로 이어서 디코딩하는 버퍼 (앞에서부터 소비).
+    - buf[pos:]가 아직 처리하지 않은 텍스트
+    - more(): 다음 청크를 붙인다 (이미 소비한 앞부분은 이때 버림). 더 없으면 False
+      min_chars를 주면 새 텍스트가 그만큼 모일 때까지 청크를 읽어서 한 번에 붙인다
+    """
+
+    def __init__(self, source: StreamSource, chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+        self._chunks = iter_byte_chunks(source, chunk_size)
+        # utf-8-sig: Windows에서 저장한 파일 앞의 BOM 제거
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self, min_chars: int = 0) -> bool:
+        if self.eof:
+            return False
+        parts = []
+        size = 0
+        while True:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                parts.append(self._decoder.decode(b"", final=True))
+                break
+            text = self._decoder.decode(chunk)
+            parts.append(text)
+            size += len(text)
+            if size >= min_chars:
+                break
+        self.buf = self.buf[self.pos:] + "".join(parts)
+        self.pos = 0
+        return True
+
+    def skip(self, chars: str) -> Optional[str]:
+        """chars에 속한 문자를 건너뛰고 다음 문자를 돌려준다 (끝이면 None)."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.more():
+                return None
+
+    def seek_char(self, ch: str) -> bool:
+        """다음 ch 위치로 이동 (없으면 False)."""
+        while True:
+            i = self.buf.find(ch, self.pos)
+            if i >= 0:
+                self.pos = i
+                return True
+            self.pos = len(self.buf)
+            if not self.more():
+                return False
+
+
+def iter_json_array(
+    source: StreamSource,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    find_array: bool = False,
+) -> Iterator[Any]:
+    """
+    JSON 배열의 원소를 하나씩 yield 한다 (json.load처럼 전체를 만들지 않음).
+    원소마다 JSONDecoder.raw_decode로 디코딩하고, 원소가 청크 경계에 걸리면 더 읽어서 다시 시도
+    (다시 읽을 때마다 남은 텍스트를 두 배로 늘려서 큰 원소도 재시도 횟수가 log 수준).
+    메모리는 청크 + 원소 하나 크기만 쓴다.
+    원소가 버퍼 끝이 아닌 곳에서 깨졌거나 STREAM_MAX_ELEMENT_CHARS보다 커지면 파일 끝까지 읽지 않고 ValueError.
+
+    find_array=True면 처음 나오는 "["부터 배열로 본다
+    (트위터 tweets.js의 "window.YTD.tweets.part0 = [" / {"posts": [ ... ]} 같은 감싼 형식).
+    """
+    stream = TextStream(source, chunk_size)
+    decoder = json.JSONDecoder()
+
+    first = stream.skip(" \t\r\n")
+    if first is None:
+        return
+    if first != "[":
+        if not find_array or not stream.seek_char("["):
+            raise ValueError("JSON export must be an array")
+    stream.pos += 1
+
+    while True:
+        ch = stream.skip(" \t\r\n,")
+        if ch is None:
+            raise ValueError("JSON export ended before ']'")
+        if ch == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(stream.buf, stream.pos)
+        except json.JSONDecodeError as e:
+            # 청크 경계에서 잘린 원소는 버퍼 끝 근처에서, 또는 닫히지 않은 문자열로 실패한다
+            truncated = e.pos >= len(stream.buf) - _JSON_TAIL_CHARS or e.msg.startswith("Unterminated string")
+            if not truncated or stream.eof:
+                raise ValueError(f"invalid JSON export: {e.msg}") from None
+            remaining = len(stream.buf) - stream.pos
+            if remaining > STREAM_MAX_ELEMENT_CHARS:
+                raise ValueError(f"JSON export element is larger than {STREAM_MAX_ELEMENT_CHARS} characters") from None
+            stream.more(remaining)
+            continue
+        if not stream.eof and isinstance(value, (int, float)) and end > len(stream.buf) - _JSON_TAIL_CHARS:
+            # 숫자는 버퍼 끝에서 잘려도 앞부분만으로 디코딩되므로 ("-2.5e3" → "-2") 더 읽고 다시
+            stream.more(_JSON_TAIL_CHARS)
+            continue
+        stream.pos = end
+        yield value
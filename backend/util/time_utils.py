@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+# naive datetime 기준 epoch (카톡 내보내기 시각은 타임존 정보가 없음)
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_minutes(dt: datetime) -> float:
+    """
+    datetime → epoch 기준 분(minute) 값.
+    카톡 타임스탬프는 분 단위라 항상 정수 값(float)이 나오고,
+    두 값의 차이는 (b - a).total_seconds() / 60 과 정확히 같다.
+    """
+    return (dt - EPOCH).total_seconds() / 60.0
+
+
+def from_epoch_minutes(minute: int) -> datetime:
+    """epoch 기준 분 → naive datetime (to_epoch_minutes의 역변환)."""
+    return EPOCH + timedelta(minutes=minute)
+
+
+# 영어 월 약어 → 월 (유튜브 / SNS 내보내기 시각 파싱용)
+MONTH_ABBRS = {
+    m: i + 1
+    for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"))
+}
+
+_EPOCH_ORDINAL = EPOCH.toordinal()
+
+
+def local_epoch_minutes(year: int, month: int, day: int, hour: int = 0, minute: int = 0) -> Optional[int]:
+    """날짜/시각 → epoch 기준 분 (datetime을 만들지 않음, 잘못된 날짜/시각은 None)."""
+    try:
+        ordinal = date(year, month, day).toordinal()
+    except ValueError:
+        return None
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        return None
+    return (ordinal - _EPOCH_ORDINAL) * 1440 + hour * 60 + minute
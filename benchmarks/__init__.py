@@ -0,0 +1,4 @@
+"""
+카카오톡 분석 파이프라인 벤치마크 / 합성 데이터 생성기.
+실행: python -m benchmarks.run_benchmarks --help
+"""
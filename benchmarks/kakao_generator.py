@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterator, List, Tuple
+
+# 메시지 본문에 섞을 단어 (features_kakao의 욕설/게임/주제 키워드가 골고루 걸리도록)
+WORDS = [
+    "안녕", "오늘", "어제", "내일", "밥", "커피", "날씨", "집에", "뭐해",
+    "기분", "행복", "짜증", "좋아", "싫어", "약속", "여행", "주말에", "같이",
+    "코딩", "개발", "프로젝트", "서버", "버그", "github", "파이썬",
+    "과제", "수업", "시험", "팀플", "영화", "드라마", "음악", "운동", "유튜브",
+    "롤", "랭크", "듀오", "pc방", "배그", "주식", "코인", "월급", "데이트",
+    "나는", "내가", "저는", "진짜", "완전", "레전드", "실화", "왜", "어떻게",
+    "시발", "존나", "happy", "sad", "great", "this", "12", "이모티콘",
+]
+EMOJIS = ["ㅋㅋ", "ㅋㅋㅋ", "ㅎㅎ", "ㅠㅠ", "ㅜㅜ", "^^", "♥", "ㅋ", "ㅎ"]
+PUNCT = ["", "", "", "?", "!", "...", "~"]
+
+DEFAULT_SENDERS = ["김현호", "이영희", "박철수", "최민수", "정수진"]
+
+# 요일 이름 (스타일 B 날짜 구분선)
+_WEEKDAYS = ["월요일", "화요일", "수요일", "목요일", "금요일", "토요일", "일요일"]
+
+
+@dataclass
+class KakaoExportSpec:
+    """
+    합성 카카오톡 내보내기 설정.
+
+    - style: "A" (한 줄에 날짜+시각+이름) / "B" (날짜 구분선 + [이름] [시각])
+    - senders / sender_weights: 참여자와 발화 비중 (weights가 비면 앞사람일수록 많이 말함)
+    - multiline_ratio: 이어쓰기 줄이 붙는 메시지 비율
+    - emoji_density: 단어 하나가 이모티콘 패턴일 확률
+    - start / mean_gap_minutes: 첫 메시지 시각과 평균 메시지 간격
+    - seed: 같은 설정 + 같은 seed면 항상 같은 내용
+    """
+
+    messages: int = 10_000
+    style: str = "B"
+    senders: List[str] = field(default_factory=lambda: list(DEFAULT_SENDERS))
+    sender_weights: List[float] = field(default_factory=list)
+    multiline_ratio: float = 0.05
+    emoji_density: float = 0.15
+    min_words: int = 1
+    max_words: int = 12
+    start: datetime = datetime(2024, 1, 1, 9, 0)
+    mean_gap_minutes: float = 7.0
+    newline: str = "\n"
+    seed: int = 0
+
+
+def _ampm(ts: datetime) -> Tuple[str, int]:
+    hour = ts.hour
+    return ("오전" if hour < 12 else "오후"), (hour % 12 or 12)
+
+
+def _message_text(rng: random.Random, spec: KakaoExportSpec) -> str:
+    n = rng.randint(spec.min_words, spec.max_words)
+    words = [
+        rng.choice(EMOJIS) if rng.random() < spec.emoji_density else rng.choice(WORDS)
+        for _ in range(n)
+    ]
+    return " ".join(words) + rng.choice(PUNCT)
+
+
+def iter_export_lines(spec: KakaoExportSpec) -> Iterator[str]:
+    """설정대로 내보내기 파일의 줄을 하나씩 만든다 (줄바꿈 문자 제외)."""
+    rng = random.Random(spec.seed)
+    weights = spec.sender_weights or [1.0 / (i + 1) for i in range(len(spec.senders))]
+
+    yield f"{spec.senders[0]} 님과 카카오톡 대화"
+    yield f"저장한 날짜 : {spec.start:%Y-%m-%d %H:%M:%S}"
+    yield ""
+
+    ts = spec.start
+    current_day = None
+    for _ in range(spec.messages):
+        # 지수 분포 간격 (분 단위로 반올림, 같은 분에 여러 메시지도 나옴)
+        ts += timedelta(minutes=int(rng.expovariate(1.0 / spec.mean_gap_minutes)))
+        sender = rng.choices(spec.senders, weights=weights)[0]
+        text = _message_text(rng, spec)
+        ampm, hour12 = _ampm(ts)
+
+        if spec.style == "A":
+            yield (
+                f"{ts.year}년 {ts.month}월 {ts.day}일 {ampm} {hour12}:{ts.minute:02d}, "
+                f"{sender} : {text}"
+            )
+        else:
+            if ts.date() != current_day:
+                current_day = ts.date()
+                yield (
+                    f"--------------- {ts.year}년 {ts.month}월 {ts.day}일 "
+                    f"{_WEEKDAYS[ts.weekday()]} ---------------"
+                )
+            yield f"[{sender}] [{ampm} {hour12}:{ts.minute:02d}] {text}"
+
+        if rng.random() < spec.multiline_ratio:
+            for _ in range(rng.randint(1, 3)):
+                yield _message_text(rng, spec)
+
+
+def generate_export(spec: KakaoExportSpec) -> str:
+    """합성 내보내기 전체 텍스트."""
+    return spec.newline.join(iter_export_lines(spec)) + spec.newline
+
+
+def generate_export_bytes(spec: KakaoExportSpec, encoding: str = "utf-8") -> bytes:
+    """업로드 파일처럼 인코딩된 bytes (encoding="cp949"도 가능, 생성 단어는 모두 cp949로 표현됨)."""
+    return generate_export(spec).encode(encoding)
+
+
+def write_export(path: str, spec: KakaoExportSpec, encoding: str = "utf-8") -> int:
+    """내보내기를 파일로 바로 쓴다 (큰 파일도 줄 단위로). 반환: 쓴 바이트 수."""
+    written = 0
+    with open(path, "wb") as f:
+        for line in iter_export_lines(spec):
+            data = (line + spec.newline).encode(encoding)
+            f.write(data)
+            written += len(data)
+    return written
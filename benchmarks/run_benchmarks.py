@@ -0,0 +1,237 @@
+"""
+카카오톡 분석 파이프라인 벤치마크.
+
+    python -m benchmarks.run_benchmarks                       # 10k / 100k / 1M 메시지
+    python -m benchmarks.run_benchmarks --sizes 10000 --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench.json  # 이전 결과와 비교
+
+메시지 수마다 새 프로세스(spawn)에서 돌려서 peak RSS가 그 크기만의 값이 되도록 한다.
+각 단계의 peak_rss_mb는 그 단계까지의 최고치(ru_maxrss)라서 단계 사이에서는 줄어들지 않는다.
+(파싱 워커 프로세스의 메모리는 포함하지 않음)
+LLM 호출은 즉시 응답하는 가짜 클라이언트로 대체하고, LLM/분석 결과 캐시는 끈다.
+방 상태(증분 분석)는 analyze_kakao_incremental 단계에서만 임시 디렉터리로 켠다
+(같은 내보내기에 메시지 1%를 더 붙인 파일을 분석).
+파싱 결과 캐시(chat_cache)도 analyze_kakao_chat_cache 단계에서만 켠다 (한 번 파싱해서 저장한 뒤 다시 분석).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import hashlib
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, Any, Callable, List, Optional
+
+from .kakao_generator import KakaoExportSpec, generate_export
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+class StubLLMClient:
+    """OpenAI 클라이언트 흉내 (chat.completions.create / responses.create), 바로 고정 응답."""
+
+    def __init__(self) -> None:
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat))
+        self.responses = SimpleNamespace(create=self._response)
+
+    def _chat(self, **kwargs: Any) -> Any:
+        content = "label1: 벤치마크 XXXX\nlabel2: 측정용 XXXX\nlabel3: 합성 XXXX"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _response(self, **kwargs: Any) -> Any:
+        return SimpleNamespace(output_text="benchmark stub report")
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 bytes 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _timed(stages: Dict[str, Any], name: str, messages: int, fn: Callable[[], Any]) -> Any:
+    gc.collect()
+    t0 = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - t0
+    stages[name] = {
+        "seconds": round(seconds, 4),
+        "messages_per_sec": round(messages / seconds, 1) if seconds > 0 else None,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+    return result
+
+
+def run_size(messages: int, style: str, encoding: str, seed: int) -> Dict[str, Any]:
+    """(자식 프로세스에서 실행) 메시지 수 하나에 대해 모든 단계를 측정한다."""
+    from backend.analysis_cache import invalidate_analysis_cache
+    from backend.chat_cache import ChatCacheStore, set_chat_cache_store
+    from backend.data_loader.kakao_parser import parse_kakao_txt, parse_kakao_buffer
+    from backend.feature_extractor.features_common import extract_text_features
+    from backend.feature_extractor.features_kakao import extract_kakao_features
+    from backend.kakao_analysis import run_kakao_analysis
+    from backend.llm_cache import set_llm_cache
+    from backend.mbti_scorer import score_mbti
+    from backend.pipeline import get_process_pool
+    from backend.room_state import RoomStateStore, set_room_state_store
+
+    spec = KakaoExportSpec(messages=messages, style=style, seed=seed)
+    text = generate_export(spec)
+    raw = text.encode(encoding)
+    user = spec.senders[0]
+    stages: Dict[str, Any] = {}
+
+    parsed = _timed(stages, "parse_kakao_txt", messages, lambda: parse_kakao_txt(text))
+    parsed["meta"]["user_sender"] = user
+    _timed(stages, "extract_text_features", messages, lambda: extract_text_features(parsed.texts()))
+    features = _timed(stages, "extract_kakao_features", messages, lambda: extract_kakao_features(parsed))
+    _timed(stages, "score_mbti", messages, lambda: score_mbti(features))
+    del parsed, features
+
+    # bytes 파서 + MessageTable 경로 (analyze_kakao가 실제로 쓰는 경로)
+    table = _timed(stages, "parse_kakao_buffer", messages, lambda: parse_kakao_buffer(raw))
+    table_parsed = {"messages": table, "meta": {"user_sender": user}}
+    _timed(stages, "extract_kakao_features_table", messages, lambda: extract_kakao_features(table_parsed))
+    del table, table_parsed
+
+    # end-to-end (/analyze/kakao와 같은 함수, LLM은 가짜 클라이언트)
+    set_llm_cache(None)
+    set_room_state_store(None)
+    set_chat_cache_store(None)
+    stub = StubLLMClient()
+    digest = hashlib.sha256(raw).hexdigest()
+    # 프로세스 풀 생성 비용은 빼고 잰다
+    warmup = generate_export(KakaoExportSpec(messages=10)).encode()
+    asyncio.run(run_kakao_analysis([warmup], ["warmup"], user, llm_client=stub))
+    invalidate_analysis_cache()
+    _timed(
+        stages,
+        "analyze_kakao",
+        messages,
+        lambda: asyncio.run(run_kakao_analysis([raw], [digest], user, llm_client=stub)),
+    )
+
+    # 파싱 결과 캐시: 같은 파일을 한 번 분석해서 캐시를 채운 뒤 다시 분석 (파싱 대신 mmap 로드)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        set_chat_cache_store(ChatCacheStore(cache_dir))
+        invalidate_analysis_cache()
+        asyncio.run(run_kakao_analysis([raw], [digest], user, llm_client=stub))
+        invalidate_analysis_cache()
+        _timed(
+            stages,
+            "analyze_kakao_chat_cache",
+            messages,
+            lambda: asyncio.run(run_kakao_analysis([raw], [digest], user, llm_client=stub)),
+        )
+        set_chat_cache_store(None)
+
+    # 증분 분석: 방 상태를 만들어 두고, 메시지를 1% 더 붙인 다음 내보내기를 분석
+    extra = max(1, messages // 100)
+    newer = generate_export(KakaoExportSpec(messages=messages + extra, style=style, seed=seed)).encode(encoding)
+    with tempfile.TemporaryDirectory() as state_dir:
+        set_room_state_store(RoomStateStore(state_dir))
+        invalidate_analysis_cache()
+        asyncio.run(run_kakao_analysis([raw], [digest], user, llm_client=stub))
+        invalidate_analysis_cache()
+        _timed(
+            stages,
+            "analyze_kakao_incremental",
+            extra,
+            lambda: asyncio.run(
+                run_kakao_analysis([newer], [hashlib.sha256(newer).hexdigest()], user, llm_client=stub)
+            ),
+        )
+        set_room_state_store(None)
+    get_process_pool().shutdown()
+
+    return {
+        "messages": messages,
+        "style": style,
+        "encoding": encoding,
+        "input_bytes": len(raw),
+        "stages": stages,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _child_main(conn: Any, messages: int, style: str, encoding: str, seed: int) -> None:
+    try:
+        conn.send(run_size(messages, style, encoding, seed))
+    except BaseException as e:  # 부모에서 어떤 크기가 실패했는지 보이도록
+        conn.send({"messages": messages, "error": repr(e)})
+    finally:
+        conn.close()
+
+
+def run_isolated(messages: int, style: str, encoding: str, seed: int) -> Dict[str, Any]:
+    """run_size를 새 프로세스에서 실행 (peak RSS를 크기별로 분리)."""
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child_main, args=(child, messages, style, encoding, seed))
+    proc.start()
+    child.close()
+    result = parent.recv()
+    proc.join()
+    return result
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """같은 메시지 수 / 단계끼리 시간 비율 (현재 / 이전)."""
+    old = {(r["messages"], r.get("style"), r.get("encoding")): r for r in previous.get("results", [])}
+    lines = []
+    for r in current["results"]:
+        before = old.get((r["messages"], r.get("style"), r.get("encoding")))
+        if before is None or "stages" not in r or "stages" not in before:
+            continue
+        for stage, now in r["stages"].items():
+            prev = before["stages"].get(stage)
+            if not prev or not prev["seconds"]:
+                continue
+            ratio = now["seconds"] / prev["seconds"]
+            lines.append(
+                f"{r['messages']:>9} {stage:<30} {prev['seconds']:>9.3f}s -> {now['seconds']:>9.3f}s  x{ratio:.2f}"
+            )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="카카오톡 분석 파이프라인 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--style", choices=["A", "B"], default="B")
+    parser.add_argument("--encoding", choices=["utf-8", "cp949"], default="utf-8")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (없으면 stdout)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [run_isolated(n, args.style, args.encoding, args.seed) for n in args.sizes],
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        for line in compare(previous, report):
+            print(line, file=sys.stderr)
+
+    return 1 if any("error" in r for r in report["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
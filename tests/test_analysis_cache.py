@@ -0,0 +1,112 @@
+"""
+전체 분석 결과 캐시(AnalysisCache)와 키 확인.
+
+- 직렬화 크기 합이 max_bytes를 넘으면 가장 오래 안 쓴 항목부터 버림, max_bytes보다 큰 결과는 저장 안 함
+- get()은 매번 새 dict (꺼낸 결과를 고쳐도 캐시는 그대로)
+- 키: 파일 순서 무관, 사용자 이름 / 가중치 / min_messages / SCORER_VERSION이 바뀌면 다른 키
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict
+
+import pytest
+
+from backend import analysis_cache
+from backend.analysis_cache import (
+    AnalysisCache,
+    make_analysis_key,
+    make_batch_key,
+    make_batch_report_key,
+    make_multi_key,
+)
+
+DIGESTS = ["a" * 64, "b" * 64]
+
+
+def _size(result: Dict[str, Any]) -> int:
+    return len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+
+
+def _result(size: int) -> Dict[str, Any]:
+    result = {"mbti": "INTJ", "report": ""}
+    result["report"] = "x" * (size - _size(result))
+    assert _size(result) == size
+    return result
+
+
+def test_byte_bounded_lru() -> None:
+    cache = AnalysisCache(max_bytes=300)
+    cache.set("a", _result(100))
+    cache.set("b", _result(100))
+    cache.set("c", _result(100))
+    assert cache.stats()["bytes"] == 300
+    assert cache.get("a") is not None  # a가 최근 사용
+
+    cache.set("d", _result(50))
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in "acd")
+    assert cache.stats() == {"entries": 3, "bytes": 250, "hits": 4, "misses": 1}
+
+    # 같은 키를 다시 쓰면 크기를 새로 계산
+    cache.set("a", _result(150))
+    assert cache.stats()["bytes"] == 300 and cache.stats()["entries"] == 3
+    cache.set("e", _result(120))
+    assert cache.get("c") is None and cache.get("d") is None
+    assert cache.stats()["bytes"] == 270
+
+    # max_bytes보다 큰 결과는 저장하지 않고 다른 항목도 버리지 않는다
+    cache.set("huge", _result(301))
+    assert cache.get("huge") is None
+    assert cache.stats()["entries"] == 2
+
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
+
+
+def test_get_returns_independent_copies() -> None:
+    cache = AnalysisCache()
+    original = {"mbti": "ENFP", "scores": {"E": 60.5}, "meta": {"warnings": ["a"]}}
+    cache.set("k", original)
+    original["scores"]["E"] = 0.0
+
+    first = cache.get("k")
+    assert first == {"mbti": "ENFP", "scores": {"E": 60.5}, "meta": {"warnings": ["a"]}}
+    first["scores"]["E"] = 1.0
+    first["meta"]["warnings"].append("b")
+    second = cache.get("k")
+    assert second == {"mbti": "ENFP", "scores": {"E": 60.5}, "meta": {"warnings": ["a"]}}
+    assert second is not first
+
+
+def test_keys() -> None:
+    key = make_analysis_key(DIGESTS, "김현호")
+    assert key == make_analysis_key(DIGESTS[::-1], "김현호")
+    assert key != make_analysis_key(DIGESTS, "김현")
+    assert key != make_analysis_key(DIGESTS[:1], "김현호")
+
+    multi = make_multi_key(DIGESTS, "김현호", {"kakao": 1.0, "youtube": 0.5})
+    assert multi == make_multi_key(DIGESTS[::-1], "김현호", {"youtube": 0.5, "kakao": 1.0})
+    assert multi != make_multi_key(DIGESTS, "김현호", {"kakao": 1.0, "youtube": 0.25})
+    assert multi not in (key, make_multi_key(DIGESTS, "김현호", {}))
+
+    batch = make_batch_key(DIGESTS)
+    assert batch == make_batch_key(DIGESTS[::-1], 1)
+    assert batch != make_batch_key(DIGESTS, 2)
+    assert batch != key
+    assert make_batch_report_key(batch, "a") != make_batch_report_key(batch, "b")
+
+
+def test_keys_include_scorer_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    before = (
+        make_analysis_key(DIGESTS, "김현호"),
+        make_multi_key(DIGESTS, "김현호", {"kakao": 1.0}),
+        make_batch_key(DIGESTS),
+    )
+    monkeypatch.setattr(analysis_cache, "SCORER_VERSION", analysis_cache.SCORER_VERSION + "-next")
+    after = (
+        make_analysis_key(DIGESTS, "김현호"),
+        make_multi_key(DIGESTS, "김현호", {"kakao": 1.0}),
+        make_batch_key(DIGESTS),
+    )
+    assert all(a != b for a, b in zip(before, after))
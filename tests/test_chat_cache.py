@@ -0,0 +1,141 @@
+"""
+파싱 결과 캐시(write_chat_cache / load_chat_cache / ChatCacheStore) 확인.
+
+- 쓰고 다시 읽으면 배치가 그대로인지 (current_day 있음 / 없음, 빈 대화)
+- 잘린 파일 / 다른 버전 / 깨진 메타데이터는 None 또는 예외 (mmap은 닫힘)
+- 저장소가 만료된 파일을 지우고 파일 수 / 크기 상한을 지키는지
+"""
+from __future__ import annotations
+
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from benchmarks.kakao_generator import KakaoExportSpec, generate_export
+from backend import chat_cache
+from backend.chat_cache import ChatCacheStore, load_chat_cache, write_chat_cache
+from backend.pipeline import parse_kakao_batch
+
+
+def _batch(style: str, messages: int = 300) -> Dict[str, Any]:
+    raw = generate_export(KakaoExportSpec(messages=messages, style=style, seed=7)).encode("utf-8")
+    return parse_kakao_batch(raw)
+
+
+def _write(path: Path, batch: Dict[str, Any]) -> Path:
+    with open(path, "wb") as f:
+        write_chat_cache(f, batch)
+    return path
+
+
+def _assert_same_batch(expected: Dict[str, Any], actual: Dict[str, Any]) -> None:
+    a, b = expected["table"], actual["table"]
+    assert list(a.iter_rows()) == list(b.iter_rows())
+    assert a.sender_names == b.sender_names
+    for key in ("line_count", "senders", "encoding", "current_day"):
+        assert actual[key] == expected[key], key
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+def test_round_trip(tmp_path: Path, style: str) -> None:
+    batch = _batch(style)
+    loaded = load_chat_cache(str(_write(tmp_path / "a.chat", batch)))
+    assert loaded is not None
+    _assert_same_batch(batch, loaded)
+
+
+@pytest.mark.parametrize("current_day", [None, 0, 19723])
+def test_round_trip_current_day(tmp_path: Path, current_day: Any) -> None:
+    batch = dict(_batch("B", messages=20), current_day=current_day)
+    loaded = load_chat_cache(str(_write(tmp_path / "a.chat", batch)))
+    assert loaded is not None
+    assert loaded["current_day"] == current_day
+
+
+def test_round_trip_empty(tmp_path: Path) -> None:
+    batch = parse_kakao_batch(b"")
+    loaded = load_chat_cache(str(_write(tmp_path / "a.chat", batch)))
+    assert loaded is not None
+    assert len(loaded["table"]) == 0
+
+
+def test_truncated_file(tmp_path: Path) -> None:
+    data = _write(tmp_path / "a.chat", _batch("A")).read_bytes()
+    for cut in (len(data) - 1, len(data) // 2, chat_cache._HEADER.size, 3, 0):
+        path = tmp_path / f"cut{cut}.chat"
+        path.write_bytes(data[:cut])
+        assert load_chat_cache(str(path)) is None, cut
+
+
+def test_wrong_version_and_magic(tmp_path: Path) -> None:
+    data = bytearray(_write(tmp_path / "a.chat", _batch("A")).read_bytes())
+
+    old = bytearray(data)
+    struct.pack_into("<I", old, 8, chat_cache.CHAT_CACHE_VERSION - 1)
+    (tmp_path / "old.chat").write_bytes(old)
+    assert load_chat_cache(str(tmp_path / "old.chat")) is None
+
+    other = bytearray(data)
+    other[:8] = b"NOTACHAT"
+    (tmp_path / "other.chat").write_bytes(other)
+    assert load_chat_cache(str(tmp_path / "other.chat")) is None
+
+
+def test_corrupt_metadata_raises(tmp_path: Path) -> None:
+    data = bytearray(_write(tmp_path / "a.chat", _batch("A")).read_bytes())
+    # 인코딩 이름 자리에 ASCII가 아닌 바이트
+    data[chat_cache._HEADER.size + 4] = 0xFF
+    path = tmp_path / "bad.chat"
+    path.write_bytes(data)
+    with pytest.raises(UnicodeDecodeError):
+        load_chat_cache(str(path))
+
+
+def test_store_get_put(tmp_path: Path) -> None:
+    store = ChatCacheStore(str(tmp_path))
+    batch = _batch("B")
+    assert store.get("a" * 64) is None
+    store.put("a" * 64, batch)
+    loaded = store.get("a" * 64)
+    assert loaded is not None
+    _assert_same_batch(batch, loaded)
+    assert store.stats() == {"hits": 1, "misses": 1}
+
+
+def test_store_sweeps_expired_files_on_create(tmp_path: Path) -> None:
+    batch = _batch("A", messages=20)
+    old = _write(tmp_path / ("a" * 64 + ".chat"), batch)
+    fresh = _write(tmp_path / ("b" * 64 + ".chat"), batch)
+    past = time.time() - 3600
+    os.utime(old, (past, past))
+
+    ChatCacheStore(str(tmp_path), ttl_seconds=60)
+    assert not old.exists()
+    assert fresh.exists()
+
+
+def test_store_limits_file_count_and_bytes(tmp_path: Path) -> None:
+    batch = _batch("A", messages=20)
+    store = ChatCacheStore(str(tmp_path))
+    now = time.time()
+    for i in range(5):
+        digest = str(i) * 64
+        store.put(digest, batch)
+        # 나중에 쓴 파일이 더 최근에 쓴 것으로 보이게
+        os.utime(tmp_path / f"{digest}.chat", (now - 50 + i, now - 50 + i))
+
+    ChatCacheStore(str(tmp_path), max_files=3)
+    assert sorted(p.name[0] for p in tmp_path.glob("*.chat")) == ["2", "3", "4"]
+
+    size = (tmp_path / ("4" * 64 + ".chat")).stat().st_size
+    ChatCacheStore(str(tmp_path), max_bytes=2 * size)
+    assert sorted(p.name[0] for p in tmp_path.glob("*.chat")) == ["3", "4"]
+
+    # 쓸 때도 상한을 맞춘다
+    small = ChatCacheStore(str(tmp_path), max_files=2)
+    small.put("5" * 64, batch)
+    assert sorted(p.name[0] for p in tmp_path.glob("*.chat")) == ["4", "5"]
@@ -0,0 +1,107 @@
+"""
+공통 텍스트 특징(extract_text_features / TextFeatureAccumulator)이 바꾸기 전 구현과 같은 값을 내는지 확인한다.
+
+- 문자열 하나 == 기준 구현
+- 메시지 iterable == 기준 구현("\\n"으로 이어붙인 문자열), 블록 크기를 바꿔도 같음
+  (블록 경계가 메시지 경계마다 / 블록보다 긴 메시지 바로 뒤에 오는 경우 포함)
+- MessageTable.text_blocks를 넘긴 경우 (카톡 분석 경로)
+- 1인칭 / 긍정 / 부정 어휘가 토큰 안에 부분 문자열로 들어간 경우, 대소문자, 유니코드 공백
+"""
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+
+from benchmarks.kakao_generator import KakaoExportSpec, generate_export
+from backend.data_loader.kakao_parser import parse_kakao_buffer, parse_kakao_txt
+from backend.feature_extractor.features_common import TextFeatureAccumulator, extract_text_features
+
+from .text_reference import reference_text_features
+
+HANDMADE_TEXTS = [
+    "나는 오늘 행복해!",
+    "나무 아래에서 내가 제일 좋아하는 커피",  # "나" ⊂ "나무" (부분 문자열도 1인칭)
+    "I love it. My mine? me!",
+    "Happy GOOD great awesome-fun",  # 대소문자 구분
+    "짜증나고 힘들어... 우울하다 sad depressed",
+    "싫어싫어 미워",
+    "",
+    "   ",
+    "?!?!",
+    "줄 끝 공백   ",
+    "　전각 공백　사이",
+    "이모티콘",
+    "ㅋㅋㅋㅋ ㅎㅎ 12시 3분",
+    "재밌다\r\n설렌다",
+    "tired anxious angry",
+    "마지막 문장 끝.",
+]
+
+
+def _texts(style: str, seed: int) -> List[str]:
+    parsed = parse_kakao_txt(generate_export(KakaoExportSpec(messages=3000, style=style, seed=seed)))
+    return [m["text"] for m in parsed["messages"]]
+
+
+def _accumulate(texts: List[str], block_chars: int) -> dict:
+    acc = TextFeatureAccumulator()
+    acc.add_texts(texts, block_chars=block_chars)
+    return acc.to_features()
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_string_matches_reference(style: str, seed: int) -> None:
+    text = "\n".join(_texts(style, seed))
+    assert extract_text_features(text) == reference_text_features(text)
+
+
+def test_handmade_string_matches_reference() -> None:
+    for text in HANDMADE_TEXTS + ["\n".join(HANDMADE_TEXTS), ""]:
+        assert extract_text_features(text) == reference_text_features(text), text
+    # 캐시에 들어간 토큰을 다시 분류해도 같은 결과
+    text = "\n".join(HANDMADE_TEXTS)
+    assert extract_text_features(text) == reference_text_features(text)
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+@pytest.mark.parametrize("block_chars", [1, 7, 100, 4096, 64 * 1024])
+def test_iterable_matches_joined_string(style: str, block_chars: int) -> None:
+    texts = _texts(style, 2) + HANDMADE_TEXTS
+    expected = reference_text_features("\n".join(texts))
+    assert _accumulate(texts, block_chars) == expected
+    assert extract_text_features(iter(texts)) == expected
+
+
+def test_block_boundary_after_long_message() -> None:
+    # 블록 크기를 넘는 메시지 하나가 블록을 끝내고, 다음 메시지 첫 토큰은 새 블록에서 시작
+    long_message = "나는 행복 " * 3000 + "끝토큰행복"
+    texts = ["앞 메시지?", long_message, "다음토큰 짜증!", "마지막"]
+    expected = reference_text_features("\n".join(texts))
+    for block_chars in (len(long_message), len(long_message) + 12, len(long_message) + 13, 10):
+        assert _accumulate(texts, block_chars) == expected, block_chars
+    # 메시지 경계의 토큰은 이어붙지 않는다 ("끝토큰행복" + "다음토큰" ≠ 한 토큰)
+    assert expected["word_count"] == 2 + 6000 + 1 + 2 + 1
+
+
+@pytest.mark.parametrize("block_bytes", [64, 1000, 1 << 20])
+def test_message_table_blocks_match_reference(block_bytes: int) -> None:
+    text = generate_export(KakaoExportSpec(messages=3000, style="B", seed=3, multiline_ratio=0.2))
+    table = parse_kakao_buffer(text.encode("utf-8"))
+    expected = reference_text_features("\n".join(m["text"] for m in parse_kakao_txt(text)["messages"]))
+    assert extract_text_features(table.text_blocks(block_bytes)) == expected
+
+
+def test_incremental_add_texts_matches_single_pass() -> None:
+    texts = _texts("A", 4)
+    acc = TextFeatureAccumulator()
+    for start in range(0, len(texts), 700):
+        acc.add_texts(texts[start:start + 700])
+    assert acc.to_features() == reference_text_features("\n".join(texts))
+
+
+def test_empty_inputs() -> None:
+    assert extract_text_features([]) == reference_text_features("")
+    assert extract_text_features([""]) == reference_text_features("")
+    assert extract_text_features(["", ""]) == reference_text_features("\n")
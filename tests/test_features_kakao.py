@@ -0,0 +1,151 @@
+"""
+단일 순회 카톡 특징 추출(KakaoFeatureAccumulator)이 바꾸기 전 구현과 같은 값을 내는지 확인한다.
+
+- 스타일 A / B 합성 내보내기 (benchmarks.kakao_generator)
+- user_sender를 직접 준 경우 / 비운 경우(가장 많이 말한 사람) / 방에 없는 이름
+- 메시지 dict 리스트 경로와 MessageTable(bytes 파서) 경로 둘 다
+- 답장 간격 분포와 상위 단어 순서(동률이면 먼저 나온 단어부터)
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import pytest
+
+from benchmarks.kakao_generator import KakaoExportSpec, generate_export
+from backend.data_loader.kakao_parser import parse_kakao_buffer, parse_kakao_txt
+from backend.feature_extractor.features_kakao import (
+    extract_kakao_features,
+    extract_kakao_features_by_sender,
+)
+
+from .kakao_reference import reference_kakao_features, reference_reply_deltas
+
+USER_SENDER_CASES = {
+    "explicit": "이영희",
+    "missing": None,
+    "unknown": "없는사람",
+}
+
+# 상위 단어 동률 / 답장 간격(같은 분, 하루 넘김 포함)을 직접 확인하는 작은 대화 (스타일 A)
+HANDMADE_CHAT = "\n".join([
+    "민수 님과 카카오톡 대화",
+    "저장한 날짜 : 2024-01-04 12:00:00",
+    "",
+    "2024년 1월 1일 오전 9:00, 민수 : 커피 마실래?",
+    "2024년 1월 1일 오전 9:05, 지은 : 커피 좋아 커피",
+    "2024년 1월 1일 오전 9:05, 민수 : 좋아 좋아",
+    "2024년 1월 1일 오전 9:30, 철수 : 점심 뭐 먹지",
+    "2024년 1월 1일 오전 9:31, 민수 : 점심 같이 먹자!",
+    "2024년 1월 1일 오전 10:00, 지은 : 나도 같이",
+    "2024년 1월 1일 오전 10:20, 철수 : 어디서?",
+    "2024년 1월 1일 오전 10:50, 민수 : 정문 앞",
+    "2024년 1월 3일 오전 10:00, 지은 : 잘 먹었다",
+    "2024년 1월 4일 오전 11:00, 민수 : 늦었다 ㅋㅋ 점심",
+    "",
+])
+
+
+def _export(style: str, seed: int) -> str:
+    # 간격을 넓혀서 하루 넘는 공백 / 밤 시간대 메시지가 섞이게 한다
+    return generate_export(KakaoExportSpec(messages=2000, style=style, seed=seed, mean_gap_minutes=30))
+
+
+def _with_user(parsed: Dict[str, Any], user_sender: Optional[str], messages: Any = None) -> Dict[str, Any]:
+    meta = dict(parsed["meta"], user_sender=user_sender)
+    return {"messages": parsed["messages"] if messages is None else messages, "meta": meta}
+
+
+def _assert_matches_reference(expected: Dict[str, Any], actual: Dict[str, Any]) -> None:
+    """기준 구현이 내는 키는 모두 같은 값이어야 한다 (지금 구현에만 있는 키는 무시)."""
+    for key, value in expected.items():
+        assert key in actual, key
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value), key
+        else:
+            assert actual[key] == value, key
+
+
+def _assert_reply_stats(features: Dict[str, Any], deltas: list) -> None:
+    assert features["reply_count"] == len(deltas)
+    if deltas:
+        ordered = sorted(deltas)
+        assert features["avg_reply_minutes"] == pytest.approx(sum(deltas) / len(deltas))
+        assert features["reply_minutes_median"] == pytest.approx(_percentile(ordered, 0.5))
+        assert features["reply_minutes_p90"] == pytest.approx(_percentile(ordered, 0.9))
+    else:
+        assert features["avg_reply_minutes"] == 0.0
+
+
+def _percentile(ordered: list, q: float) -> float:
+    pos = (len(ordered) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("user_case", list(USER_SENDER_CASES))
+def test_message_list_matches_reference(style: str, seed: int, user_case: str) -> None:
+    parsed = parse_kakao_txt(_export(style, seed))
+    chat = _with_user(parsed, USER_SENDER_CASES[user_case])
+
+    expected = reference_kakao_features(chat)
+    actual = extract_kakao_features(chat)
+
+    _assert_matches_reference(expected, actual)
+    _assert_reply_stats(actual, reference_reply_deltas(parsed["messages"], expected["user_sender_name"]))
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("user_case", list(USER_SENDER_CASES))
+def test_message_table_matches_reference(style: str, seed: int, user_case: str) -> None:
+    text = _export(style, seed)
+    parsed = parse_kakao_txt(text)
+    table = parse_kakao_buffer(text.encode("utf-8"))
+
+    expected = reference_kakao_features(_with_user(parsed, USER_SENDER_CASES[user_case]))
+    actual = extract_kakao_features(_with_user(parsed, USER_SENDER_CASES[user_case], messages=table))
+
+    _assert_matches_reference(expected, actual)
+    _assert_reply_stats(actual, reference_reply_deltas(parsed["messages"], expected["user_sender_name"]))
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+def test_by_sender_matches_reference(style: str) -> None:
+    text = _export(style, 2)
+    parsed = parse_kakao_txt(text)
+    table = parse_kakao_buffer(text.encode("utf-8"))
+
+    by_sender = extract_kakao_features_by_sender(table, parsed["meta"]["senders"])
+
+    assert set(by_sender) == set(parsed["meta"]["senders"])
+    for sender, actual in by_sender.items():
+        _assert_matches_reference(reference_kakao_features(_with_user(parsed, sender)), actual)
+        _assert_reply_stats(actual, reference_reply_deltas(parsed["messages"], sender))
+
+
+def test_handmade_chat_top_words_and_replies() -> None:
+    parsed = parse_kakao_txt(HANDMADE_CHAT)
+    chat = _with_user(parsed, "민수")
+    table_chat = _with_user(parsed, "민수", messages=parse_kakao_buffer(HANDMADE_CHAT.encode("utf-8")))
+
+    expected = reference_kakao_features(chat)
+    # 2번씩 나온 단어가 먼저, 동률이면 처음 나온 순서
+    assert expected["user_top_words"] == ["좋아", "점심", "커피", "마실래", "같이", "먹자", "정문", "늦었다"]
+
+    deltas = reference_reply_deltas(parsed["messages"], "민수")
+    # 같은 분(0분)과 하루 넘게 지난 답장은 빠짐
+    assert deltas == [1.0, 50.0, 30.0]
+
+    for actual in (extract_kakao_features(chat), extract_kakao_features(table_chat)):
+        _assert_matches_reference(expected, actual)
+        _assert_reply_stats(actual, deltas)
+        assert list(actual["reply_minutes_by_partner"].items()) == [("철수", 15.5), ("지은", 50.0)]
+
+
+def test_empty_chat_matches_reference() -> None:
+    chat = {"messages": [], "meta": {"user_sender": None}}
+    _assert_matches_reference(reference_kakao_features(chat), extract_kakao_features(chat))
@@ -0,0 +1,100 @@
+"""
+단어 빈도표(ExactCounter / SpaceSavingCounter) 확인.
+
+- floor == 0인 동안 (항목 수가 2 * capacity를 넘은 적이 없으면) SpaceSavingCounter == ExactCounter
+  (횟수 / top(n) 순서, 동점이면 먼저 나온 항목이 앞)
+- 줄인 뒤: 실제 횟수 <= 추정 횟수 <= 실제 횟수 + floor, floor보다 많이 나온 항목은 남아 있음
+- make_frequency_counter 설정
+"""
+from __future__ import annotations
+
+import random
+from typing import List
+
+import pytest
+
+from backend.feature_extractor.frequency import (
+    ExactCounter,
+    SpaceSavingCounter,
+    make_frequency_counter,
+)
+
+
+def _stream(seed: int, vocab: int, length: int) -> List[str]:
+    # 지프 분포에 가까운 단어열 (상위 몇 개가 자주, 나머지는 드물게)
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocab)]
+    weights = [1.0 / (i + 1) for i in range(vocab)]
+    return rng.choices(words, weights, k=length)
+
+
+def _feed(counter: ExactCounter, words: List[str], rng: random.Random) -> None:
+    # add / update를 섞어서 넣는다 (메시지 단위 update + 단어 하나씩 add)
+    i = 0
+    while i < len(words):
+        step = rng.randint(1, 8)
+        if step == 1:
+            counter.add(words[i], 1)
+        else:
+            counter.update(words[i:i + step])
+        i += step
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_exact_while_floor_is_zero(seed: int) -> None:
+    rng = random.Random(seed)
+    vocab = rng.randint(1, 400)
+    words = _stream(seed, vocab, rng.randint(0, 20000))
+    capacity = (len(set(words)) + 1) // 2  # 2 * capacity >= 어휘 수 → 줄이지 않음
+
+    exact = ExactCounter()
+    sketch = SpaceSavingCounter(capacity)
+    feed_seed = rng.random()
+    _feed(exact, words, random.Random(feed_seed))
+    _feed(sketch, words, random.Random(feed_seed))
+
+    assert sketch.floor == 0 and sketch.exact
+    assert sketch.counts == exact.counts
+    assert list(sketch.counts) == list(exact.counts)
+    for n in (0, 1, 5, 30, vocab + 5):
+        assert sketch.top(n) == exact.top(n)
+
+
+def test_ties_keep_first_seen_order() -> None:
+    words = ["b", "a", "c", "a", "b", "d", "c"]
+    exact = ExactCounter()
+    sketch = SpaceSavingCounter(capacity=2)
+    exact.update(words)
+    sketch.update(words)
+    assert sketch.floor == 0
+    assert sketch.top(4) == exact.top(4) == ["b", "a", "c", "d"]
+    # 2 * capacity를 넘는 순간 줄인다
+    sketch.add("e")
+    assert sketch.floor == 2 and not sketch.exact
+    assert len(sketch) == 2
+
+
+def test_bounds_after_compaction() -> None:
+    words = _stream(7, 5000, 60000)
+    exact = ExactCounter()
+    exact.update(words)
+    sketch = SpaceSavingCounter(capacity=50)
+    _feed(sketch, words, random.Random(7))
+
+    assert sketch.floor > 0
+    assert len(sketch) <= 100
+    for key, estimate in sketch.counts.items():
+        assert exact.counts[key] <= estimate <= exact.counts[key] + sketch.floor
+    for key, count in exact.counts.items():
+        if count > sketch.floor:
+            assert key in sketch.counts
+    assert sketch.top(5) == exact.top(5)
+
+
+def test_make_frequency_counter() -> None:
+    assert type(make_frequency_counter("exact")) is ExactCounter
+    counter = make_frequency_counter("space_saving", 3)
+    assert isinstance(counter, SpaceSavingCounter) and counter.capacity == 3
+    assert SpaceSavingCounter(0).capacity == 1
+    with pytest.raises(ValueError):
+        make_frequency_counter("approx")
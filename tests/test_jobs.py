@@ -0,0 +1,108 @@
+"""
+백그라운드 작업 실행기(JobManager) 확인.
+
+- 끝나지 않은 작업이 max_pending개면 JobQueueFull (cleanup은 바로 호출)
+- 끝난 / 실패한 / 실행 전에 취소된 / 실행 중에 취소된 작업 모두 cleanup이 한 번 호출됨
+- /jobs/kakao는 대기 작업이 꽉 차면 503 + Retry-After
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app_web import app
+from backend.jobs import JobManager, JobQueueFull, job_manager
+
+
+def _blocking_job(gate: asyncio.Event, started: List[str], name: str):
+    async def run(progress: Any) -> Dict[str, Any]:
+        started.append(name)
+        await gate.wait()
+        return {"name": name}
+
+    return run
+
+
+def test_pending_limit_and_cleanup() -> None:
+    async def scenario() -> None:
+        manager = JobManager(workers=1, max_pending=2)
+        gate = asyncio.Event()
+        started: List[str] = []
+        cleaned: List[str] = []
+
+        first = manager.submit(_blocking_job(gate, started, "a"), cleanup=lambda: cleaned.append("a"))
+        second = manager.submit(_blocking_job(gate, started, "b"), cleanup=lambda: cleaned.append("b"))
+        await asyncio.sleep(0)
+        assert manager.pending == 2 and manager.full
+        assert (first.status, second.status) == ("running", "queued")
+
+        with pytest.raises(JobQueueFull):
+            manager.submit(_blocking_job(gate, started, "c"), cleanup=lambda: cleaned.append("c"))
+        assert cleaned == ["c"]
+
+        gate.set()
+        while manager.pending:
+            await asyncio.sleep(0.01)
+        assert started == ["a", "b"]
+        assert cleaned == ["c", "a", "b"]
+        assert first.result == {"name": "a"} and second.status == "done"
+        assert not manager.full
+
+    asyncio.run(scenario())
+
+
+def test_failed_job_runs_cleanup() -> None:
+    async def scenario() -> None:
+        manager = JobManager(workers=1, max_pending=1)
+        cleaned: List[str] = []
+
+        async def boom(progress: Any) -> Dict[str, Any]:
+            raise RuntimeError("parse failed")
+
+        job = manager.submit(boom, cleanup=lambda: cleaned.append("x"))
+        events = [event["event"] async for event in job.iter_events()]
+        await asyncio.sleep(0)
+        assert events == ["running", "error"]
+        assert job.error == "parse failed"
+        assert cleaned == ["x"] and manager.pending == 0
+
+    asyncio.run(scenario())
+
+
+def test_shutdown_cancels_queued_and_running_jobs() -> None:
+    async def scenario() -> None:
+        manager = JobManager(workers=1, max_pending=10)
+        gate = asyncio.Event()
+        started: List[str] = []
+        cleaned: List[str] = []
+
+        running = manager.submit(_blocking_job(gate, started, "a"), cleanup=lambda: cleaned.append("a"))
+        queued = manager.submit(_blocking_job(gate, started, "b"), cleanup=lambda: cleaned.append("b"))
+        await asyncio.sleep(0)
+        # 아직 한 번도 실행되지 않은 task도 취소되면 정리되어야 한다
+        unstarted = manager.submit(_blocking_job(gate, started, "c"), cleanup=lambda: cleaned.append("c"))
+
+        await manager.shutdown()
+        assert started == ["a"]
+        assert sorted(cleaned) == ["a", "b", "c"]
+        assert manager.pending == 0
+        for job in (running, queued, unstarted):
+            assert job.status == "error" and job.error == "cancelled"
+            assert [e["event"] async for e in job.iter_events()][-1] == "error"
+
+    asyncio.run(scenario())
+
+
+def test_create_job_rejects_when_queue_full(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(job_manager, "max_pending", 0)
+    with TestClient(app) as client:
+        r = client.post(
+            "/jobs/kakao",
+            files=[("files", ("a.txt", "2024년 1월 1일 오전 9:00, me : 안녕".encode("utf-8"), "text/plain"))],
+            data={"user_name": "me"},
+        )
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "30"
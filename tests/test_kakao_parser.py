@@ -0,0 +1,79 @@
+"""
+bytes 파서(parse_kakao_buffer)가 str 파서(parse_kakao_txt)와 같은 메시지를 내는지 확인한다.
+줄바꿈 종류(LF / CRLF / CR 단독 / 유니코드 줄 구분 문자)와 비ASCII 공백, cp949, 구간 나눠 파싱 포함.
+"""
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import pytest
+
+from benchmarks.kakao_generator import KakaoExportSpec, generate_export
+from backend.data_loader.kakao_parser import find_kakao_chunks, parse_kakao_buffer, parse_kakao_txt
+from backend.data_loader.message_table import MessageTable, concat_tables
+
+NEWLINE_VARIANTS = {
+    "lf": lambda text: text,
+    "crlf": lambda text: text.replace("\n", "\r\n"),
+    "cr": lambda text: text.replace("\n", "\r"),
+    "line_separator": lambda text: text.replace("\n", "\u2028"),
+    "next_line": lambda text: text.replace("\n", "\x85"),
+    "mixed": lambda text: text.replace("ㅋ\n", "ㅋ\r").replace("!\n", "!\u2029"),
+    # 줄 끝 / 헤더 안의 비ASCII 공백 (str.strip()과 정규식 \s는 지우거나 맞추지만 bytes는 아님)
+    "unicode_spaces": lambda text: text.replace("\n", "\u3000\n").replace("] [", "]\xa0["),
+    # cp949에도 있는 전각 공백(U+3000)만
+    "ideographic_space": lambda text: text.replace("\n", "\u3000\n"),
+}
+
+
+def _rows(table: MessageTable) -> List[Tuple[int, str, str]]:
+    return [(minute, table.sender_names[code], text) for minute, code, text in table.iter_rows()]
+
+
+def _export(style: str) -> str:
+    return generate_export(KakaoExportSpec(messages=1500, style=style, seed=4, multiline_ratio=0.2))
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+@pytest.mark.parametrize("variant", list(NEWLINE_VARIANTS))
+@pytest.mark.parametrize("encoding", ["utf-8", "cp949"])
+def test_buffer_parser_matches_text_parser(style: str, variant: str, encoding: str) -> None:
+    text = NEWLINE_VARIANTS[variant](_export(style))
+    try:
+        raw = text.encode(encoding)
+    except UnicodeEncodeError:
+        pytest.skip(f"{variant} is not representable in {encoding}")
+
+    parsed = parse_kakao_txt(text)
+    expected = _rows(MessageTable.from_messages(parsed["messages"]))
+
+    stats: dict = {}
+    table = parse_kakao_buffer(raw, stats=stats)
+    assert len(expected) == 1500
+    assert _rows(table) == expected
+    assert stats["encoding"] == encoding
+    assert stats["line_count"] == parsed["meta"]["line_count"]
+    assert stats["senders"] == parsed["meta"]["senders"]
+
+    # 구간으로 나눠 파싱해서 이어붙여도 같아야 한다
+    parts = [
+        parse_kakao_buffer(raw, encoding=encoding, start=start, end=end, current_day=current_day)
+        for start, end, current_day in find_kakao_chunks(raw, 16 * 1024, encoding)
+    ]
+    assert _rows(concat_tables(parts)) == expected
+
+
+def test_cr_only_export_resumes_from_current_day() -> None:
+    raw = _export("B").replace("\n", "\r").encode("utf-8")
+    cut = raw.index(b"\r[", len(raw) // 2) + 1
+
+    full_stats: dict = {}
+    full = parse_kakao_buffer(raw, stats=full_stats)
+    head_stats: dict = {}
+    head = parse_kakao_buffer(raw, stats=head_stats, end=cut)
+    tail_stats: dict = {}
+    tail = parse_kakao_buffer(raw, stats=tail_stats, start=cut, current_day=head_stats["current_day"])
+
+    assert len(full) == 1500
+    assert _rows(concat_tables([head, tail])) == _rows(full)
+    assert tail_stats["current_day"] == full_stats["current_day"] is not None
@@ -0,0 +1,121 @@
+"""
+LLM 응답 캐시(LLMCache) 확인.
+
+- 키: 모델 / 프롬프트 조각이 다르면 다른 키 (조각 경계도 구분)
+- 메모리 LRU: max_entries개를 넘으면 가장 오래 안 쓴 항목부터 버림
+- TTL: 메모리 / SQLite 모두 ttl_seconds가 지나면 miss, 쓸 때 디스크의 만료 항목 정리
+- SQLite에서 읽은 항목은 메모리로 올라옴 (처음 저장한 시각 기준으로 만료)
+"""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from backend import llm_cache
+from backend.llm_cache import LLMCache, get_llm_cache_for, make_cache_key
+
+
+class _Clock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    fake = _Clock()
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=fake.time))
+    return fake
+
+
+def _disk_keys(db_path: Path) -> List[str]:
+    with sqlite3.connect(db_path) as db:
+        return sorted(row[0] for row in db.execute("SELECT key FROM llm_cache"))
+
+
+def test_make_cache_key() -> None:
+    key = make_cache_key("gpt", "system", "user")
+    assert key == make_cache_key("gpt", "system", "user")
+    assert len({
+        key,
+        make_cache_key("gpt-2", "system", "user"),
+        make_cache_key("gpt", "system", "user2"),
+        make_cache_key("gpt", "systemuser"),
+        make_cache_key("gpt", "syste", "muser"),
+        make_cache_key("gpt", "system", "user", ""),
+    }) == 6
+
+
+def test_memory_lru(clock: _Clock) -> None:
+    cache = LLMCache(max_entries=2, ttl_seconds=100)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"  # a가 최근 사용
+    cache.set("c", "C")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.stats() == {"memory_entries": 2, "memory_hits": 3, "disk_hits": 0, "misses": 1}
+
+
+def test_memory_ttl(clock: _Clock) -> None:
+    cache = LLMCache(max_entries=10, ttl_seconds=100)
+    cache.set("a", "A")
+    clock.now += 100
+    assert cache.get("a") == "A"
+    clock.now += 0.5
+    assert cache.get("a") is None
+    assert cache.stats()["memory_entries"] == 0
+    # 다시 쓰면 그 시각부터 다시 유효
+    cache.set("a", "A2")
+    clock.now += 50
+    assert cache.get("a") == "A2"
+
+
+def test_disk_promotion(tmp_path: Path, clock: _Clock) -> None:
+    db_path = tmp_path / "sub" / "llm.sqlite3"
+    first = LLMCache(max_entries=10, ttl_seconds=100, db_path=str(db_path))
+    first.set("a", "A")
+    first.set("b", "B")
+
+    # 재시작한 것처럼 새 인스턴스: 메모리는 비어 있고 디스크에서 읽어 메모리로 올린다
+    clock.now += 60
+    second = LLMCache(max_entries=10, ttl_seconds=100, db_path=str(db_path))
+    assert second.stats()["memory_entries"] == 0
+    assert second.get("a") == "A"
+    assert second.get("a") == "A"
+    assert second.stats() == {"memory_entries": 1, "memory_hits": 1, "disk_hits": 1, "misses": 0}
+
+    # 메모리로 올라온 항목도 처음 저장한 시각 기준으로 만료된다
+    clock.now += 41
+    assert second.get("a") is None
+    assert second.get("b") is None
+    assert _disk_keys(db_path) == []
+    assert second.stats()["misses"] == 2
+
+
+def test_disk_sweep_on_set(tmp_path: Path, clock: _Clock) -> None:
+    db_path = tmp_path / "llm.sqlite3"
+    cache = LLMCache(max_entries=1, ttl_seconds=100, db_path=str(db_path))
+    cache.set("old", "O")
+    clock.now += 70
+    cache.set("mid", "M")
+    clock.now += 40
+    cache.set("new", "N")
+    assert _disk_keys(db_path) == ["mid", "new"]
+    # 메모리에서 밀려난 항목은 디스크에서 읽는다
+    assert cache.get("mid") == "M"
+    assert cache.stats()["disk_hits"] == 1
+
+    cache.clear()
+    assert cache.get("new") is None
+    assert _disk_keys(db_path) == []
+
+
+def test_injected_client_skips_cache() -> None:
+    assert get_llm_cache_for(object()) is None
@@ -0,0 +1,118 @@
+"""
+행렬 채점(features_to_matrix → score_mbti_matrix(...).row(i, f))이
+행마다 score_mbti(f)와 정확히 같은 결과를 내는지 확인한다.
+
+- 무작위 특징 (0~1 비율, 큰 값, 음수)
+- 빈 dict / 일부 키만 있는 dict (기본값, user_* → 방 전체 값 fallback)
+- 0 / 극단값 / 경계값 (답장 5분 / 60분, 페르소나 임계값 0.1, 페르소나 동점)
+- NaN / inf
+"""
+from __future__ import annotations
+
+import math
+import random
+from typing import Any, Dict, List
+
+from backend.mbti_scorer import (
+    FEATURE_COLUMNS,
+    FEATURE_DEFAULTS,
+    features_to_matrix,
+    score_mbti,
+    score_mbti_matrix,
+)
+
+TOPIC_COLUMNS = [name for name in FEATURE_COLUMNS if name.startswith("topic_")]
+
+
+def _random_features(rng: random.Random) -> Dict[str, Any]:
+    features: Dict[str, Any] = {}
+    for name in FEATURE_COLUMNS + ("question_ratio", "exclamation_ratio"):
+        roll = rng.random()
+        if roll < 0.15:
+            continue  # 키 없음
+        if name == "avg_sentence_len":
+            features[name] = rng.uniform(0, 60)
+        elif name == "avg_reply_minutes":
+            features[name] = rng.choice([0.0, rng.uniform(0, 10), rng.uniform(50, 300)])
+        elif name == "talkativeness":
+            features[name] = rng.uniform(0, 4)
+        elif roll < 0.2:
+            features[name] = rng.choice([0.0, 1.0, -0.5, 3.0])
+        else:
+            features[name] = rng.random() * rng.choice([0.05, 0.3, 1.0])
+    return features
+
+
+def _edge_cases() -> List[Dict[str, Any]]:
+    zeros = {name: 0.0 for name in FEATURE_COLUMNS}
+    cases: List[Dict[str, Any]] = [
+        {},
+        zeros,
+        {"question_ratio": 0.4, "exclamation_ratio": 0.2},
+        {"question_ratio": 0.4, "user_question_ratio": 0.0},
+        {name: 1.0 for name in FEATURE_COLUMNS},
+        {name: 1e6 for name in FEATURE_COLUMNS},
+        {name: -1e6 for name in FEATURE_COLUMNS},
+        {"avg_sentence_len": 1e9, "talkativeness": -1e9},
+        {"topic_planning_ratio": 0.05},  # 2.0배 = 0.1 → 임계값을 넘지 않음
+        {"topic_planning_ratio": 0.0500001},
+        {"topic_development_ratio": 0.2, "topic_romance_ratio": 0.2},  # 페르소나 동점 → 앞쪽
+        {"topic_hobby_ratio": 0.1, "user_game_msg_ratio": 0.5, "user_swear_msg_ratio": 0.3},
+        {"avg_reply_minutes": 1e-9},
+        {"avg_reply_minutes": 5.0},
+        {"avg_reply_minutes": 5.000001},
+        {"avg_reply_minutes": 59.999},
+        {"avg_reply_minutes": 60.0},
+        {"avg_reply_minutes": -3.0},
+        {"avg_reply_minutes": 3.0, "topic_planning_ratio": 0.3},
+        {"user_emoji_ratio": float("nan"), "topic_school_ratio": float("nan")},
+        {"avg_reply_minutes": float("inf"), "negative_ratio": float("-inf")},
+        {name: FEATURE_DEFAULTS[name] for name in TOPIC_COLUMNS},
+    ]
+    # 축 점수가 같아지는 경우 (E=I=50 등)
+    cases.append({**zeros, "talkativeness": 1.0, "avg_sentence_len": 5.0, "user_night_message_ratio": 0.2})
+    return cases
+
+
+def _same(a: Any, b: Any) -> bool:
+    """== 비교, 단 NaN끼리는 같은 것으로 본다."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return list(a) == list(b) and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return type(a) is type(b) and a == b
+
+
+def _assert_rows_match(features_list: List[Dict[str, Any]]) -> None:
+    result = score_mbti_matrix(features_to_matrix(features_list))
+    assert len(result) == len(features_list)
+    for i, features in enumerate(features_list):
+        expected = score_mbti(features)
+        actual = result.row(i, features)
+        assert _same(expected, actual), (i, features, expected, actual)
+
+
+def test_matrix_matches_scalar_random() -> None:
+    rng = random.Random(18)
+    _assert_rows_match([_random_features(rng) for _ in range(2000)])
+
+
+def test_matrix_matches_scalar_edge_cases() -> None:
+    _assert_rows_match(_edge_cases())
+
+
+def test_matrix_single_row_and_empty() -> None:
+    _assert_rows_match([{}])
+    assert len(score_mbti_matrix(features_to_matrix([]))) == 0
+
+
+def test_row_without_features_uses_matrix_values() -> None:
+    features = {"avg_sentence_len": 12.0, "question_ratio": 0.3}
+    row = score_mbti_matrix(features_to_matrix([features])).row(0)
+    expected = score_mbti(features)
+    assert row["features"]["user_question_ratio"] == 0.3
+    assert {k: v for k, v in row.items() if k != "features"} == {
+        k: v for k, v in expected.items() if k != "features"
+    }
@@ -0,0 +1,136 @@
+"""
+여러 소스 통합 분석(/analyze/multi) 확인.
+
+- sniff_upload_source: 카톡 / 유튜브 JSON, HTML / SNS JSON, CSV / 알 수 없는 파일
+- parse_fusion_weights: 음수 / inf / nan / 모르는 소스는 ValueError
+- fuse_features: 카톡만 있으면 카톡 특징 그대로, 겹치는 특징은 가중 평균
+- 카톡 파일만 올린 run_multi_analysis == run_kakao_analysis (점수 / 신뢰도)
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+from benchmarks.kakao_generator import KakaoExportSpec, generate_export
+from benchmarks.run_benchmarks import StubLLMClient
+from backend.analysis_cache import invalidate_analysis_cache
+from backend.feature_fusion import fuse_features, parse_fusion_weights
+from backend.kakao_analysis import run_kakao_analysis
+from backend.mbti_scorer import FEATURE_COLUMNS, score_mbti
+from backend.multi_analysis import run_multi_analysis, sniff_upload_source
+
+KAKAO_A = generate_export(KakaoExportSpec(messages=200, style="A", seed=5)).encode("utf-8")
+KAKAO_B_CP949 = generate_export(KakaoExportSpec(messages=200, style="B", seed=5)).encode("cp949")
+
+YOUTUBE_JSON = json.dumps([
+    {
+        "header": "YouTube",
+        "title": "Watched 알고리즘 강의",
+        "titleUrl": "https://www.youtube.com/watch?v=abc",
+        "subtitles": [{"name": "코딩채널", "url": "https://www.youtube.com/channel/x"}],
+        "time": "2024-01-01T14:00:00.000Z",
+        "products": ["YouTube"],
+    },
+], ensure_ascii=False).encode("utf-8")
+
+YOUTUBE_HTML = (
+    '<html><head><title>시청 기록</title></head><body>'
+    '<div class="outer-cell mdl-cell"><div class="content-cell mdl-cell">'
+    '<a href="https://www.youtube.com/watch?v=abc">알고리즘 강의</a><br>'
+    '<a href="https://www.youtube.com/channel/x">코딩채널</a><br>'
+    'Jan 1, 2024, 11:00:00 PM KST</div></div></body></html>'
+).encode("utf-8")
+
+SNS_JSON = json.dumps([
+    # 본문에 유튜브 주소가 있어도 Takeout 키가 없으면 SNS
+    {"text": "이 영상 봐 https://www.youtube.com/watch?v=abc #추천", "created_at": "2024-01-01T12:00:00Z"},
+    {"text": "오늘 날씨 좋다!", "created_at": "2024-01-02T01:00:00Z"},
+], ensure_ascii=False).encode("utf-8")
+
+SNS_TWEETS_JS = b'window.YTD.tweets.part0 = [{"tweet": {"full_text": "hello @friend", ' \
+    b'"created_at": "Wed Oct 10 20:19:24 +0000 2018"}}]'
+
+SNS_CSV = "created_at,text\n2024-01-01 12:00,오늘 뭐 하지?\n2024-01-01 23:30,잘 자!\n".encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        (KAKAO_A, "kakao"),
+        (KAKAO_B_CP949, "kakao"),
+        (YOUTUBE_JSON, "youtube"),
+        (YOUTUBE_HTML, "youtube"),
+        (SNS_JSON, "sns"),
+        (SNS_TWEETS_JS, "sns"),
+        (SNS_CSV, "sns"),
+        (b"", None),
+        (b"   \n\n", None),
+        (b"just some notes\nwithout any structure\n", None),
+        (b"a,b,c\n1,2,3\n", None),
+    ],
+)
+def test_sniff_upload_source(tmp_path: Path, raw: bytes, expected: str) -> None:
+    assert sniff_upload_source(raw) == expected
+    # 업로드는 임시 파일 경로로도 들어온다
+    path = tmp_path / "upload"
+    path.write_bytes(raw)
+    assert sniff_upload_source(str(path)) == expected
+
+
+def test_parse_fusion_weights() -> None:
+    assert parse_fusion_weights("") == {}
+    assert parse_fusion_weights(" kakao = 1 , youtube=0.25,") == {"kakao": 1.0, "youtube": 0.25}
+    assert parse_fusion_weights("sns=0") == {"sns": 0.0}
+    for spec in ("youtube=inf", "youtube=-inf", "sns=nan", "kakao=-1", "kakao=abc", "tiktok=1", "kakao"):
+        with pytest.raises(ValueError):
+            parse_fusion_weights(spec)
+
+
+def test_fuse_kakao_only_keeps_features() -> None:
+    kakao = {name: 0.1 * (k + 1) for k, name in enumerate(FEATURE_COLUMNS)}
+    kakao.update(word_count=123, user_sender_name="김현호")
+    fused = fuse_features({"kakao": kakao}, {"kakao": 0.0, "youtube": 5.0})
+    assert fused == kakao
+    assert score_mbti(fused) == score_mbti(kakao)
+
+
+def test_fuse_weighted_average() -> None:
+    fused = fuse_features(
+        {
+            "kakao": {"user_night_message_ratio": 0.2, "word_count": 10},
+            "youtube": {"youtube_time_ratio_night": 0.8},
+            "sns": {"sns_time_ratio_night": 0.5, "sns_word_count": 5, "sns_positive_ratio": 0.3},
+        },
+        {"kakao": 1.0, "youtube": 0.5, "sns": 0.5},
+    )
+    assert fused["user_night_message_ratio"] == pytest.approx((0.2 + 0.4 + 0.25) / 2.0)
+    assert fused["positive_ratio"] == 0.3
+    assert fused["word_count"] == 15
+    assert all(math.isfinite(v) for v in fused.values() if isinstance(v, float))
+
+    # 값을 가진 소스의 가중치가 모두 0이면 단순 평균
+    zero = fuse_features(
+        {"kakao": {"user_night_message_ratio": 0.2}, "youtube": {"youtube_time_ratio_night": 0.8}},
+        {"kakao": 0.0, "youtube": 0.0},
+    )
+    assert zero["user_night_message_ratio"] == pytest.approx(0.5)
+
+
+def test_multi_kakao_only_matches_kakao_analysis() -> None:
+    digest = hashlib.sha256(KAKAO_A).hexdigest()
+
+    async def run() -> tuple:
+        invalidate_analysis_cache()
+        kakao = await run_kakao_analysis([KAKAO_A], [digest], "김현호", llm_client=StubLLMClient())
+        multi = await run_multi_analysis([KAKAO_A], [digest], ["kakao"], "김현호", llm_client=StubLLMClient())
+        return kakao, multi
+
+    kakao, multi = asyncio.run(run())
+    assert multi["mbti"] == kakao["mbti"]
+    assert multi["confidence"] == kakao["confidence"]
+    assert multi["meta"]["user_sender_resolved"] == kakao["meta"]["user_sender_resolved"] == "김현호"
@@ -0,0 +1,136 @@
+"""
+방 상태(RoomState) 증분 분석이 처음부터 다시 분석한 결과와 같은지 확인한다.
+
+- 예전 내보내기 + 새 메시지: 저장 → 다시 읽기 → 새 부분만 누적한 특징 == 전체 분석
+- 예전 본문이 바뀐 파일 / 이어쓰기 줄로 시작하는 새 부분 / 예전 메시지보다 이른 새 메시지는 증분 분석 거절
+- 저장 파일에는 내 메시지를 예시 후보 ROOM_STATE_SAMPLE_TEXTS개만 남김
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+
+from benchmarks.kakao_generator import KakaoExportSpec, generate_export
+from backend import room_state
+from backend.data_loader.kakao_parser import detect_kakao_encoding, find_first_message_line
+from backend.kakao_analysis import _build_room_features, _extract_features, _incremental_features
+from backend.metrics import StageTimings
+from backend.pipeline import parse_kakao_batch
+from backend.room_state import RoomStateStore, make_room_key
+
+USER_NAME = "김현호"
+
+
+def _export(messages: int, style: str, saved: str, encoding: str = "utf-8") -> bytes:
+    # 같은 seed면 메시지가 많은 쪽이 적은 쪽 본문 뒤에 메시지만 더 붙은 파일 (다시 내보낸 것처럼 저장 날짜만 다름)
+    text = generate_export(KakaoExportSpec(messages=messages, style=style, seed=3, mean_gap_minutes=30))
+    lines = text.split("\n")
+    lines[1] = f"저장한 날짜 : {saved}"
+    return "\n".join(lines).encode(encoding)
+
+
+def _full(raw: bytes, user_name: str = USER_NAME) -> Dict[str, Any]:
+    batch = parse_kakao_batch(raw)
+    return _extract_features(batch["table"], batch["line_count"], batch["senders"], user_name, StageTimings())
+
+
+def _seed(store: RoomStateStore, raw: bytes, user_name: str = USER_NAME) -> Dict[str, Any]:
+    batch = parse_kakao_batch(raw)
+    return _build_room_features(
+        store, raw, batch["table"], batch["line_count"], batch["senders"],
+        batch["current_day"], user_name, StageTimings(),
+    )
+
+
+def _incremental(store: RoomStateStore, raw: bytes, user_name: str = USER_NAME) -> Optional[Dict[str, Any]]:
+    result = _incremental_features(store, raw, user_name, StageTimings())
+    return None if result is None else result[0]
+
+
+def _stored_state(store: RoomStateStore, raw: bytes, user_name: str = USER_NAME) -> Any:
+    encoding = detect_kakao_encoding(raw)
+    key = make_room_key(raw, find_first_message_line(raw, encoding), encoding, user_name)
+    return store.get(key)
+
+
+@pytest.mark.parametrize("style", ["A", "B"])
+@pytest.mark.parametrize("encoding", ["utf-8", "cp949"])
+@pytest.mark.parametrize("user_name", [USER_NAME, "없는사람"])
+def test_incremental_matches_full(tmp_path: Path, style: str, encoding: str, user_name: str) -> None:
+    store = RoomStateStore(str(tmp_path))
+    first = _export(800, style, "2024-01-01 00:00:00", encoding)
+    second = _export(1100, style, "2024-02-01 00:00:00", encoding)
+    third = _export(1101, style, "2024-03-01 00:00:00", encoding)
+
+    assert _seed(store, first, user_name) == _full(first, user_name)
+    for raw in (second, third, third):
+        assert _incremental(store, raw, user_name) == _full(raw, user_name)
+    assert len(_stored_state(store, third, user_name)) == 1101
+
+
+def test_stored_user_texts_are_bounded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(room_state, "ROOM_STATE_SAMPLE_TEXTS", 3)
+    store = RoomStateStore(str(tmp_path))
+    first = _export(800, "B", "2024-01-01 00:00:00")
+    second = _export(900, "B", "2024-02-01 00:00:00")
+
+    _seed(store, first)
+    state = _stored_state(store, first)
+    assert len(state.kakao_acc.user_texts) == 3
+    assert state.kakao_acc.sender_counts is state.sender_counts
+
+    # 예시 문장은 남겨 둔 후보 + 새 메시지 안에서 고르므로 다를 수 있지만, 나머지 특징은 그대로
+    incremental = _incremental(store, second)
+    expected = _full(second)
+    assert incremental is not None
+    assert {k: v for k, v in incremental.items() if k != "sample_common_messages"} == {
+        k: v for k, v in expected.items() if k != "sample_common_messages"
+    }
+
+
+def test_rejects_edited_history(tmp_path: Path) -> None:
+    store = RoomStateStore(str(tmp_path))
+    first = _export(800, "A", "2024-01-01 00:00:00")
+    second = _export(900, "A", "2024-02-01 00:00:00")
+    _seed(store, first)
+
+    # 방 키(본문 앞 ROOM_KEY_BYTES)는 같고, 그 뒤 예전 본문의 메시지 하나가 바뀐 파일
+    pos = second.index(" : ".encode("utf-8"), len(first) // 2) + 3
+    edited = second[:pos] + "수정".encode("utf-8") + second[pos:]
+    assert _incremental(store, edited) is None
+
+
+def test_rejects_continuation_line_at_tail(tmp_path: Path) -> None:
+    store = RoomStateStore(str(tmp_path))
+    first = _export(800, "A", "2024-01-01 00:00:00")
+    second = _export(900, "A", "2024-02-01 00:00:00")
+    _seed(store, first)
+
+    # 새 부분 첫 줄이 마지막 메시지의 이어쓰기 줄이면 그 메시지 내용이 바뀌므로 처음부터 분석
+    tail = len(first)
+    continued = second[:tail] + "앞 메시지에 이어서\n".encode("utf-8") + second[tail:]
+    assert _incremental(store, continued) is None
+    assert _incremental(store, second) == _full(second)
+
+
+def test_rejects_messages_before_last_message(tmp_path: Path) -> None:
+    store = RoomStateStore(str(tmp_path))
+    first = _export(800, "A", "2024-01-01 00:00:00")
+    _seed(store, first)
+
+    earlier = first + "2023년 12월 31일 오후 11:00, 이영희 : 예전 메시지\n".encode("utf-8")
+    assert _incremental(store, earlier) is None
+    assert not _stored_state(store, first).can_extend(parse_kakao_batch(earlier)["table"])
+
+
+def test_unterminated_file_is_not_stored(tmp_path: Path) -> None:
+    store = RoomStateStore(str(tmp_path))
+    first = _export(800, "A", "2024-01-01 00:00:00")
+    second = _export(900, "A", "2024-02-01 00:00:00").rstrip(b"\n")
+    _seed(store, first)
+
+    assert _incremental(store, second) == _full(second)
+    # 마지막 줄이 줄바꿈으로 끝나지 않으면 다음 파일에서 이어서 파싱할 수 없으므로 예전 상태 그대로
+    assert len(_stored_state(store, first)) == 800
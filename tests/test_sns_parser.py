@@ -0,0 +1,142 @@
+"""
+SNS 내보내기 스트리밍 파서 확인.
+
+- JSON 배열 / tweets.js(window.YTD 감싼 형식) / {"posts": [...]} / CSV, 청크 크기를 작게 해도 결과가 같음
+- 인스타그램 JSON의 깨진 한글("\\u00ec\\u0095...") 복원, 정상 글자는 그대로
+- 시각: epoch 초 / 밀리초, ISO(Z / 오프셋 / 없음), 트위터 형식 + SNS_TZ_OFFSET_MINUTES
+- 해시태그 / 멘션 정규화와 ID 공유
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, List
+
+import pytest
+
+from backend.data_loader import sns_parser
+from backend.data_loader.sns_parser import (
+    TagVocabulary,
+    iter_sns_posts,
+    parse_sns_export,
+    parse_sns_time,
+    sniff_sns_format,
+)
+from backend.util.time_utils import local_epoch_minutes
+
+CHUNK_SIZES = [1, 3, 17, 1 << 20]
+
+
+def _mojibake(text: str) -> str:
+    # 인스타그램 내보내기처럼 UTF-8 바이트를 글자 하나씩 적은 문자열
+    return text.encode("utf-8").decode("latin-1")
+
+
+INSTAGRAM_JSON = json.dumps([
+    {
+        "media": [{
+            "uri": "media/posts/1.jpg",
+            "creation_timestamp": 1704117600,
+            "title": _mojibake("오늘 카페 #주말 #Coffee @친구"),
+        }],
+    },
+    {"media": [{"uri": "media/posts/2.jpg", "creation_timestamp": 1704204000, "title": ""}]},
+    {"title": _mojibake("새해 복 많이 받으세요 😀"), "creation_timestamp": 1704067200000},
+    {"title": "café crème"},
+]).encode("utf-8")
+
+TWEETS_JS = (
+    'window.YTD.tweets.part0 = [\n'
+    '  {"tweet": {"full_text": "hello @Friend #Python", "created_at": "Mon Jan 01 15:00:00 +0000 2024"}},\n'
+    '  {"tweet": {"full_text": "RT 두 번째 #ｐｙｔｈｏｎ", "created_at": "Tue Jan 02 09:30:00 +0900 2024"}},\n'
+    '  {"tweet": {"created_at": "Tue Jan 02 10:00:00 +0000 2024"}}\n'
+    ']'
+).encode("utf-8")
+
+SNS_CSV = (
+    "﻿Date,Caption,likes\n"
+    "2024-01-01 12:00,\"쉼표, 있는 글 #태그\",3\n"
+    "2024-01-02T03:00:00Z,\"여러 줄\n글\",1\n"
+    ",,0\n"
+    "bad time,시각 없는 글\n"
+).encode("utf-8")
+
+
+def _posts(raw: bytes, chunk_size: int) -> List[Any]:
+    vocab = TagVocabulary()
+    return [
+        (post.text, post.minute, [vocab.name(i) for i in post.hashtag_ids], [vocab.name(i) for i in post.mention_ids])
+        for post in iter_sns_posts(raw, None, vocab, chunk_size)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_instagram_json_mojibake(chunk_size: int) -> None:
+    assert _posts(INSTAGRAM_JSON, chunk_size) == [
+        ("오늘 카페 #주말 #Coffee @친구", local_epoch_minutes(2024, 1, 1, 23, 0), ["#주말", "#coffee"], ["@친구"]),
+        ("새해 복 많이 받으세요 😀", local_epoch_minutes(2024, 1, 1, 9, 0), [], []),
+        # latin-1 글자지만 UTF-8로 다시 읽히지 않으면 그대로
+        ("café crème", None, [], []),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_tweets_js_wrapper(chunk_size: int) -> None:
+    assert _posts(TWEETS_JS, chunk_size) == [
+        ("hello @Friend #Python", local_epoch_minutes(2024, 1, 2, 0, 0), ["#python"], ["@friend"]),
+        ("RT 두 번째 #ｐｙｔｈｏｎ", local_epoch_minutes(2024, 1, 2, 9, 30), ["#python"], []),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_wrapped_object_json(chunk_size: int) -> None:
+    raw = json.dumps({"owner": "me", "posts": [{"text": "a #x"}, {"text": "b"}]}).encode("utf-8")
+    assert [text for text, *_ in _posts(raw, chunk_size)] == ["a #x", "b"]
+
+
+def test_csv() -> None:
+    posts = _posts(SNS_CSV, 1 << 20)
+    assert posts == [
+        ("쉼표, 있는 글 #태그", local_epoch_minutes(2024, 1, 1, 12, 0), ["#태그"], []),
+        ("여러 줄\n글", local_epoch_minutes(2024, 1, 2, 12, 0), [], []),
+        ("시각 없는 글", None, [], []),
+    ]
+    # 파일 객체는 읽은 뒤에도 닫지 않는다
+    f = io.BytesIO(SNS_CSV)
+    assert len(list(iter_sns_posts(f, "csv"))) == 3
+    assert not f.closed
+    with pytest.raises(ValueError):
+        list(iter_sns_posts(b"a,b\n1,2\n", "csv"))
+
+
+def test_sniff_and_parse() -> None:
+    assert sniff_sns_format(INSTAGRAM_JSON) == "json"
+    assert sniff_sns_format(TWEETS_JS) == "json"
+    assert sniff_sns_format(SNS_CSV) == "csv"
+    result = parse_sns_export(TWEETS_JS)
+    assert result["meta"] == {"post_count": 2, "tag_count": 2}
+    with pytest.raises(ValueError):
+        iter_sns_posts(SNS_CSV, "xml")
+
+
+def test_parse_sns_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    kst_midnight = local_epoch_minutes(2024, 1, 2, 0, 0)
+    assert parse_sns_time(1704121200) == kst_midnight
+    assert parse_sns_time("1704121200") == kst_midnight
+    assert parse_sns_time(1704121200000) == kst_midnight
+    assert parse_sns_time(1704121200.5) == kst_midnight
+    assert parse_sns_time("2024-01-01T15:00:00Z") == kst_midnight
+    assert parse_sns_time("2024-01-01T15:00:00.250Z") == kst_midnight
+    assert parse_sns_time("2024-01-02T00:00:00+09:00") == kst_midnight
+    assert parse_sns_time("2024-01-01T10:00:00-0500") == kst_midnight
+    assert parse_sns_time("Mon Jan 01 15:00:00 +0000 2024") == kst_midnight
+    # 타임존이 없으면 현지 시각 그대로
+    assert parse_sns_time("2024-01-02 00:00") == kst_midnight
+    assert parse_sns_time("2024-01-02") == kst_midnight
+    for value in (None, True, "", "yesterday", "2024-13-01", "Mon Foo 01 15:00:00 +0000 2024", [1]):
+        assert parse_sns_time(value) is None
+
+    monkeypatch.setattr(sns_parser, "SNS_TZ_OFFSET_MINUTES", -5 * 60)
+    assert parse_sns_time("2024-01-01T15:00:00Z") == local_epoch_minutes(2024, 1, 1, 10, 0)
+    assert parse_sns_time(1704121200) == local_epoch_minutes(2024, 1, 1, 10, 0)
+    assert parse_sns_time("2024-01-02 00:00") == kst_midnight
@@ -0,0 +1,168 @@
+"""
+유튜브 시청 기록 스트리밍 파서와 iter_json_array 확인.
+
+- JSON / HTML: 청크 크기를 작게 해도 (원소 / 항목 / 글자가 청크 경계에 걸려도) 결과가 같음
+- 광고 / 제목 없는 항목은 빠짐, "Watched ..." / "... 을(를) 시청했습니다." 문구는 뗌
+- 시각: JSON은 UTC(또는 오프셋) + YOUTUBE_TZ_OFFSET_MINUTES, HTML은 적힌 현지 시각 그대로
+- iter_json_array: 깨진 원소는 파일 끝까지 읽지 않고 바로 ValueError, 원소 크기 제한
+"""
+from __future__ import annotations
+
+import io
+import json
+from typing import Any, List
+
+import pytest
+
+from backend.data_loader import youtube_parser
+from backend.data_loader.youtube_parser import WatchRecord, iter_youtube_history
+from backend.util import stream_utils
+from backend.util.stream_utils import iter_json_array
+from backend.util.time_utils import local_epoch_minutes
+
+CHUNK_SIZES = [1, 3, 17, 64, 1 << 20]
+
+YOUTUBE_JSON = json.dumps([
+    {
+        "header": "YouTube",
+        "title": "Watched 알고리즘 강의 😀",
+        "titleUrl": "https://www.youtube.com/watch?v=abc",
+        "subtitles": [{"name": "코딩채널", "url": "https://www.youtube.com/channel/x"}],
+        "time": "2024-01-01T14:00:00.000Z",
+    },
+    {
+        "header": "YouTube",
+        "title": "Watched 광고 영상",
+        "details": [{"name": "From Google Ads"}],
+        "time": "2024-01-01T15:00:00.000Z",
+    },
+    {"header": "YouTube", "title": "", "time": "2024-01-01T16:00:00Z"},
+    {
+        "header": "YouTube",
+        "title": "요리 브이로그 을(를) 시청했습니다.",
+        "subtitles": [{"name": "먹방"}],
+        "time": "2024-01-02T01:30:00+09:00",
+    },
+    {"header": "YouTube", "title": "Watched 삭제된 영상", "time": "not a time"},
+], ensure_ascii=False, indent=1).encode("utf-8")
+
+YOUTUBE_HTML = (
+    '﻿<!DOCTYPE html><html><head><title>시청 기록</title></head><body>'
+    '<div class="outer-cell mdl-cell"><div class="content-cell mdl-cell">'
+    'Watched\xa0<a href="https://www.youtube.com/watch?v=abc">알고리즘 &amp; 자료구조</a><br>'
+    '<a href="https://www.youtube.com/channel/x">코딩채널</a><br>'
+    'Jan 1, 2024, 11:00:00 PM KST</div></div>'
+    '<div class="outer-cell mdl-cell"><div class="content-cell mdl-cell">'
+    '<a href="https://www.youtube.com/watch?v=ad">광고</a><br>Google 광고<br>'
+    'Jan 2, 2024, 1:00:00 AM KST</div></div>'
+    '<div class="outer-cell mdl-cell"><div class="content-cell mdl-cell">'
+    '<a href="https://www.youtube.com/watch?v=def">요리 브이로그</a><br>'
+    '<a href="https://www.youtube.com/channel/y">먹방</a><br>'
+    '2024. 1. 2. 오전 12:05:00 KST</div></div>'
+    '</body></html>'
+).encode("utf-8")
+
+
+def _records(raw: bytes, fmt: Any, chunk_size: int) -> List[WatchRecord]:
+    return list(iter_youtube_history(raw, fmt, chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_json_across_chunk_boundaries(chunk_size: int) -> None:
+    assert _records(YOUTUBE_JSON, None, chunk_size) == [
+        WatchRecord("알고리즘 강의 😀", "코딩채널", local_epoch_minutes(2024, 1, 1, 23, 0)),
+        WatchRecord("요리 브이로그", "먹방", local_epoch_minutes(2024, 1, 2, 1, 30)),
+        WatchRecord("삭제된 영상", None, None),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_html_across_chunk_boundaries(chunk_size: int) -> None:
+    assert _records(YOUTUBE_HTML, None, chunk_size) == [
+        WatchRecord("알고리즘 & 자료구조", "코딩채널", local_epoch_minutes(2024, 1, 1, 23, 0)),
+        WatchRecord("요리 브이로그", "먹방", local_epoch_minutes(2024, 1, 2, 0, 5)),
+    ]
+
+
+def test_file_object_source() -> None:
+    assert _records(YOUTUBE_JSON, "json", 7) == list(iter_youtube_history(io.BytesIO(YOUTUBE_JSON), chunk_size=7))
+
+
+def test_json_timezone(monkeypatch: pytest.MonkeyPatch) -> None:
+    def minute(time: str) -> Any:
+        raw = json.dumps([{"title": "x", "time": time}]).encode("utf-8")
+        return _records(raw, "json", 1 << 20)[0].minute
+
+    assert minute("2024-01-01T15:00:00Z") == local_epoch_minutes(2024, 1, 2, 0, 0)
+    assert minute("2024-01-01T15:00:00.123-05:00") == local_epoch_minutes(2024, 1, 2, 5, 0)
+    assert minute("2024-01-01T15:00:00+0530") == local_epoch_minutes(2024, 1, 1, 18, 30)
+    # 오프셋이 없으면 UTC로 본다
+    assert minute("2024-01-01T15:00") == local_epoch_minutes(2024, 1, 2, 0, 0)
+    assert minute("2024-02-30T15:00:00Z") is None
+
+    monkeypatch.setattr(youtube_parser, "YOUTUBE_TZ_OFFSET_MINUTES", 0)
+    assert minute("2024-01-01T15:00:00Z") == local_epoch_minutes(2024, 1, 1, 15, 0)
+    # HTML 시각은 이미 현지 시각이라 오프셋을 더하지 않는다
+    assert _records(YOUTUBE_HTML, "html", 64)[0].minute == local_epoch_minutes(2024, 1, 1, 23, 0)
+
+
+def test_not_youtube() -> None:
+    with pytest.raises(ValueError):
+        iter_youtube_history(b"just text")
+    with pytest.raises(ValueError):
+        _records(b'{"title": "x"}', "json", 64)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_json_array_values_and_wrappers(chunk_size: int) -> None:
+    raw = '﻿ [1, -2.5e3, "a]b", true, null, {"k": [1, 2]}, 10 ]'.encode("utf-8")
+    assert list(iter_json_array(raw, chunk_size)) == [1, -2.5e3, "a]b", True, None, {"k": [1, 2]}, 10]
+    assert list(iter_json_array(b"[]", chunk_size)) == []
+    assert list(iter_json_array(b"", chunk_size)) == []
+    wrapped = b'window.YTD.tweets.part0 = [{"a": 1},\n{"a": 2}]'
+    assert list(iter_json_array(wrapped, chunk_size, find_array=True)) == [{"a": 1}, {"a": 2}]
+    with pytest.raises(ValueError):
+        list(iter_json_array(wrapped, chunk_size))
+
+
+class _CountingSource(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads = 0
+
+    def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return super().read(size)
+
+
+@pytest.mark.parametrize("broken", [b'{"a": 1 "b": 2}', b'{"a": tru, "b": 1}', b'{"a": "x"]', b'{"a": [1,, 2]}'])
+def test_json_array_malformed_element_fails_fast(broken: bytes) -> None:
+    good = b'{"title": "' + b"x" * 100 + b'"}'
+    raw = b"[" + good + b"," + broken + b"," + b",".join([good] * 5000) + b"]"
+    source = _CountingSource(raw)
+    values = iter_json_array(source, chunk_size=4096)
+    assert next(values) == json.loads(good)
+    with pytest.raises(ValueError, match="invalid JSON export"):
+        next(values)
+    # 깨진 원소 뒤의 500KB를 다 읽지 않고 첫 청크 근처에서 멈춘다
+    assert source.reads <= 2
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_json_array_truncated(chunk_size: int) -> None:
+    for raw in (b'[{"a": 1}, {"a": "unterminated', b'[{"a": 1}, {"a": tr', b'[{"a": 1}, {"a": 1}'):
+        with pytest.raises(ValueError):
+            list(iter_json_array(raw, chunk_size))
+
+
+def test_json_array_element_size_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(stream_utils, "STREAM_MAX_ELEMENT_CHARS", 1000)
+    # 닫히지 않은 문자열은 어디서 깨졌는지 알 수 없으므로 제한까지만 읽는다
+    raw = b'[{"a": "' + b"x" * 100_000
+    source = _CountingSource(raw)
+    with pytest.raises(ValueError, match="larger than 1000"):
+        list(iter_json_array(source, chunk_size=64))
+    assert source.reads * 64 < 4000
+    # 제한보다 작은 원소는 청크가 작아도 그대로 읽힌다
+    big = {"a": "y" * 900}
+    assert list(iter_json_array(json.dumps([big, big]).encode("utf-8"), chunk_size=3)) == [big, big]
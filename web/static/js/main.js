@@ -44,6 +44,46 @@ async function requestAnalyzeKakao(formData) {
   return res.json();
 }
 
+// 백그라운드 작업으로 분석 시작 → { job_id }
+async function requestCreateKakaoJob(formData) {
+  const res = await fetch("/jobs/kakao", {
+    method: "POST",
+    body: formData,
+  });
+
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(`서버 오류 (${res.status}): ${text}`);
+  }
+  return res.json();
+}
+
+// 작업 진행 이벤트(SSE) 구독
+// handlers: { parsed, features, scored, report, done, error } → (data) => void
+function subscribeJobEvents(jobId, handlers) {
+  const source = new EventSource(`/jobs/${encodeURIComponent(jobId)}/events`);
+
+  ["running", "cached", "parsed", "features", "scored", "report"].forEach((stage) => {
+    source.addEventListener(stage, (e) => {
+      if (handlers[stage]) handlers[stage](JSON.parse(e.data));
+    });
+  });
+
+  source.addEventListener("done", (e) => {
+    source.close();
+    if (handlers.done) handlers.done(JSON.parse(e.data));
+  });
+
+  source.addEventListener("error", (e) => {
+    source.close();
+    // 서버가 보낸 error 이벤트면 data가 있고, 연결 끊김이면 없음
+    const detail = e.data ? JSON.parse(e.data).detail : "서버 연결이 끊어졌습니다.";
+    if (handlers.error) handlers.error(new Error(detail));
+  });
+
+  return source;
+}
+
 
 // ======================================================
 // 2. RENDER MODULE (UI 렌더링 전용)
@@ -635,7 +675,77 @@ async function analyze() {
 
   const formData = buildFormData(userName, files);
 
-try {
+  // EventSource 미지원 브라우저는 기존 단일 요청 방식 사용
+  if (typeof EventSource === "undefined") {
+    await analyzeOnce(formData);
+    return;
+  }
+
+  try {
+    const { job_id: jobId } = await requestCreateKakaoJob(formData);
+
+    subscribeJobEvents(jobId, {
+      parsed: (d) => {
+        setStatus(
+          DOM.statusEl,
+          `메시지 ${Number(d.message_count || 0).toLocaleString()}개를 읽었습니다. 특징을 추출하는 중...`,
+          "loading"
+        );
+      },
+      features: () => {
+        setStatus(DOM.statusEl, "특징 추출 완료. MBTI 점수를 계산하는 중...", "loading");
+      },
+      // ✅ 점수가 나오면 LLM 리포트를 기다리지 않고 먼저 보여준다
+      scored: (d) => {
+        showResultsSection();
+        updateMbtiSection(d);
+        updateConfidenceSection(d);
+        updateMetaSection(d);
+        openAccordion("overview");
+        setStatus(DOM.statusEl, "MBTI 점수가 나왔어요! AI 리포트를 작성하는 중...", "loading");
+      },
+      done: (data) => {
+        setStatus(
+          DOM.statusEl,
+          "분석이 완료되었습니다. 결과를 확인해보세요 🙌",
+          "success"
+        );
+        showResultsSection();
+        updateUIWithAnalysis(data);
+        openAccordion("overview");
+      },
+      error: (err) => {
+        console.error(err);
+        setStatus(
+          DOM.statusEl,
+          `분석 중 오류가 발생했습니다: ${err.message}`,
+          "error"
+        );
+      },
+    });
+  } catch (err) {
+    console.error(err);
+    setStatus(
+      DOM.statusEl,
+      `분석 중 오류가 발생했습니다: ${err.message}`,
+      "error"
+    );
+  }
+}
+
+// ✅ 분석 결과 섹션 표시
+function showResultsSection() {
+  const resultsSection = document.getElementById("results-section");
+  if (resultsSection) {
+    resultsSection.removeAttribute("hidden");
+    // 선택: 자동 스크롤
+    // resultsSection.scrollIntoView({ behavior: "smooth", block: "start" });
+  }
+}
+
+// 단일 요청(/analyze/kakao)으로 분석 (결과가 한 번에 옴)
+async function analyzeOnce(formData) {
+  try {
     const data = await requestAnalyzeKakao(formData);
 
     setStatus(
@@ -644,14 +754,7 @@ try {
       "success"
     );
 
-    // ✅ 분석 결과 섹션 표시
-    const resultsSection = document.getElementById("results-section");
-    if (resultsSection) {
-      resultsSection.removeAttribute("hidden");
-      // 선택: 자동 스크롤
-      // resultsSection.scrollIntoView({ behavior: "smooth", block: "start" });
-    }
-
+    showResultsSection();
     updateUIWithAnalysis(data);
     openAccordion("overview");
 
@@ -663,7 +766,6 @@ try {
         "error"
       );
   }
-
 }
 
 